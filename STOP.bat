@@ -49,6 +49,8 @@ IF "%_STOPPED_APPIUM%"=="1" (
 
 REM ── Stop any running test subprocess (main.py) ───────────────
 echo   Stopping test runner...
+REM The multi-device supervisor goes first so it cannot restart its workers.
+wmic process where "commandline like '%%supervisor.py%%'" delete >nul 2>&1
 wmic process where "commandline like '%%main.py%%'" delete >nul 2>&1
 
 echo.
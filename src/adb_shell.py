@@ -0,0 +1,188 @@
+"""
+Persistent ADB shell multiplexer.
+
+Spawning `adb shell ...` costs hundreds of milliseconds per call on Windows
+testers. AdbShell keeps ONE interactive `adb shell` open per device and runs
+commands through it one at a time, delimiting each command's output with a
+unique end marker:
+
+    <cmd>; echo __SPATCH_END_<token>__ $?
+
+Static properties (model, manufacturer, Android version) never change for a
+UDID, so they are cached process-wide after the first query.
+
+Host-side commands such as `adb connect` cannot go through a device shell —
+the device is unreachable exactly when they are needed — and still use
+subprocess directly.
+
+Usage:
+    from src.adb_shell import shell_for, static_props
+    out = shell_for(udid).run("pidof com.example.app", timeout=5)
+    props = static_props(udid)
+"""
+
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import uuid
+
+_END_MARK = "__SPATCH_END_"
+
+_STATIC_PROP_NAMES = {
+    "model": "ro.product.model",
+    "manufacturer": "ro.product.manufacturer",
+    "android_version": "ro.build.version.release",
+}
+
+
+def adb_cmd(args: list[str]) -> list[str]:
+    """
+    adb invocation for a long-lived process. Prefer the adb on PATH; on
+    Mac/Linux fall back to a login shell so Homebrew-installed adb is found.
+    """
+    if os.name == "nt" or shutil.which("adb"):
+        return ["adb"] + args
+    return ["bash", "-lc", "exec adb " + " ".join(args)]
+
+
+class AdbShell:
+    def __init__(self, udid: str = ""):
+        self.udid = udid
+        self._proc: subprocess.Popen | None = None
+        self._out: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Process management
+    # ------------------------------------------------------------------
+
+    def _alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _spawn(self) -> None:
+        args = (["-s", self.udid] if self.udid else []) + ["shell"]
+        self._proc = subprocess.Popen(
+            adb_cmd(args),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        self._out = queue.Queue()
+        threading.Thread(
+            target=self._pump, args=(self._proc, self._out), name="adb-shell", daemon=True
+        ).start()
+
+    @staticmethod
+    def _pump(proc: subprocess.Popen, out: queue.Queue) -> None:
+        for raw in proc.stdout:
+            out.put(raw.decode("utf-8", errors="ignore").rstrip("\r\n"))
+        out.put(None)  # EOF — shell exited
+
+    def close(self) -> None:
+        with self._lock:
+            self._kill()
+
+    def _kill(self) -> None:
+        if self._proc is not None:
+            try:
+                self._proc.kill()
+            except Exception:
+                pass
+        self._proc = None
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+
+    def run(self, cmd: str, timeout: float = 10) -> str:
+        """
+        Run one shell command and return its stdout+stderr (stripped).
+        Raises RuntimeError on non-zero exit and TimeoutError on timeout.
+        A dead shell is respawned once; a timed-out shell is killed so the
+        next command starts from a clean stream.
+        """
+        with self._lock:
+            if not self._alive():
+                self._spawn()
+            token = uuid.uuid4().hex[:12]
+            marker = f"{_END_MARK}{token}__"
+            try:
+                self._proc.stdin.write(f"{cmd}; echo {marker} $?\n".encode("utf-8"))
+                self._proc.stdin.flush()
+            except Exception:
+                # Shell died between commands (e.g. ADB dropped) — retry once
+                self._kill()
+                self._spawn()
+                self._proc.stdin.write(f"{cmd}; echo {marker} $?\n".encode("utf-8"))
+                self._proc.stdin.flush()
+
+            lines: list[str] = []
+            while True:
+                try:
+                    line = self._out.get(timeout=timeout)
+                except queue.Empty:
+                    self._kill()
+                    raise TimeoutError(f"adb shell timed out after {timeout}s: {cmd}")
+                if line is None:
+                    self._kill()
+                    raise RuntimeError(f"adb shell exited while running: {cmd}")
+                if marker in line:
+                    head, _, rc = line.partition(marker)
+                    if head:
+                        lines.append(head)
+                    break
+                lines.append(line)
+
+            output = "\n".join(lines).strip()
+            if rc.strip() not in ("", "0"):
+                raise RuntimeError(f"adb shell exit {rc.strip()}: {cmd}: {output[:200]}")
+            return output
+
+    def getprop(self, name: str, timeout: float = 5) -> str:
+        return self.run(f"getprop {name}", timeout=timeout)
+
+
+# ------------------------------------------------------------------
+# Per-UDID registry
+# ------------------------------------------------------------------
+
+_SHELLS: dict[str, AdbShell] = {}
+_STATIC_PROPS: dict[str, dict] = {}
+_registry_lock = threading.Lock()
+
+
+def shell_for(udid: str = "") -> AdbShell:
+    """Return the shared AdbShell for a device, creating it on first use."""
+    with _registry_lock:
+        sh = _SHELLS.get(udid)
+        if sh is None:
+            sh = _SHELLS[udid] = AdbShell(udid)
+        return sh
+
+
+def static_props(udid: str = "") -> dict:
+    """Model / manufacturer / Android version for a UDID, cached after the first query."""
+    cached = _STATIC_PROPS.get(udid)
+    if cached:
+        return dict(cached)
+    sh = shell_for(udid)
+    props = {}
+    for key, prop in _STATIC_PROP_NAMES.items():
+        try:
+            props[key] = sh.getprop(prop)
+        except Exception as e:
+            logging.info("[ADB] getprop %s failed: %s", prop, e)
+            props[key] = ""
+    if all(props.values()):
+        _STATIC_PROPS[udid] = props
+    return dict(props)
+
+
+def close_all() -> None:
+    with _registry_lock:
+        for sh in _SHELLS.values():
+            sh.close()
+        _SHELLS.clear()
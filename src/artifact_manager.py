@@ -3,10 +3,27 @@ Failure artifact collector.
 
 Collects five pieces of evidence whenever a test fails:
   - screenshot.png    — current screen at the moment of failure
-  - logcat.txt        — last 200 ADB logcat lines
+  - logcat.txt        — last 2 minutes from the driver's logcat ring buffer,
+                        or the last 200 ADB logcat lines without one
   - page_source.xml   — current UI hierarchy (XML)
   - error.txt         — exception type, message, and traceback
   - meta.json         — timestamp, device, step, exception summary
+plus manifest.json, recording which of them completed:
+    {"screenshot.png": {"status": "ok", "elapsed_sec": 0.8}, ...}
+  status: ok | failed (error recorded, no file) |
+          timeout (still running at the deadline) |
+          late (finished after the deadline, written anyway)
+  blob:   every capture is kept once per distinct content in
+          artifacts/blobs/ (src/blob_store.py); the entry's hash replaces
+          the file in the folder, and artifacts/blob_manifest.jsonl records
+          each one under <folder>/<file>
+
+The three device captures run concurrently, each on its own daemon thread,
+and the call returns once they finish or `deadline_sec` passes, whichever
+is first; a capture stuck in a dead Appium / adb call never keeps the
+interpreter from exiting. Disk writes happen afterwards on a background
+writer thread, so the caller is not held up by persistence. The writer is
+joined at interpreter exit, so queued writes are not lost.
 
 Output folder: artifacts/YYYYMMDD_HHMMSS_<label>/  (at project root)
 
@@ -24,108 +41,225 @@ import datetime
 import json
 import os
 import subprocess
+import threading
+import time
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from pathlib import Path
 
+from src.blob_store import BlobStore
+
 # Project root is one level above this file (automation/ -> root)
 _ROOT = Path(__file__).resolve().parent.parent
 ARTIFACTS_DIR = _ROOT / "artifacts"
 
+CAPTURE_DEADLINE_SEC = 20.0
+
+_write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="failure-write")
+
 
 def save_failure_artifacts(
     driver,
     exception: Exception,
     label: str = "runtime_failure",
     step: str = "",
+    deadline_sec: float = CAPTURE_DEADLINE_SEC,
 ) -> Path:
     """
     Collect failure evidence into a new timestamped folder.
 
     Args:
-        driver:    Appium WebDriver instance, or an AndroidDriver wrapper
-                   that exposes the underlying WebDriver as `.drv`.
-        exception: The exception that caused the test to fail.
-        label:     Short name embedded in the folder name for easy identification.
-        step:      Last known automation step (recorded in meta.json).
+        driver:       Appium WebDriver instance, or an AndroidDriver wrapper
+                      that exposes the underlying WebDriver as `.drv`.
+        exception:    The exception that caused the test to fail.
+        label:        Short name embedded in the folder name for easy identification.
+        step:         Last known automation step (recorded in meta.json).
+        deadline_sec: Total time to wait for the device captures.
 
     Returns:
-        Path to the created artifact folder.
+        Path to the artifact folder. Files appear as the background writer
+        reaches them; manifest.json is rewritten after each one.
     """
     ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
     out = ARTIFACTS_DIR / f"{ts}_{label}"
     out.mkdir(parents=True, exist_ok=True)
-
-    _save_screenshot(driver, out / "screenshot.png")
-    _save_logcat(driver, out / "logcat.txt")
-    _save_page_source(driver, out / "page_source.xml")
-    _save_error(exception, out / "error.txt")
-    _save_meta(driver, exception, step, ts, out / "meta.json")
-
+    manifest = _Manifest(out / "manifest.json", _store())
+
+    # Cheap to gather, done here: the traceback belongs to the caller's exception
+    _defer(manifest, out / "error.txt", _format_error(exception), "ok", 0.0)
+    _defer(manifest, out / "meta.json", _format_meta(driver, exception, step, ts), "ok", 0.0)
+
+    captures = {
+        "screenshot.png": _grab_screenshot,
+        "logcat.txt": _grab_logcat,
+        "page_source.xml": _grab_page_source,
+    }
+    t0 = time.monotonic()
+    futures = {}
+    for name, grab in captures.items():
+        futures[_start_capture(grab, driver)] = name
+    done, pending = wait(futures, timeout=deadline_sec)
+
+    for fut in done:
+        data, status, elapsed = fut.result()
+        _defer(manifest, out / futures[fut], data, status, elapsed)
+    for fut in pending:
+        name = futures[fut]
+        manifest.set(name, "timeout", round(time.monotonic() - t0, 2))
+        # Keep it if it does arrive — evidence from a slow device is still evidence
+        fut.add_done_callback(lambda f, name=name: _late(manifest, out / name, *f.result()))
+    _write_pool.submit(manifest.write)
     return out
 
 
 # ------------------------------------------------------------------
-# Internal helpers — each is best-effort and never raises
+# Manifest + deferred writes
 # ------------------------------------------------------------------
 
-def _save_screenshot(driver, path: Path) -> None:
-    try:
-        wd = getattr(driver, "drv", driver)
-        wd.save_screenshot(str(path))
-    except Exception as e:
-        _write_note(path, f"screenshot failed: {e}")
+def _store() -> BlobStore:
+    return BlobStore(ARTIFACTS_DIR / "blobs", manifest_path=ARTIFACTS_DIR / "blob_manifest.jsonl")
+
+
+class _Manifest:
+    def __init__(self, path: Path, store: BlobStore):
+        self.path = path
+        self.store = store
+        self._lock = threading.Lock()
+        self.entries: dict[str, dict] = {}
+
+    def set(self, name: str, status: str, elapsed: float, error: str = "") -> None:
+        entry = {"status": status, "elapsed_sec": elapsed}
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self.entries[name] = entry
+
+    def set_blob(self, name: str, sha: str) -> None:
+        with self._lock:
+            self.entries.setdefault(name, {})["blob"] = sha
+
+    def write(self) -> None:
+        """Replace manifest.json atomically — the web views may be reading it."""
+        with self._lock:
+            text = json.dumps(self.entries, ensure_ascii=False, indent=2)
+        tmp = self.path.with_name(f"{self.path.name}.{threading.get_ident()}.tmp")
+        _write_note(tmp, text)
+        try:
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+
+def _defer(manifest: _Manifest, path: Path, data, status: str, elapsed: float) -> None:
+    """
+    Queue `data` for the writer thread and record its status in the manifest.
+    A failed capture's data is its error text: recorded, never written as the file.
+    """
+    if status == "failed":
+        manifest.set(path.name, status, elapsed, data)
+        _write_pool.submit(manifest.write)
+        return
+    manifest.set(path.name, status, elapsed)
+    _write_pool.submit(_persist, path, data, manifest)
 
 
-def _save_logcat(driver, path: Path) -> None:
+def _late(manifest: _Manifest, path: Path, data, status: str, elapsed: float) -> None:
+    """A capture that finished after the deadline: kept if it succeeded."""
     try:
-        udid = _get_udid(driver)
-        cmd = ["adb"]
-        if udid:
-            cmd += ["-s", udid]
-        cmd += ["logcat", "-d", "-t", "200"]
-
-        # On macOS, Homebrew-installed adb may not be on the default PATH;
-        # wrapping in bash -lc sources the login shell's PATH.
-        if os.name != "nt":
-            cmd = ["bash", "-lc", " ".join(cmd)]
-
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
-        path.write_text(result.stdout or "(no logcat output)", encoding="utf-8")
-    except Exception as e:
-        _write_note(path, f"logcat failed: {e}")
+        _defer(manifest, path, data, "late" if status == "ok" else status, elapsed)
+    except RuntimeError:
+        pass  # interpreter shutting down — the writer no longer accepts work
 
 
-def _save_page_source(driver, path: Path) -> None:
+def _persist(path: Path, data, manifest: _Manifest) -> None:
     try:
-        wd = getattr(driver, "drv", driver)
-        xml = wd.page_source
-        path.write_text(xml or "(no page source)", encoding="utf-8")
+        name = f"{path.parent.name}/{path.name}"
+        manifest.set_blob(path.name, manifest.store.put(data, name, event=path.parent.name))
     except Exception as e:
-        _write_note(path, f"page_source failed: {e}")
+        manifest.set(path.name, "failed", 0.0, f"write failed: {e}")
+    manifest.write()
+
 
+def _start_capture(grab, driver) -> Future:
+    """Run one capture on a daemon thread; the future resolves to _timed()'s tuple."""
+    fut = Future()
+    threading.Thread(
+        target=lambda: fut.set_result(_timed(grab, driver)),
+        name="failure-capture", daemon=True,
+    ).start()
+    return fut
 
-def _save_error(exception: Exception, path: Path) -> None:
+
+def _timed(grab, driver) -> tuple:
+    """(data, status, elapsed_sec) — never raises."""
+    t0 = time.monotonic()
     try:
-        tb = traceback.format_exc()
-        text = f"{type(exception).__name__}: {exception}\n\n{tb}"
-        path.write_text(text, encoding="utf-8")
+        data, status = grab(driver), "ok"
     except Exception as e:
-        _write_note(path, f"error capture failed: {e}")
+        data, status = str(e), "failed"
+    return data, status, round(time.monotonic() - t0, 2)
+
 
+# ------------------------------------------------------------------
+# Captures — run on the capture pool; return file contents or raise
+# ------------------------------------------------------------------
 
-def _save_meta(driver, exception: Exception, step: str, ts: str, path: Path) -> None:
+def _grab_screenshot(driver) -> bytes:
+    wd = getattr(driver, "drv", driver)
+    return wd.get_screenshot_as_png()
+
+
+def _grab_logcat(driver) -> str:
+    buffer = getattr(driver, "logcat_buffer", None)
+    if buffer is not None and buffer.running:
+        lines = buffer.window(before=120)
+        return "\n".join(lines) if lines else "(no logcat output in window)"
+    shell = getattr(driver, "adb", None)
+    if shell is not None:
+        try:
+            return shell.run("logcat -d -t 200", timeout=15) or "(no logcat output)"
+        except Exception:
+            pass  # fall through to a one-shot adb process
+    udid = _get_udid(driver)
+    cmd = ["adb"]
+    if udid:
+        cmd += ["-s", udid]
+    cmd += ["logcat", "-d", "-t", "200"]
+
+    # On macOS, Homebrew-installed adb may not be on the default PATH;
+    # wrapping in bash -lc sources the login shell's PATH.
+    if os.name != "nt":
+        cmd = ["bash", "-lc", " ".join(cmd)]
+
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
+    return result.stdout or "(no logcat output)"
+
+
+def _grab_page_source(driver) -> str:
+    if hasattr(driver, "page_source_xml"):
+        xml = driver.page_source_xml()  # reuses a live snapshot's XML
+    else:
+        xml = getattr(driver, "drv", driver).page_source
+    return xml or "(no page source)"
+
+
+def _format_error(exception: Exception) -> str:
     try:
-        udid = _get_udid(driver)
-        meta = {
-            "timestamp": ts,
-            "device": udid,
-            "step": step,
-            "exception": f"{type(exception).__name__}: {exception}",
-            "platform": "android",
-        }
-        path.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+        tb = "".join(traceback.format_exception(type(exception), exception, exception.__traceback__))
+        return f"{type(exception).__name__}: {exception}\n\n{tb}"
     except Exception as e:
-        _write_note(path, f"meta failed: {e}")
+        return f"error capture failed: {e}"
+
+
+def _format_meta(driver, exception: Exception, step: str, ts: str) -> str:
+    meta = {
+        "timestamp": ts,
+        "device": _get_udid(driver),
+        "step": step,
+        "exception": f"{type(exception).__name__}: {exception}",
+        "platform": "android",
+    }
+    return json.dumps(meta, ensure_ascii=False, indent=2)
 
 
 def _get_udid(driver) -> str:
@@ -1,29 +1,186 @@
 import os
+import base64
 import datetime
+import logging
 import subprocess
+from collections import deque
+
+from src.blob_store import BlobStore
+from src.screenshot_writer import ScreenshotWriter
+
+# artifacts.capture_policy — what routine captures inside a capture scope
+# (one symptom injection) cost:
+#   full        every screenshot / logcat is written (default)
+#   on_failure  routine captures are skipped; failure evidence is always kept
+#   sampled     every `sample_every`-th scope is captured in full
+#   rolling     routine screenshots are held in memory (last `rolling_frames`)
+#               and only written if the scope later fails
+CAPTURE_POLICIES = ("full", "on_failure", "sampled", "rolling")
+
 
 class ArtifactManager:
-    def __init__(self, out_dir: str):
+    def __init__(self, out_dir: str, cfg: dict | None = None):
         self.out_dir = out_dir
+        self.cfg = cfg or {}
         self.ss_dir = os.path.join(out_dir, "screenshots")
         self.log_dir = os.path.join(out_dir, "logs")
         os.makedirs(self.ss_dir, exist_ok=True)
         os.makedirs(self.log_dir, exist_ok=True)
+        self.logcat_buffer = None  # LogcatBuffer attached by AndroidDriver
+        # Debug dumps and screenshots stored once per distinct content
+        self.blobs = None
+        if self.cfg.get("blob_store", True):
+            self.blobs = BlobStore(
+                os.path.join(out_dir, "blobs"),
+                manifest_path=os.path.join(out_dir, "blob_manifest.jsonl"),
+            )
+        # Decode / encode / dedup / write happen off the workflow thread
+        ss_cfg = self.cfg.get("screenshots") or {}
+        self.writer = (
+            ScreenshotWriter(self.ss_dir, ss_cfg, store=self.blobs) if ss_cfg.get("async", True) else None
+        )
+
+        self.policy = self.cfg.get("capture_policy", "full")
+        if self.policy not in CAPTURE_POLICIES:
+            logging.warning("[ARTIFACTS] unknown capture_policy %r — using 'full'", self.policy)
+            self.policy = "full"
+        self.sample_every = max(1, int(self.cfg.get("sample_every", 10)))
+        self._rolling: deque = deque(maxlen=max(1, int(self.cfg.get("rolling_frames", 8))))
+        self._scope: str | None = None
+        self._scope_count = 0
+        self._scope_failed = False
+
+    def child(self, subdir: str) -> "ArtifactManager":
+        """Same settings, rooted at <out_dir>/<subdir> (e.g. one per device)."""
+        return ArtifactManager(os.path.join(self.out_dir, subdir), self.cfg)
+
+    def attach_logcat(self, buffer) -> None:
+        """Serve logcat captures from a running LogcatBuffer instead of adb -d."""
+        self.logcat_buffer = buffer
 
     def _ts(self):
         return datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    def screenshot(self, driver, name: str):
-        path = os.path.join(self.ss_dir, f"{self._ts()}_{name}.png")
+    # ------------------------------------------------------------------
+    # Capture policy
+    # ------------------------------------------------------------------
+
+    def begin_scope(self, name: str) -> None:
+        """Start a capture scope (one injection) that capture_policy applies to."""
+        self._scope = name
+        self._scope_count += 1
+        self._scope_failed = False
+        self._rolling.clear()
+
+    def fail_scope(self) -> list[str]:
+        """
+        The scope hit a failure: write any held rolling frames and capture
+        everything for the rest of the scope. Returns the written paths.
+        """
+        if self._scope is None:
+            return []
+        self._scope_failed = True
+        paths = []
+        while self._rolling:
+            b64, path = self._rolling.popleft()
+            self._write(b64, path)
+            paths.append(path)
+        return paths
+
+    def end_scope(self) -> None:
+        """Close the scope; held rolling frames of a successful scope are dropped."""
+        self._scope = None
+        self._scope_failed = False
+        self._rolling.clear()
+
+    def _routine_mode(self) -> str:
+        """'write', 'buffer' or 'skip' for a routine capture right now."""
+        if self._scope is None or self._scope_failed or self.policy == "full":
+            return "write"
+        if self.policy == "sampled":
+            return "write" if (self._scope_count - 1) % self.sample_every == 0 else "skip"
+        if self.policy == "rolling":
+            return "buffer"
+        return "skip"
+
+    def wants_routine_logcat(self) -> bool:
+        """Routine (non-failure) logcat captures are only taken in 'write' mode."""
+        return self._routine_mode() == "write"
+
+    # ------------------------------------------------------------------
+    # Captures
+    # ------------------------------------------------------------------
+
+    def screenshot(self, driver, name: str, evidence: bool = False):
+        """
+        Capture a screenshot subject to capture_policy. `evidence=True` marks
+        failure evidence: always written, and it releases the rolling buffer.
+        Returns the (future) file path, or "" when the policy skipped it. With
+        the blob store the file name is only the name blob_manifest.jsonl
+        records the frame under; the content lives in blobs/.
+        """
+        if evidence:
+            self.fail_scope()
+            mode = "write"
+        else:
+            mode = self._routine_mode()
+        if mode == "skip":
+            return ""
+        ext = self.writer.ext if self.writer else "png"
+        path = os.path.join(self.ss_dir, f"{self._ts()}_{name}.{ext}")
+        try:
+            if mode == "buffer":
+                self._rolling.append((driver.get_screenshot_as_base64(), path))
+            elif self.writer:
+                # Only the device capture is synchronous; the file appears shortly
+                self.writer.submit(driver.get_screenshot_as_base64(), path, force=evidence)
+            elif self.blobs is not None:
+                self._write(driver.get_screenshot_as_base64(), path)
+            else:
+                driver.get_screenshot_as_file(path)
+        except Exception:
+            pass
+        return path
+
+    def _write(self, b64: str, path: str) -> None:
+        if self.writer:
+            self.writer.submit(b64, path)
+            return
         try:
-            driver.get_screenshot_as_file(path)
+            if self.blobs is not None:
+                self.blobs.put(base64.b64decode(b64), os.path.basename(path), event="screenshot")
+                return
+            with open(path, "wb") as f:
+                f.write(base64.b64decode(b64))
         except Exception:
             pass
+
+    def save_text(self, name: str, text: str, event: str = "") -> str:
+        """
+        Persist a debug dump (e.g. page source). With the blob store enabled
+        the content is stored once per distinct hash and the blob path is
+        returned; otherwise it is written to log_dir as before.
+        """
+        filename = f"{self._ts()}_{name}"
+        if self.blobs is not None:
+            sha = self.blobs.put(text, filename, event=event or name)
+            return str(self.blobs.path_for(sha, compressed=True))
+        path = os.path.join(self.log_dir, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
         return path
 
+    def close(self, timeout: float = 30) -> None:
+        """Wait for queued screenshots to reach disk (call before exiting)."""
+        if self.writer:
+            self.writer.flush(timeout=timeout)
+
     def collect_android_logcat(self, name: str = "logcat", seconds: int = 2):
         # best-effort short capture
         path = os.path.join(self.log_dir, f"{self._ts()}_{name}.txt")
+        if self.logcat_buffer is not None and self.logcat_buffer.running:
+            # Ring buffer: last `seconds` of log, no new process per capture
+            return self.logcat_buffer.dump(path, before=seconds)
         try:
             # Windows has no bash; run adb directly. On Mac/Linux use bash -lc
             # so that adb installed via Homebrew (not on default PATH) is found.
@@ -0,0 +1,120 @@
+"""
+Content-addressed artifact store.
+
+Page-source dumps, logcat windows and failure screenshots repeat a lot over
+a multi-day run: recovery loops dump the same hierarchy again and again.
+BlobStore keeps each distinct content once, named by its SHA-256:
+
+    <root>/ab/abcdef…0123.gz     gzip-compressed text / XML
+    <root>/ab/abcdef…0123        already-compressed media (png / jpg / webp)
+
+and appends one line per stored artifact to a JSONL manifest, so every
+event still maps to its content:
+
+    {"ts": "...", "event": "picker_closed_x", "name": "…_picker_closed_x.xml",
+     "blob": "abcdef…0123", "size": 51234, "new": false}
+
+read_artifact() resolves a file in a failure folder either from disk or, if
+the folder's manifest.json points it at a blob, from the store — the web
+failure views use it so both layouts display the same.
+"""
+
+import datetime
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+# Already compressed — gzip would only cost CPU
+_RAW_EXTS = {".png", ".jpg", ".jpeg", ".webp"}
+
+
+class BlobStore:
+    def __init__(self, root: str | Path, manifest_path: str | Path | None = None):
+        self.root = Path(root)
+        self.manifest_path = Path(manifest_path) if manifest_path else None
+        self._lock = threading.Lock()
+
+    def path_for(self, sha: str, compressed: bool) -> Path:
+        return self.root / sha[:2] / (sha + (".gz" if compressed else ""))
+
+    def put(self, data: bytes | str, name: str, event: str = "") -> str:
+        """Store `data` (once per distinct content) and record it. Returns the hash."""
+        raw = data.encode("utf-8") if isinstance(data, str) else data
+        sha = hashlib.sha256(raw).hexdigest()
+        compressed = Path(name).suffix.lower() not in _RAW_EXTS
+        path = self.path_for(sha, compressed)
+        new = not path.exists()
+        if new:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(gzip.compress(raw, compresslevel=6) if compressed else raw)
+            os.replace(tmp, path)
+        self._record({
+            "ts": datetime.datetime.now().isoformat(timespec="seconds"),
+            "event": event,
+            "name": name,
+            "blob": sha,
+            "size": len(raw),
+            "new": new,
+        })
+        return sha
+
+    def ref(self, sha: str, name: str, event: str = "") -> None:
+        """Record `name` as another occurrence of already-stored content `sha`."""
+        self._record({
+            "ts": datetime.datetime.now().isoformat(timespec="seconds"),
+            "event": event,
+            "name": name,
+            "blob": sha,
+            "new": False,
+        })
+
+    def get(self, sha: str) -> bytes | None:
+        """Content for `sha`, or None if it is not in the store."""
+        gz = self.path_for(sha, True)
+        if gz.exists():
+            return gzip.decompress(gz.read_bytes())
+        plain = self.path_for(sha, False)
+        return plain.read_bytes() if plain.exists() else None
+
+    def _record(self, rec: dict) -> None:
+        if self.manifest_path is None:
+            return
+        try:
+            with self._lock, open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logging.info("[BLOBS] manifest write failed: %s", e)
+
+
+def read_artifact(folder: str | Path, name: str, store: BlobStore) -> bytes | None:
+    """
+    `name` from a failure folder: the file itself if present, else the blob
+    its manifest.json entry points at. None if neither exists.
+    """
+    folder = Path(folder)
+    path = folder / name
+    if path.is_file():
+        return path.read_bytes()
+    try:
+        manifest = json.loads((folder / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    sha = (manifest.get(name) or {}).get("blob")
+    return store.get(sha) if sha else None
+
+
+def artifact_names(folder: str | Path) -> list[str]:
+    """Files in a failure folder, including those stored as blobs."""
+    folder = Path(folder)
+    names = {f.name for f in folder.iterdir() if f.is_file()}
+    try:
+        manifest = json.loads((folder / "manifest.json").read_text(encoding="utf-8"))
+        names.update(n for n, e in manifest.items() if e.get("blob"))
+    except (OSError, ValueError):
+        pass
+    return sorted(names)
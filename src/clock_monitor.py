@@ -0,0 +1,97 @@
+"""
+Host sleep/wake and clock-jump detection.
+
+ClockMonitor wakes every `interval_sec` and compares how far the wall clock
+and the monotonic clock moved since its last tick:
+
+  - wall moved, monotonic did not (much)   → host was suspended
+    (CLOCK_MONOTONIC / mach time stop while the machine sleeps)
+  - both moved far more than interval_sec  → suspended, on platforms whose
+    monotonic clock keeps running during sleep
+  - wall moved differently from monotonic  → wall clock was stepped
+    (NTP correction, manual change, DST handled by the OS)
+
+Where the OS offers CLOCK_BOOTTIME (Linux: counts suspended time) the two
+cases are told apart exactly; elsewhere a forward wall-clock step looks like
+a short suspend, which warrants the same reconnect.
+
+Either way it logs `clock_jump_detected` and calls `on_jump(info)` so the
+scheduler can reconnect ADB / Appium right away instead of on the next job.
+"""
+
+import logging
+import threading
+import time
+
+_BOOTTIME = getattr(time, "CLOCK_BOOTTIME", None)
+
+
+def _boottime() -> float | None:
+    return time.clock_gettime(_BOOTTIME) if _BOOTTIME is not None else None
+
+
+class ClockMonitor:
+    def __init__(self, reporter, on_jump=None, interval_sec: float = 10.0, threshold_sec: float = 30.0):
+        self.reporter = reporter
+        self.on_jump = on_jump
+        self.interval = float(interval_sec)
+        self.threshold = float(threshold_sec)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "ClockMonitor":
+        self._thread = threading.Thread(target=self._run, name="clock-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+
+    def _run(self) -> None:
+        wall0, mono0, boot0 = time.time(), time.monotonic(), _boottime()
+        while not self._stop.wait(self.interval):
+            wall1, mono1, boot1 = time.time(), time.monotonic(), _boottime()
+            boot = None if boot0 is None else boot1 - boot0
+            info = self.check(wall1 - wall0, mono1 - mono0, boot)
+            wall0, mono0, boot0 = wall1, mono1, boot1
+            if info is None:
+                continue
+            self.reporter.log_event("clock_jump_detected", info)
+            logging.warning("[CLOCK] %s: wall %+.0fs, monotonic %+.0fs",
+                            info["kind"], info["wall_elapsed_sec"], info["mono_elapsed_sec"])
+            if self.on_jump is not None:
+                try:
+                    self.on_jump(info)
+                except Exception as e:
+                    logging.warning("[CLOCK] on_jump handler failed: %s", e)
+
+    def check(self, wall_elapsed: float, mono_elapsed: float, boot_elapsed: float | None = None) -> dict | None:
+        """Classify one tick; None when the clocks advanced as expected."""
+        if boot_elapsed is not None:
+            slept = boot_elapsed - mono_elapsed      # time spent suspended
+            step = wall_elapsed - boot_elapsed       # wall clock adjustment
+            if slept > self.threshold:
+                kind, jump = "suspend", slept
+            elif abs(step) > self.threshold:
+                kind, jump = "wall_clock_step", step
+            else:
+                return None
+        else:
+            skew = wall_elapsed - mono_elapsed
+            stalled = max(wall_elapsed, mono_elapsed) - self.interval
+            if skew > self.threshold:
+                kind, jump = "suspend", skew          # wall ran on while monotonic was frozen
+            elif stalled > self.threshold and abs(skew) <= self.threshold:
+                kind, jump = "suspend", stalled       # monotonic counts sleep on this platform
+            elif abs(skew) > self.threshold:
+                kind, jump = "wall_clock_step", skew
+            else:
+                return None
+        return {
+            "kind": kind,
+            "jump_sec": round(jump, 1),
+            "wall_elapsed_sec": round(wall_elapsed, 1),
+            "mono_elapsed_sec": round(mono_elapsed, 1),
+        }
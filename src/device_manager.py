@@ -1,52 +1,157 @@
 """
-DeviceManager — single-device wrapper, multi-device ready.
-
-Current design: manages one AndroidDriver.
-Multi-device extension path:
-  - Accept config["devices"] as a list
-  - Create one AndroidDriver + ArtifactManager sub-dir per device UDID
-  - Yield drivers via iteration, not a single `.driver` property
-  - Run jobs concurrently with threading or multiprocessing
-  No global singletons are used, so callers are already compatible.
+DeviceManager — one AndroidDriver per device, run side by side.
+
+Single device (no `devices:` list in the config): one driver that shares
+the run's ArtifactManager and RunReporter, exactly as before.
+
+Multiple devices (`devices:` list): each entry is merged over the `android:`
+section and gets its own slot:
+  - AndroidDriver            (own Appium session and UiAutomator2 systemPort)
+  - ArtifactManager          <out_dir>/devices/<udid>/
+  - RunReporter              <out_dir>/devices/<udid>/events.jsonl
+run_parallel() runs a callable for every slot on its own thread — each
+device does its own measurement start and long-run schedule — and returns
+the per-device outcome. No global singletons are used.
 """
 
+import dataclasses
+import logging
+import re
+import threading
+
+from src.artifacts import ArtifactManager
 from src.driver import AndroidDriver
+from src.reporter import RunReporter
+
+# UiAutomator2 systemPort range for parallel sessions (one port per device)
+_SYSTEM_PORT_BASE = 8200
+
+
+@dataclasses.dataclass
+class DeviceSlot:
+    """Everything that belongs to one device of the run."""
+    udid: str
+    cfg: dict
+    artifacts: ArtifactManager
+    reporter: RunReporter
+    driver: AndroidDriver | None = None
+    error: str = ""
+
+
+def device_dirname(udid: str) -> str:
+    """ip:port and serials → a directory name valid on every OS."""
+    return re.sub(r"[^A-Za-z0-9._-]", "_", udid) or "device"
 
 
 class DeviceManager:
     """
-    Wraps a single AndroidDriver.
+    Owns the device slots of a run.
 
-    Designed so future multi-device implementations can replace this class
-    without changing the caller interface — the driver is accessed via the
-    `.driver` property, which can later become `.__iter__()`.
+    `.driver` still returns the first (or only) device's driver, connecting
+    it on first use; multi-device callers iterate the slots or use
+    run_parallel().
     """
 
     def __init__(
         self,
         device_cfg: dict,
         selectors: dict,
-        artifacts,
-        reporter,
+        artifacts: ArtifactManager,
+        reporter: RunReporter,
+        popup_rules: list[dict] | None = None,
+        workflows: dict | None = None,
+        devices: list[dict] | None = None,
     ):
-        self._udid = device_cfg.get("udid", "device")
-        self._driver = AndroidDriver(device_cfg, selectors, artifacts, reporter)
+        self._selectors = selectors
+        self._popup_rules = popup_rules
+        self._workflows = workflows
+        self.slots: list[DeviceSlot] = []
+
+        if not devices:
+            self.slots.append(DeviceSlot(device_cfg.get("udid", "device"), device_cfg, artifacts, reporter))
+            self.connect(self.slots[0])
+            return
+
+        for i, override in enumerate(devices):
+            cfg = {**device_cfg, **(override or {})}
+            udid = cfg.get("udid") or f"device{i + 1}"
+            cfg.setdefault("system_port", _SYSTEM_PORT_BASE + i)
+            sub = f"devices/{device_dirname(udid)}"
+            self.slots.append(DeviceSlot(
+                udid=udid,
+                cfg=cfg,
+                artifacts=artifacts.child(sub),
+                reporter=reporter.child(sub, label=cfg.get("device_name") or udid),
+            ))
 
     # ------------------------------------------------------------------
-    # Single-device interface
+    # Slots
     # ------------------------------------------------------------------
 
+    def connect(self, slot: DeviceSlot) -> AndroidDriver:
+        """Create the slot's driver (opens the Appium session) if needed."""
+        if slot.driver is None:
+            slot.driver = AndroidDriver(
+                slot.cfg, self._selectors, slot.artifacts, slot.reporter,
+                self._popup_rules, self._workflows,
+            )
+        return slot.driver
+
+    def __iter__(self):
+        return iter(self.slots)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
     @property
     def driver(self) -> AndroidDriver:
-        """Return the single managed driver."""
-        return self._driver
+        """Return the first managed device's driver."""
+        return self.connect(self.slots[0])
 
     @property
     def udid(self) -> str:
-        return self._udid
+        return self.slots[0].udid
+
+    # ------------------------------------------------------------------
+    # Parallel execution
+    # ------------------------------------------------------------------
+
+    def run_parallel(self, fn) -> dict[str, str]:
+        """
+        Call fn(slot) for every slot, each on its own thread, and wait for all.
+
+        The slot's driver is connected inside its thread, so one device that
+        cannot connect does not hold up (or fail) the others. Returns
+        {udid: error message, "" when fn returned normally}.
+        """
+        def _run(slot: DeviceSlot) -> None:
+            try:
+                self.connect(slot)
+                fn(slot)
+            except Exception as e:
+                slot.error = str(e) or type(e).__name__
+                logging.exception("[DEVICES] %s failed", slot.udid)
+                slot.reporter.log_event("device_failed", {"udid": slot.udid, "error": slot.error})
+
+        threads = [
+            threading.Thread(target=_run, args=(slot,), name=f"device-{slot.udid}")
+            for slot in self.slots
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return {slot.udid: slot.error for slot in self.slots}
 
     def close(self):
-        try:
-            self._driver.close()
-        except Exception:
-            pass
+        for slot in self.slots:
+            if slot.driver is None:
+                continue
+            try:
+                slot.driver.close()
+            except Exception:
+                pass
+            try:
+                slot.artifacts.close()
+            except Exception:
+                pass
@@ -1,20 +1,30 @@
+import dataclasses
+import hashlib
 import logging
+import re
 import subprocess
 import time
+import xml.etree.ElementTree as ET
 
 from appium import webdriver
 from appium.options.android.uiautomator2.base import UiAutomator2Options
-from selenium.webdriver.common.by import By
+from appium.webdriver.common.appiumby import AppiumBy as By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import (
     TimeoutException,
     WebDriverException,
     InvalidSessionIdException,
+    InvalidSelectorException,
+    NoSuchElementException,
 )
 
 from src.retry import retry
 from src.artifacts import ArtifactManager
+from src.locator_cache import LocatorCache, DEFAULT_CACHE_PATH
+from src.logcat_buffer import LogcatBuffer
+from src.adb_shell import shell_for, static_props
+from src.hierarchy import HierarchyIndex
 from src.reporter import RunReporter
 
 # Substrings in exception messages that indicate the Appium session or ADB
@@ -30,6 +40,31 @@ _SESSION_ERROR_PHRASES = (
     "broken pipe",
 )
 
+# Adaptive wait_idle tuning: shorter waits are plain sleeps; otherwise settle
+# briefly, then poll the hierarchy hash until two reads match.
+_IDLE_ADAPTIVE_MIN_SEC = 1.0
+_IDLE_SETTLE_SEC = 0.3
+_IDLE_POLL_SEC = 0.4
+
+# wait_any() poll interval — one hierarchy fetch (or combined query) per tick
+_WAIT_ANY_POLL_SEC = 0.5
+
+# Values that can plausibly be a resource-id (no spaces / non-ASCII text).
+_RESOURCE_ID_RE = re.compile(r"^[A-Za-z0-9_.:/]+$")
+
+
+def _ui_quote(value: str) -> str:
+    """Escape a value for use inside a UiSelector string literal."""
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+@dataclasses.dataclass
+class LocatorMatch:
+    """Result of AndroidDriver.find_any(): the element plus what matched it."""
+    element: object
+    candidate: str
+    strategy: str
+
 
 class AndroidDriver:
     def __init__(
@@ -38,13 +73,30 @@ class AndroidDriver:
         selectors: dict,
         artifacts: ArtifactManager,
         reporter: RunReporter,
+        popup_rules: list[dict] | None = None,
+        workflows: dict | None = None,
     ):
         self.cfg = a_cfg
         self.sel = selectors
+        self.popup_rules = popup_rules or None  # None → DEFAULT_POPUP_RULES
+        self.workflows = workflows or {}        # workflows.android — step/budget overrides
         self.artifacts = artifacts
         self.reporter = reporter
         self._last_adb_reconnect_at: float = 0.0
+        # Monotonic time of the last verified session + UI health (None = unverified)
+        self._healthy_at: float | None = None
+        self._health_ttl = float(a_cfg.get("health_cache_ttl_sec", 600))
+        self._snapshot: HierarchyIndex | None = None
+        self._combined_queries = bool(a_cfg.get("combined_locators", True))
+        self._sel_keys: dict | None = None
+        self._app_version: str | None = None
+        self._device_id: str | None = None
+        self._locator_cache = (
+            LocatorCache(a_cfg.get("locator_cache_path", DEFAULT_CACHE_PATH))
+            if a_cfg.get("locator_cache", True) else None
+        )
         self.drv = self._connect()
+        self.logcat_buffer = self._start_logcat_buffer()
 
     # ------------------------------------------------------------------
     # Connection
@@ -74,12 +126,38 @@ class AndroidDriver:
                     pass
         if udid:
             opts.udid = udid
+        if self.cfg.get("system_port"):
+            # Parallel sessions on one Appium server need distinct ports
+            opts.system_port = int(self.cfg["system_port"])
         if self.cfg.get("app_package"):
             opts.app_package = self.cfg["app_package"]
         if self.cfg.get("app_activity"):
             opts.app_activity = self.cfg["app_activity"]
         return opts
 
+    def _start_logcat_buffer(self) -> LogcatBuffer | None:
+        """Start the background logcat reader (android.logcat_buffer)."""
+        lc = self.cfg.get("logcat_buffer") or {}
+        if not lc.get("enabled", True):
+            return None
+        try:
+            buffer = LogcatBuffer(
+                udid=self.cfg.get("udid", ""),
+                max_lines=int(lc.get("max_lines", 50000)),
+                package=self.cfg.get("app_package", "") if lc.get("app_only") else "",
+                tags=lc.get("tags") or [],
+            ).start()
+            self.artifacts.attach_logcat(buffer)
+            self.reporter.log_event("logcat_buffer_started", {
+                "max_lines": buffer._lines.maxlen,
+                "app_only": bool(lc.get("app_only")),
+                "tags": buffer.tags,
+            })
+            return buffer
+        except Exception as e:
+            self.reporter.log_event("logcat_buffer_failed", {"error": str(e)})
+            return None
+
     def _connect(self) -> webdriver.Remote:
         server = self.cfg.get("appium_server_url", "http://127.0.0.1:4723")
         self.reporter.log_event("appium_connect", {"server": server})
@@ -150,6 +228,8 @@ class AndroidDriver:
         """
         logging.warning("[SESSION] recreating driver")
         self.reporter.log_event("session_recreating", {})
+        self.invalidate_snapshot()
+        self.invalidate_health()
         self._last_adb_reconnect_at = 0.0  # reset cooldown: real disconnection must always reconnect
         self._ensure_adb_connected()
         try:
@@ -189,12 +269,73 @@ class AndroidDriver:
             self.reporter.log_event("session_lost", {"reason": "session_not_alive"})
             self.reconnect()
 
+    def on_wake(self) -> None:
+        """
+        Host resumed from sleep (or its clock jumped): restore the WiFi ADB
+        link and the Appium session now instead of at the next job, so the
+        first catch-up injection does not start on a dead connection.
+        """
+        logging.info("[SESSION] host wake — reconnecting ADB / Appium")
+        self.reporter.log_event("wake_reconnect", {})
+        self.invalidate_snapshot()
+        self.invalidate_health()
+        self._last_adb_reconnect_at = 0.0  # a wake always re-checks the link
+        self._ensure_adb_connected()
+        self.ensure_session()
+
     def close(self):
+        if self.logcat_buffer is not None:
+            self.logcat_buffer.stop()
+        self.adb.close()
         try:
             self.drv.quit()
         except Exception:
             pass
 
+    # ------------------------------------------------------------------
+    # Screen snapshot — one page_source fetch answers many visibility checks
+    # ------------------------------------------------------------------
+
+    def take_snapshot(self) -> bool:
+        """
+        Fetch page_source once and answer is_visible_text() from it until the
+        next tap, keypress, idle wait or recovery action invalidates it.
+
+        Do NOT call this while the symptom picker is open: page_source fires
+        accessibility events that can dismiss the React Native bottom sheet.
+
+        Returns False (and leaves live lookups in place) when snapshots are
+        disabled via `snapshot_checks: false` or the fetch/parse fails.
+        """
+        self._snapshot = None
+        if not self.cfg.get("snapshot_checks", True):
+            return False
+        try:
+            self._snapshot = self.hierarchy()
+            return True
+        except Exception as e:
+            logging.info("[SNAPSHOT] page_source snapshot failed: %s", e)
+            return False
+
+    def invalidate_snapshot(self) -> None:
+        self._snapshot = None
+
+    def hierarchy(self) -> HierarchyIndex:
+        """
+        Index of the current screen. Reuses the live snapshot when there is
+        one; otherwise fetches page_source once (without making it the
+        snapshot, so later is_visible_text() calls still run live).
+        """
+        if self._snapshot is not None:
+            return self._snapshot
+        return HierarchyIndex(self.drv.page_source, self.cfg.get("app_package", ""))
+
+    def page_source_xml(self) -> str:
+        """Raw hierarchy XML — the snapshot's copy when one is live, else a fresh fetch."""
+        if self._snapshot is not None:
+            return self._snapshot.xml
+        return self.drv.page_source
+
     # ------------------------------------------------------------------
     # Locator helpers — priority: resource-id > content-desc > text > xpath
     # ------------------------------------------------------------------
@@ -211,17 +352,90 @@ class AndroidDriver:
             (By.ANDROID_UIAUTOMATOR, f'new UiSelector().textContains("{value}")'),
         ]
 
-    def find(
+    def _statement(self, value: str, strategy: str) -> str:
+        """One UiSelector statement for a (candidate, strategy) pair."""
+        if strategy == "resourceId":
+            pkg = self.cfg.get("app_package", "")
+            value = value if ":id/" in value else f"{pkg}:id/{value}"
+        return f'new UiSelector().{strategy}("{_ui_quote(value)}")'
+
+    def _statements(
         self,
-        value: str,
-        timeout: int = 10,
-        contains: bool = False,
-    ):
+        texts: list[str],
+        contains: bool,
+        hint: tuple[str, str] | None = None,
+        exact: bool = False,
+    ) -> list[tuple[str, str]]:
         """
-        Find element trying priority order of selectors.
-        If `contains=True`, skip resource-id/accessibility attempts and go
-        straight to textContains (useful for partial Korean text).
+        (candidate, strategy) pairs in the order the combined query tries them.
+        exact=True drops the textContains fallback.
         """
+        pairs = [hint] if hint else []
+        for t in texts:
+            if not contains:
+                if _RESOURCE_ID_RE.match(t):
+                    pairs.append((t, "resourceId"))
+                pairs.append((t, "description"))
+                pairs.append((t, "text"))
+            if not exact:
+                pairs.append((t, "textContains"))
+        return pairs
+
+    def _uiautomator_any(
+        self,
+        texts: list[str],
+        contains: bool,
+        hint: tuple[str, str] | None = None,
+        exact: bool = False,
+    ) -> str:
+        """
+        Build ONE UiAutomator query covering every candidate and strategy.
+
+        UiAutomator2 accepts several `;`-separated UiSelector statements and
+        returns the first statement that matches, so the device resolves
+        "any of these" in a single HTTP call. Statement order keeps the
+        per-candidate priority of _locators_for():
+        resource-id > content-desc > text > textContains.
+        A learned (candidate, strategy) `hint` is tried before all of them.
+        """
+        return ";".join(self._statement(*p) for p in self._statements(texts, contains, hint, exact))
+
+    def _find_combined(
+        self,
+        texts: list[str],
+        timeout: int,
+        contains: bool,
+        hint: tuple[str, str] | None = None,
+        exact: bool = False,
+    ):
+        """Wait for any candidate via one combined query per poll."""
+        if self._combined_queries:
+            locator = (By.ANDROID_UIAUTOMATOR, self._uiautomator_any(texts, contains, hint, exact))
+            try:
+                return WebDriverWait(self.drv, timeout).until(
+                    EC.presence_of_element_located(locator)
+                )
+            except InvalidSelectorException as e:
+                # Older UiAutomator2 servers reject multi-statement queries —
+                # fall back to one lookup per candidate for the rest of the run.
+                logging.warning("[LOCATOR] combined query rejected, using per-candidate lookups: %s", e)
+                self._combined_queries = False
+        if hint:
+            texts = [hint[0]] + [t for t in texts if t != hint[0]]
+        return self._find_each(texts, timeout, contains, exact)
+
+    def _find_each(self, texts: list[str], timeout: int, contains: bool, exact: bool = False):
+        """Legacy path: try each candidate in turn with the full locator ladder."""
+        per = max(timeout // len(texts), 2)
+        last_exc: Exception = NoSuchElementException(f"Could not find any of: {texts}")
+        for t in texts:
+            try:
+                return self._find_one(t, per, contains, exact)
+            except Exception as e:
+                last_exc = e
+        raise last_exc
+
+    def _find_one(self, value: str, timeout: int, contains: bool, exact: bool = False):
         if contains:
             locator = (
                 By.ANDROID_UIAUTOMATOR,
@@ -232,7 +446,8 @@ class AndroidDriver:
             )
 
         last_exc = None
-        for locator in self._locators_for(value):
+        locators = self._locators_for(value)
+        for locator in locators[:3] if exact else locators:
             try:
                 return WebDriverWait(self.drv, 2).until(
                     EC.presence_of_element_located(locator)
@@ -240,11 +455,11 @@ class AndroidDriver:
             except Exception as e:
                 last_exc = e
 
-        # Final wait with textContains as fallback
+        # Final wait with textContains as fallback (exact text when exact=True)
         try:
             locator = (
                 By.ANDROID_UIAUTOMATOR,
-                f'new UiSelector().textContains("{value}")',
+                f'new UiSelector().{"text" if exact else "textContains"}("{value}")',
             )
             return WebDriverWait(self.drv, timeout).until(
                 EC.presence_of_element_located(locator)
@@ -254,37 +469,171 @@ class AndroidDriver:
 
         raise last_exc
 
+    def _matched_candidate(
+        self, el, texts: list[str], contains: bool, use_snapshot: bool = True, exact: bool = False,
+    ) -> tuple[str, str]:
+        """
+        Work out which candidate (and which strategy) produced `el`.
+        A live snapshot answers it with no device call (the first statement
+        it matches is the one the device matched); otherwise reads as few
+        attributes as possible — usually just `text`.
+        """
+        if contains and len(texts) == 1:
+            return texts[0], "textContains"
+        if use_snapshot and self._snapshot is not None:
+            for t, strategy in self._statements(texts, contains, exact=exact):
+                if self._snapshot.matches(t, strategy):
+                    return t, strategy
+        try:
+            text = el.get_attribute("text") or ""
+            if not contains:
+                for t in texts:
+                    if t == text:
+                        return t, "text"
+            for t in texts:
+                if t in text and not exact:
+                    return t, "textContains"
+            if not contains:
+                desc = el.get_attribute("content-desc") or ""
+                for t in texts:
+                    if t == desc:
+                        return t, "description"
+                rid = el.get_attribute("resource-id") or ""
+                for t in texts:
+                    if rid == t or rid.endswith(f":id/{t}"):
+                        return t, "resourceId"
+        except Exception:
+            pass
+        return texts[0], "unknown"
+
+    def _selector_key(self, texts: list[str]) -> str | None:
+        """Reverse-map a candidate list back to its `selectors` key, if any."""
+        if self._sel_keys is None:
+            self._sel_keys = {}
+            for k, v in (self.sel or {}).items():
+                vals = [v] if isinstance(v, str) else list(v or [])
+                vals = tuple(x for x in vals if x)
+                if vals:
+                    self._sel_keys.setdefault(vals, k)
+        return self._sel_keys.get(tuple(texts))
+
+    def _cached_hint(
+        self, key: str | None, texts: list[str], contains: bool, exact: bool = False,
+    ) -> tuple[str, str] | None:
+        if not key or self._locator_cache is None:
+            return None
+        entry = self._locator_cache.get(key, self.app_version)
+        if not entry or entry.get("candidate") not in texts:
+            return None
+        strategy = entry.get("strategy", "textContains")
+        if contains:
+            strategy = "textContains"  # contains mode only ever matches by text
+        if exact and strategy == "textContains":
+            return None   # a substring hint must not widen an exact lookup
+        return entry["candidate"], strategy
+
+    def _locate(
+        self,
+        texts: list[str],
+        timeout: int,
+        contains: bool,
+        resolve: bool = False,
+        exact: bool = False,
+    ) -> LocatorMatch:
+        """
+        Shared lookup for find/find_any/is_visible_text.
+
+        Tries the learned (candidate, strategy) for this selector key first,
+        then every other candidate in the same query. On a cold key — or when
+        the caller wants the match reported — works out what matched and
+        updates the locator cache. exact=True (implies contains=False) matches
+        resource-id, content-desc and text exactly, with no textContains.
+        """
+        texts = [t for t in texts if t]
+        if not texts:
+            raise NoSuchElementException("No locator candidates given")
+        if exact:
+            contains = False
+        key = self._selector_key(texts)
+        hint = self._cached_hint(key, texts, contains, exact)
+        el = self._find_combined(texts, timeout, contains, hint, exact)
+
+        candidate, strategy = "", ""
+        if resolve or (key and self._locator_cache is not None and hint is None):
+            candidate, strategy = self._matched_candidate(el, texts, contains, exact=exact)
+            if key and self._locator_cache is not None and strategy != "unknown" \
+                    and (candidate, strategy) != hint:
+                self._locator_cache.record(key, self.app_version, candidate, strategy)
+        return LocatorMatch(el, candidate, strategy)
+
+    def find_any(
+        self,
+        candidates: str | list,
+        timeout: int = 10,
+        contains: bool = False,
+    ) -> LocatorMatch:
+        """
+        Find the first element matching any candidate in one combined query.
+        Returns a LocatorMatch reporting which candidate and strategy matched.
+        """
+        texts = [candidates] if isinstance(candidates, str) else list(candidates)
+        match = self._locate(texts, timeout, contains, resolve=True)
+        logging.debug("[LOCATOR] matched %r via %s (candidates=%r)", match.candidate, match.strategy, texts)
+        return match
+
+    def find(
+        self,
+        value: str | list,
+        timeout: int = 10,
+        contains: bool = False,
+        exact: bool = False,
+    ):
+        """
+        Find element trying priority order of selectors.
+        `value` may be a single string or a list of candidates; all of them
+        are resolved together in one combined UiAutomator query.
+        If `contains=True`, skip resource-id/accessibility attempts and go
+        straight to textContains (useful for partial Korean text).
+        If `exact=True`, never fall back to textContains.
+        """
+        texts = [value] if isinstance(value, str) else list(value)
+        return self._locate(texts, timeout, contains, exact=exact).element
+
     # Legacy alias used by workflows
     def find_text(self, text: str, timeout: int = 10, contains: bool = False):
         return self.find(text, timeout=timeout, contains=contains)
 
     @retry(tries=3, delay=2)
-    def tap_text(self, text: str | list, timeout: int = 10, contains: bool = True):
-        texts = [text] if isinstance(text, str) else text
-        per = max(timeout // len(texts), 2)
-        last_exc: Exception = Exception(f"Could not find any of: {texts}")
-        for t in texts:
-            try:
-                el = self.find(t, timeout=per, contains=contains)
-                loc = el.location
-                sz = el.size
-                cx = loc["x"] + sz["width"] // 2
-                cy = loc["y"] + sz["height"] // 2
-                self.drv.tap([(cx, cy)])
-                return True
-            except Exception as e:
-                last_exc = e
-        raise last_exc
+    def tap_text(
+        self, text: str | list, timeout: int = 10, contains: bool = True, deadline=None, exact: bool = False,
+    ):
+        """
+        Find and tap. With a `deadline` (workflows.engine.Deadline) each
+        attempt's wait is capped by it and no retry starts once it has run out.
+        exact=True taps only an exact resource-id / content-desc / text match.
+        """
+        if deadline is not None:
+            timeout = deadline.cap(timeout)
+        # No match report needed: only a cold locator-cache key is resolved,
+        # and the snapshot (dropped just before the tap) can still answer it
+        texts = [text] if isinstance(text, str) else list(text)
+        el = self._locate(texts, timeout, contains, exact=exact).element
+        self.invalidate_snapshot()
+        rect = el.rect   # one round trip (location + size would be two)
+        self.drv.tap([(rect["x"] + rect["width"] // 2, rect["y"] + rect["height"] // 2)])
+        return True
 
-    def is_visible_text(self, text: str | list, contains: bool = True, timeout: int = 2) -> bool:
+    def is_visible_text(
+        self, text: str | list, contains: bool = True, timeout: int = 2, exact: bool = False,
+    ) -> bool:
         texts = [text] if isinstance(text, str) else text
-        for t in texts:
-            try:
-                self.find(t, timeout=timeout, contains=contains)
-                return True
-            except Exception:
-                pass
-        return False
+        if self._snapshot is not None:
+            return any(self._snapshot.has(t, contains=contains, exact=exact) for t in texts)
+        try:
+            self.find(texts, timeout=timeout, contains=contains, exact=exact)
+            return True
+        except Exception:
+            return False
 
     # ------------------------------------------------------------------
     # Session-safe action wrappers
@@ -298,9 +647,13 @@ class AndroidDriver:
         WebDriverException messages (e.g. "socket hang up", "connection reset").
         """
         if isinstance(exc, (InvalidSessionIdException, OSError)):
-            return True
-        msg = str(exc).lower()
-        return any(phrase in msg for phrase in _SESSION_ERROR_PHRASES)
+            lost = True
+        else:
+            msg = str(exc).lower()
+            lost = any(phrase in msg for phrase in _SESSION_ERROR_PHRASES)
+        if lost:
+            self.invalidate_health()
+        return lost
 
     def safe_tap(self, text: str | list, timeout: int = 10, contains: bool = True) -> bool:
         """
@@ -328,6 +681,7 @@ class AndroidDriver:
 
         Raises the original exception unchanged if the error is not session-related.
         """
+        self.invalidate_snapshot()
         try:
             el = self.find(locator, timeout=timeout)
             el.send_keys(text)
@@ -341,20 +695,39 @@ class AndroidDriver:
             else:
                 raise
 
+    def press_keycode(self, keycode: int) -> None:
+        """Send an Android keycode (e.g. 4 = KEYCODE_BACK); invalidates the snapshot."""
+        self.invalidate_snapshot()
+        self.drv.press_keycode(keycode)
+
     # ------------------------------------------------------------------
     # Artifact helpers
     # ------------------------------------------------------------------
 
-    def screenshot(self, name: str) -> str:
-        return self.artifacts.screenshot(self.drv, name)
+    def screenshot(self, name: str, evidence: bool = False) -> str:
+        """Screenshot under artifacts.capture_policy; evidence=True always writes."""
+        return self.artifacts.screenshot(self.drv, name, evidence=evidence)
 
-    def logcat(self, name: str = "logcat") -> str:
+    def logcat(self, name: str = "logcat", evidence: bool = False) -> str:
         """
         Capture device logcat via ArtifactManager and emit reporter events.
 
+        Routine captures follow artifacts.capture_policy (None when the
+        policy skips them); evidence=True always captures.
+
+        With the logcat ring buffer running this writes the last
+        `logcat_buffer.window_seconds` of log instantly; otherwise it falls
+        back to a one-shot `adb logcat -d`.
+
         Returns the path to the saved log file on success, or None on failure.
         """
+        if evidence:
+            self.artifacts.fail_scope()
+        elif not self.artifacts.wants_routine_logcat():
+            return None
         seconds = 2
+        if self.logcat_buffer is not None:
+            seconds = int((self.cfg.get("logcat_buffer") or {}).get("window_seconds", 60))
         try:
             self.reporter.log_event("artifact_logcat_start", {"name": name, "seconds": seconds})
         except Exception:
@@ -386,6 +759,7 @@ class AndroidDriver:
     # ------------------------------------------------------------------
 
     def bring_to_foreground(self):
+        self.invalidate_snapshot()
         pkg = self.cfg.get("app_package")
         if not pkg:
             return
@@ -411,12 +785,13 @@ class AndroidDriver:
         """
         pkg = self.cfg.get("app_package")
         act = self.cfg.get("app_activity")
+        self.invalidate_snapshot()
 
         try:
             if step == 1:
                 # Step 1: Send back key and wait for app to settle
                 self.reporter.log_event("recovery_step_1", {"action": "press_back"})
-                self.drv.press_keycode(4)  # KEYCODE_BACK
+                self.press_keycode(4)  # KEYCODE_BACK
                 self.wait_idle(1.0)
                 return True
 
@@ -455,25 +830,105 @@ class AndroidDriver:
             # UiAutomator2 instrumentation crashes and call reconnect().
             raise
 
+    def wait_any(
+        self,
+        selectors: dict,
+        timeout: float,
+        contains: bool = True,
+        live: bool = False,
+        poll: float = _WAIT_ANY_POLL_SEC,
+    ) -> tuple[str | None, float]:
+        """
+        Wait until any of several outcomes appears on screen.
+
+        `selectors` maps an outcome name to a selector (string or list of
+        candidates); when several are visible at once the earlier entry wins.
+        Each tick answers every outcome from ONE page_source fetch, or — with
+        live=True, or when snapshot_checks is off — from one combined
+        UiAutomator query, which is safe while the symptom picker is open.
+        timeout=0 checks exactly once.
+
+        Returns (name, elapsed_sec) for the first match, (None, elapsed_sec)
+        on timeout.
+        """
+        wanted = {}
+        for name, sel in selectors.items():
+            texts = [sel] if isinstance(sel, str) else [t for t in (sel or []) if t]
+            if texts and texts[0]:
+                wanted[name] = texts
+        live = live or not self.cfg.get("snapshot_checks", True)
+        t0 = time.monotonic()
+        deadline = t0 + timeout
+        while wanted:
+            name = self._match_live(wanted, contains) if live else self._match_hierarchy(wanted, contains)
+            elapsed = round(time.monotonic() - t0, 2)
+            if name is not None:
+                logging.info("[WAIT] %s after %.2fs", name, elapsed)
+                return name, elapsed
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(poll, remaining))
+        return None, round(time.monotonic() - t0, 2)
+
+    def _match_hierarchy(self, wanted: dict[str, list[str]], contains: bool) -> str | None:
+        try:
+            index = HierarchyIndex(self.drv.page_source, self.cfg.get("app_package", ""))
+        except ET.ParseError as e:
+            logging.info("[WAIT] page_source parse failed: %s", e)
+            return None
+        for name, texts in wanted.items():
+            if any(index.has(t, contains=contains) for t in texts):
+                return name
+        return None
+
+    def _match_live(self, wanted: dict[str, list[str]], contains: bool) -> str | None:
+        if self._combined_queries:
+            all_texts = [t for texts in wanted.values() for t in texts]
+            try:
+                els = self.drv.find_elements(
+                    By.ANDROID_UIAUTOMATOR, self._uiautomator_any(all_texts, contains)
+                )
+            except InvalidSelectorException as e:
+                logging.warning("[LOCATOR] combined query rejected, using per-candidate lookups: %s", e)
+                self._combined_queries = False
+            else:
+                if not els:
+                    return None
+                # Polling a changing screen: only the element itself is current
+                candidate, _ = self._matched_candidate(els[0], all_texts, contains, use_snapshot=False)
+                return next(n for n, texts in wanted.items() if candidate in texts)
+        for name, texts in wanted.items():
+            try:
+                self._find_each(texts, 1, contains)
+                return name
+            except Exception:
+                pass
+        return None
+
     def wait_for_symptom_success(self, timeout: int = 10) -> str:
         """
         Wait for one of two success signals after symptom submission:
           1. symptom_success_signal_text  — configured toast/confirmation text
           2. symptom_add_text             — back on main measurement screen
 
-        Returns the name of the signal that was detected first.
+        Returns the name of the signal that was detected first (back on the
+        main screen counts as a verified UI health check).
         Raises RuntimeError if neither appears within timeout.
         """
         success_signal = self.sel.get("symptom_success_signal_text")
         main_indicator = self.sel.get("symptom_add_text", "Add Symptom")
 
-        deadline = time.monotonic() + timeout
-        while time.monotonic() < deadline:
-            if success_signal and self.is_visible_text(success_signal):
-                return "success_signal"
-            if self.is_visible_text(main_indicator):
-                return "main_screen"
-            time.sleep(0.5)
+        # Live queries: this runs right after the picker closes (or seems to)
+        signal, _ = self.wait_any(
+            {"success_signal": success_signal, "main_screen": main_indicator},
+            timeout,
+            live=True,
+        )
+        if signal == "main_screen":
+            self._healthy_at = time.monotonic()
+        if signal:
+            return signal
 
         raise RuntimeError(
             f"Symptom success not confirmed within {timeout}s: "
@@ -491,30 +946,149 @@ class AndroidDriver:
         indicator = self.sel.get("symptom_add_text", "Add Symptom")
         self.reporter.log_event("ui_health_check", {"indicator": indicator})
         if not self.is_visible_text(indicator):
+            self.invalidate_health()
             try:
-                self.screenshot("ui_health_failed")
+                self.screenshot("ui_health_failed", evidence=True)
             except Exception:
                 pass
             raise RuntimeError(f"UI health check failed: '{indicator}' not visible on screen")
+        self._healthy_at = time.monotonic()
         self.reporter.log_event("ui_health_ok", {"indicator": indicator})
 
-    def wait_idle(self, seconds: float = 1.0):
-        time.sleep(seconds)
+    def wait_ui_health(self, timeout: float, poll: float = 2.0) -> float | None:
+        """
+        Poll (quietly — no events or evidence per tick) until the
+        measurement screen indicator is visible. Returns the seconds waited,
+        or None if it did not appear within `timeout`.
+        """
+        indicator = self.sel.get("symptom_add_text", "Add Symptom")
+        signal, waited = self.wait_any({"healthy": indicator}, timeout, poll=poll)
+        if signal is None:
+            return None
+        self._healthy_at = time.monotonic()
+        return waited
 
-    def get_device_info(self) -> dict:
-        """Query model, manufacturer, Android version via adb shell getprop."""
-        udid = self.cfg.get("udid", "")
+    # ------------------------------------------------------------------
+    # Health cache — skip the full pre-job check while it is still fresh
+    # ------------------------------------------------------------------
 
-        def _prop(name: str) -> str:
-            try:
-                cmd = ["adb"] + (["-s", udid] if udid else []) + ["shell", "getprop", name]
-                return subprocess.check_output(cmd, timeout=5).decode().strip()
-            except Exception:
+    def health_cached(self) -> bool:
+        """
+        True if session and UI were verified within `health_cache_ttl_sec`
+        and no session error, reconnect or failed check happened since.
+        """
+        return (
+            self._healthy_at is not None
+            and time.monotonic() - self._healthy_at < self._health_ttl
+        )
+
+    def invalidate_health(self) -> None:
+        """Force the next pre-job check to be a full one."""
+        self._healthy_at = None
+
+    def probe_health(self) -> bool:
+        """
+        Cheap stand-in for the full check: one round-trip that proves the
+        session is alive and the app is still in the foreground. It does not
+        see in-app overlays (dialogs, sub-screens) — only the full check does.
+        """
+        pkg = self.cfg.get("app_package")
+        try:
+            current = self.drv.current_package
+        except Exception:
+            self.invalidate_health()
+            return False
+        if pkg and current != pkg:
+            self.invalidate_health()
+            return False
+        return True
+
+    def wait_idle(self, seconds: float = 1.0, adaptive: bool | None = None) -> float:
+        """
+        Wait up to `seconds` for the UI to settle; returns the time actually waited.
+
+        Adaptive mode (default, `android.adaptive_idle`) polls page_source and
+        returns as soon as two consecutive hierarchy hashes are identical, so
+        `seconds` is only an upper bound. Waits shorter than
+        _IDLE_ADAPTIVE_MIN_SEC are plain sleeps — a fetch would cost more.
+
+        Pass adaptive=False while the symptom picker is open: page_source
+        fires accessibility events that can dismiss the bottom sheet.
+        """
+        # The screen is expected to change while we wait — drop any snapshot.
+        self.invalidate_snapshot()
+        if adaptive is None:
+            adaptive = bool(self.cfg.get("adaptive_idle", True))
+        t0 = time.monotonic()
+        mode = "fixed"
+        if not adaptive or seconds < _IDLE_ADAPTIVE_MIN_SEC:
+            time.sleep(seconds)
+        else:
+            mode = "timeout"
+            deadline = t0 + seconds
+            time.sleep(_IDLE_SETTLE_SEC)
+            prev = None
+            while True:
+                try:
+                    h = hashlib.md5(self.drv.page_source.encode("utf-8")).hexdigest()
+                except Exception:
+                    # Can't read the hierarchy — fall back to the full fixed wait.
+                    mode = "fixed_fallback"
+                    time.sleep(max(0.0, deadline - time.monotonic()))
+                    break
+                if h == prev:
+                    mode = "stable"
+                    break
+                prev = h
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(_IDLE_POLL_SEC, remaining))
+        waited = time.monotonic() - t0
+        logging.info("[IDLE] waited %.2fs of %.1fs (%s)", waited, seconds, mode)
+        return waited
+
+    @property
+    def adb(self):
+        """Persistent `adb shell` for this device (see src/adb_shell.py)."""
+        return shell_for(self.cfg.get("udid", ""))
+
+    @property
+    def app_version(self) -> str:
+        """App versionName via `dumpsys package`; cached for the driver's lifetime."""
+        if self._app_version is None:
+            pkg = self.cfg.get("app_package", "")
+            version = ""
+            if pkg:
+                try:
+                    out = self.adb.run(f"dumpsys package {pkg} | grep versionName", timeout=10)
+                    m = re.search(r"versionName=(\S+)", out)
+                    version = m.group(1) if m else ""
+                except Exception:
+                    pass
+            self._app_version = version or "unknown"
+        return self._app_version
+
+    @property
+    def device_id(self) -> str:
+        """
+        Stable id for per-device state that outlives a run: the configured
+        UDID, else the device serial (ro.serialno). "" while neither is
+        known; cached once resolved.
+        """
+        if self._device_id is None:
+            device_id = self.cfg.get("udid", "")
+            if not device_id:
+                try:
+                    device_id = self.adb.getprop("ro.serialno")
+                except Exception as e:
+                    logging.info("[ADB] serial lookup failed: %s", e)
+            if not device_id:
                 return ""
+            self._device_id = device_id
+        return self._device_id
 
-        return {
-            "model": _prop("ro.product.model"),
-            "manufacturer": _prop("ro.product.manufacturer"),
-            "android_version": _prop("ro.build.version.release"),
-            "udid": udid,
-        }
+    def get_device_info(self) -> dict:
+        """Model, manufacturer, Android version via the persistent adb shell (cached per UDID)."""
+        udid = self.cfg.get("udid", "")
+        return {**static_props(udid), "udid": udid, "device_id": self.device_id}
@@ -0,0 +1,55 @@
+"""
+Locks for small JSON files shared by threads and worker processes.
+
+The recovery stats and locator cache files are rewritten read-merge-write.
+A threading.Lock only serialises that within one process; supervisor and
+fleet workers are separate processes, and two of them merging at once lose
+one update. locked() adds an exclusive OS lock on a sidecar `<path>.lock`
+file (fcntl.flock on POSIX, msvcrt.locking on Windows) for the duration of
+the merge. The data file itself is never locked — it is replaced atomically,
+so plain reads need no lock.
+"""
+
+import contextlib
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+# One lock per data file, shared by every user of that path in this process
+_THREAD_LOCKS: dict[str, threading.Lock] = {}
+_THREAD_LOCKS_GUARD = threading.Lock()
+
+
+def thread_lock(path: str) -> threading.Lock:
+    """The in-process lock for `path` (same object for every caller)."""
+    with _THREAD_LOCKS_GUARD:
+        return _THREAD_LOCKS.setdefault(os.path.abspath(path), threading.Lock())
+
+
+@contextlib.contextmanager
+def locked(path: str):
+    """Hold the exclusive cross-process lock for `path` (blocks until free)."""
+    lock_path = f"{path}.lock"
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    with open(lock_path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)   # retries for ~10 s, then raises
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
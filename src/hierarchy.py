@@ -0,0 +1,194 @@
+"""
+Compact index over one UiAutomator2 page_source dump.
+
+A SpatchEx hierarchy is several hundred KB of XML. HierarchyIndex parses it
+once with incremental iterparse (each element is cleared as soon as its
+attributes are copied out) into parallel per-node arrays:
+
+    text / desc / rid     attribute strings ("" when absent)
+    bounds                (x1, y1, x2, y2) or None
+    clickable             bool
+    parent                index of the parent node (-1 for the root)
+
+plus dicts for O(1) exact text / content-desc / resource-id lookups. The
+driver's snapshot checks, the symptom picker map and page-source dumps all
+share one index per fetch instead of re-parsing the XML for each question.
+
+first_match_center() is the streaming variant for one-off lookups: it stops
+parsing at the first node that matches.
+"""
+
+import io
+import re
+import time
+import xml.etree.ElementTree as ET
+
+_BOUNDS_RE = re.compile(r"\[(\d+),(\d+)\]\[(\d+),(\d+)\]")
+
+
+def _parse_bounds(value: str) -> tuple[int, int, int, int] | None:
+    m = _BOUNDS_RE.match(value)
+    if not m:
+        return None
+    x1, y1, x2, y2 = (int(v) for v in m.groups())
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return x1, y1, x2, y2
+
+
+def _xml_stream(xml: str | bytes) -> io.BytesIO:
+    return io.BytesIO(xml.encode("utf-8") if isinstance(xml, str) else xml)
+
+
+class HierarchyIndex:
+    """
+    Parsed page_source: parallel node arrays plus exact-match lookup tables.
+    Only valid for the screen it was taken from.
+    """
+
+    __slots__ = (
+        "xml", "taken_at", "_pkg",
+        "text", "desc", "rid", "bounds", "clickable", "parent",
+        "_by_text", "_by_desc", "_ids",
+    )
+
+    def __init__(self, xml: str, app_package: str = ""):
+        self.xml = xml
+        self.taken_at = time.monotonic()
+        self._pkg = app_package
+        self.text: list[str] = []
+        self.desc: list[str] = []
+        self.rid: list[str] = []
+        self.bounds: list[tuple[int, int, int, int] | None] = []
+        self.clickable: list[bool] = []
+        self.parent: list[int] = []
+        self._by_text: dict[str, int] = {}
+        self._by_desc: dict[str, int] = {}
+        self._ids: set[str] = set()
+
+        stack: list[int] = []
+        for event, node in ET.iterparse(_xml_stream(xml), events=("start", "end")):
+            if event == "end":
+                stack.pop()
+                node.clear()
+                continue
+            i = len(self.text)
+            attrs = node.attrib
+            text = attrs.get("text", "")
+            desc = attrs.get("content-desc", "")
+            rid = attrs.get("resource-id", "")
+            self.text.append(text)
+            self.desc.append(desc)
+            self.rid.append(rid)
+            self.bounds.append(_parse_bounds(attrs.get("bounds", "")))
+            self.clickable.append(attrs.get("clickable") == "true")
+            self.parent.append(stack[-1] if stack else -1)
+            stack.append(i)
+            if text:
+                self._by_text.setdefault(text, i)
+            if desc:
+                self._by_desc.setdefault(desc, i)
+            if rid:
+                self._ids.add(rid)
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def has(self, value: str, contains: bool = True, exact: bool = False) -> bool:
+        """
+        Mirror AndroidDriver.find(): exact resource-id / content-desc only
+        when contains=False, textContains unless exact=True.
+        """
+        if not value:
+            return False
+        if not contains or exact:
+            # By.ID without a package prefix resolves to <app_package>:id/<value>
+            if value in self._ids or f"{self._pkg}:id/{value}" in self._ids:
+                return True
+            if value in self._by_desc:
+                return True
+        if value in self._by_text:
+            return True
+        return not exact and any(value in t for t in self._by_text)
+
+    def matches(self, value: str, strategy: str) -> bool:
+        """Whether one UiSelector statement (resourceId/description/text/textContains) matches."""
+        if strategy == "resourceId":
+            return value in self._ids or f"{self._pkg}:id/{value}" in self._ids
+        if strategy == "description":
+            return value in self._by_desc
+        if strategy == "text":
+            return value in self._by_text
+        return any(value in t for t in self._by_text)
+
+    def lookup(self, label: str) -> int | None:
+        """First node whose text or content-desc equals `label` — O(1)."""
+        i = self._by_text.get(label)
+        return i if i is not None else self._by_desc.get(label)
+
+    def find_all(self, value: str, contains: bool = True) -> list[int]:
+        """Nodes with bounds whose text or content-desc equals (or contains) `value`."""
+        if not value:
+            return []
+        out = []
+        for i, b in enumerate(self.bounds):
+            if b is None:
+                continue
+            t, d = self.text[i], self.desc[i]
+            if t == value or d == value or (contains and (value in t or value in d)):
+                out.append(i)
+        return out
+
+    def labelled(self):
+        """Yield (index, label) for every text / content-desc on a node with bounds."""
+        for i, b in enumerate(self.bounds):
+            if b is None:
+                continue
+            if self.text[i]:
+                yield i, self.text[i]
+            if self.desc[i] and self.desc[i] != self.text[i]:
+                yield i, self.desc[i]
+
+    # ------------------------------------------------------------------
+    # Geometry
+    # ------------------------------------------------------------------
+
+    def center(self, i: int) -> tuple[int, int] | None:
+        b = self.bounds[i]
+        return None if b is None else ((b[0] + b[2]) // 2, (b[1] + b[3]) // 2)
+
+    def area(self, i: int) -> int:
+        b = self.bounds[i]
+        return 0 if b is None else (b[2] - b[0]) * (b[3] - b[1])
+
+    def clickable_ancestor(self, i: int) -> int | None:
+        """Nearest node at or above `i` with clickable=true (the RN touch handler)."""
+        while i >= 0:
+            if self.clickable[i]:
+                return i
+            i = self.parent[i]
+        return None
+
+
+def first_match_center(xml: str, texts: list[str]) -> tuple[int, int] | None:
+    """
+    Center of the first node (document order) whose text or content-desc
+    equals or contains any of `texts`. Stops parsing at the first match.
+    Returns None if nothing matches or the XML cannot be parsed.
+    """
+    texts = [t for t in texts if t]
+    try:
+        for _, node in ET.iterparse(_xml_stream(xml), events=("start",)):
+            text = node.get("text", "")
+            desc = node.get("content-desc", "")
+            if (text or desc) and any(t in text or t in desc for t in texts):
+                b = _parse_bounds(node.get("bounds", ""))
+                if b:
+                    return (b[0] + b[2]) // 2, (b[1] + b[3]) // 2
+    except ET.ParseError:
+        return None
+    return None
@@ -0,0 +1,86 @@
+"""
+Persistent locator-strategy learning cache.
+
+Most selector keys only ever match one way — usually one language's text.
+This cache remembers, per app version and selector key, which candidate
+string and UiSelector strategy last matched, so AndroidDriver can try that
+combination first. The file survives across runs, so later runs start warm.
+
+File layout (JSON):
+    {
+      "<app_version>": {
+        "<selector_key>": {"candidate": "확인", "strategy": "text", "updated": "..."}
+      }
+    }
+
+Misses never fail — the driver falls back to the full search and calls
+record() with whatever matched instead.
+
+Several drivers (multi-device threads, or worker processes) may share the
+file: each save re-reads it and only overwrites the entry being recorded,
+under a cross-process lock (src.file_lock) and through a temp file of its own.
+"""
+
+import datetime
+import json
+import logging
+import os
+import tempfile
+
+from src.file_lock import locked, thread_lock
+
+# Same runtime folder run.command / run.bat use for adb_wifi_device.json
+DEFAULT_CACHE_PATH = "automation/runtime/locator_cache.json"
+
+
+class LocatorCache:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = thread_lock(path)
+        self._data: dict = self._load()
+
+    def _load(self) -> dict:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as f:
+                    return json.load(f) or {}
+        except Exception as e:
+            logging.info("[LOCATOR] cache unreadable, starting cold: %s", e)
+        return {}
+
+    def get(self, key: str, app_version: str) -> dict | None:
+        with self._lock:
+            return (self._data.get(app_version) or {}).get(key)
+
+    def record(self, key: str, app_version: str, candidate: str, strategy: str) -> None:
+        """Remember the winning combination and persist (best-effort)."""
+        with self._lock:
+            entry = self._data.setdefault(app_version, {}).get(key) or {}
+            if entry.get("candidate") == candidate and entry.get("strategy") == strategy:
+                return
+            self._data[app_version][key] = {
+                "candidate": candidate,
+                "strategy": strategy,
+                "updated": datetime.datetime.now().isoformat(timespec="seconds"),
+            }
+            self._save(app_version, key)
+
+    def _save(self, app_version: str, key: str) -> None:
+        """Merge this entry into the file as it is now (others may have saved since)."""
+        try:
+            with locked(self.path):
+                merged = self._load()
+                merged.setdefault(app_version, {})[key] = self._data[app_version][key]
+                d = os.path.dirname(self.path) or "."
+                os.makedirs(d, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=d, prefix=".locator_cache.", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        json.dump(merged, f, ensure_ascii=False, indent=2)
+                    os.replace(tmp, self.path)
+                except BaseException:
+                    os.unlink(tmp)
+                    raise
+            self._data = merged
+        except Exception as e:
+            logging.info("[LOCATOR] cache save failed: %s", e)
@@ -0,0 +1,155 @@
+"""
+Background logcat ring buffer.
+
+One long-lived `adb logcat` reader thread per device keeps the most recent
+lines in memory. Artifact captures then write out the time window around an
+event instantly instead of spawning `bash -lc "adb logcat -d ..."` each time.
+
+Optional filters:
+  - tags : only these logcat tags are streamed (adb filterspec `TAG:V *:S`)
+  - package : keep only lines from the app's process(es). The PID is looked
+              up periodically, so lines from a relaunched app are still kept.
+              The lookup is its own short `adb shell pidof` on a side thread:
+              it never stalls the reader, and never waits behind workflow
+              commands on the shared persistent shell.
+
+If adb exits (cable pulled, WiFi ADB dropped on host sleep) the reader
+restarts it with a short backoff until stop() is called.
+"""
+
+import collections
+import logging
+import re
+import subprocess
+import threading
+import time
+
+from src.adb_shell import adb_cmd
+
+# threadtime format: "MM-DD HH:MM:SS.mmm  PID  TID L TAG: message"
+_THREADTIME_PID_RE = re.compile(r"^\d\d-\d\d \d\d:\d\d:\d\d\.\d+\s+(\d+)\s")
+
+_RESTART_BACKOFF_SEC = 5.0
+_PID_REFRESH_SEC = 30.0
+
+
+class LogcatBuffer:
+    def __init__(
+        self,
+        udid: str = "",
+        max_lines: int = 50000,
+        package: str = "",
+        tags: list[str] | None = None,
+    ):
+        self.udid = udid
+        self.package = package
+        self.tags = list(tags or [])
+        self._lines: collections.deque = collections.deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._proc: subprocess.Popen | None = None
+        self._thread: threading.Thread | None = None
+        self._pids: set[str] = set()
+        self._pid_checked_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "LogcatBuffer":
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="logcat-buffer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        proc = self._proc
+        if proc and proc.poll() is None:
+            try:
+                proc.terminate()
+            except Exception:
+                pass
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive() and not self._stop.is_set())
+
+    # ------------------------------------------------------------------
+    # Reader thread
+    # ------------------------------------------------------------------
+
+    def _logcat_args(self) -> list[str]:
+        args = (["-s", self.udid] if self.udid else []) + ["logcat", "-v", "threadtime", "-T", "1"]
+        if self.tags:
+            args += [f"{t}:V" for t in self.tags] + ["*:S"]
+        return args
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._proc = subprocess.Popen(
+                    adb_cmd(self._logcat_args()),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+                for raw in self._proc.stdout:
+                    if self._stop.is_set():
+                        break
+                    line = raw.decode("utf-8", errors="ignore").rstrip("\r\n")
+                    if line and self._keep(line):
+                        with self._lock:
+                            self._lines.append((time.time(), line))
+            except Exception as e:
+                logging.info("[LOGCAT] reader error: %s", e)
+            finally:
+                if self._proc and self._proc.poll() is None:
+                    try:
+                        self._proc.terminate()
+                    except Exception:
+                        pass
+            self._stop.wait(_RESTART_BACKOFF_SEC)
+
+    def _keep(self, line: str) -> bool:
+        if not self.package:
+            return True
+        now = time.monotonic()
+        if now - self._pid_checked_at > _PID_REFRESH_SEC:
+            self._pid_checked_at = now
+            threading.Thread(target=self._refresh_pids, name="logcat-pids", daemon=True).start()
+        if not self._pids:
+            return True  # app not running yet — keep everything rather than nothing
+        m = _THREADTIME_PID_RE.match(line)
+        return bool(m) and m.group(1) in self._pids
+
+    def _refresh_pids(self) -> None:
+        args = (["-s", self.udid] if self.udid else []) + ["shell", "pidof", self.package]
+        try:
+            out = subprocess.run(adb_cmd(args), capture_output=True, timeout=5).stdout
+            self._pids.update(p for p in out.decode("utf-8", errors="ignore").split() if p.isdigit())
+        except Exception:
+            pass
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def window(self, before: float = 60.0, after: float = 0.0, at: float | None = None) -> list[str]:
+        """Lines logged within [at - before, at + after] (wall-clock, default now)."""
+        at = time.time() if at is None else at
+        lo, hi = at - before, at + after
+        with self._lock:
+            return [line for ts, line in self._lines if lo <= ts <= hi]
+
+    def dump(self, path: str, before: float = 60.0, after: float = 0.0) -> str | None:
+        """Write the window around now to `path`. Returns the path, or None on failure."""
+        try:
+            lines = self.window(before=before, after=after)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) if lines else "(no logcat output in window)")
+            return path
+        except Exception as e:
+            logging.info("[LOGCAT] dump failed: %s", e)
+            return None
@@ -4,6 +4,8 @@ import os
 import random
 import subprocess
 import sys
+import threading
+import time
 
 # Allow running as `python src/main.py` from project root
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -13,6 +15,7 @@ import yaml
 from src.device_manager import DeviceManager
 from src.reporter import RunReporter
 from src.scheduler import LongRunScheduler
+from src.schedule_store import ScheduleStore
 from src.artifacts import ArtifactManager
 from src.slack import slack_notify
 from src.timeline import log_event
@@ -82,7 +85,12 @@ def _dry_run(cfg: dict) -> None:
 
     print(f"\n  === DRY RUN: {run_cfg.get('name', 'run')} ===")
     print(f"  Platform : {platform}")
-    print(f"  Device   : udid={a_cfg.get('udid') or '(auto)'}")
+    devices    = cfg.get("devices") or []
+    if devices:
+        for i, dev in enumerate(devices, 1):
+            print(f"  Device {i} : udid={(dev or {}).get('udid') or '(auto)'}")
+    else:
+        print(f"  Device   : udid={a_cfg.get('udid') or '(auto)'}")
     print(f"  App      : {a_cfg.get('app_package')} / {a_cfg.get('app_activity')}")
     print(f"  Appium   : {a_cfg.get('appium_server_url', 'http://127.0.0.1:4723')}")
     print(f"  Duration : {duration_h}h")
@@ -91,7 +99,8 @@ def _dry_run(cfg: dict) -> None:
         print(f"  Quiet    : {quiet_hrs.get('start')}:00 – {quiet_hrs.get('end')}:00 (jobs skipped)")
 
     if rec_cfg:
-        print(f"  Recovery : cooldown={rec_cfg.get('cooldown_seconds_between_steps', 30)}s  "
+        print(f"  Recovery : max wait={rec_cfg.get('cooldown_seconds_between_steps', 30)}s  "
+              f"adaptive={rec_cfg.get('adaptive', True)}  "
               f"max_retries={rec_cfg.get('max_retries_per_job', 3)}")
 
     if plan:
@@ -115,19 +124,85 @@ def _dry_run(cfg: dict) -> None:
     sys.exit(0)
 
 
+def _select_device(cfg: dict, udid: str | None = None, index: int | None = None) -> dict:
+    """
+    Config for one device of `devices:` (by udid, or by position for an
+    entry without one) — merged into `android:`, list removed. `android.udid`
+    is only replaced by a udid the matched entry actually has.
+    """
+    devices = cfg.get("devices") or []
+    if index is not None:
+        if not 0 <= index < len(devices):
+            raise SystemExit(f"--device-index {index} is out of range for the devices list")
+        match = devices[index] or {}
+    else:
+        match = next((d for d in devices if (d or {}).get("udid") == udid), None)
+        if match is None and (devices or udid != (cfg.get("android") or {}).get("udid")):
+            raise SystemExit(f"--device {udid!r} is not in the config's devices list")
+    cfg = dict(cfg)
+    cfg["android"] = {**(cfg.get("android") or {}), **(match or {})}
+    cfg.pop("devices", None)
+    return cfg
+
+
+SCHEDULE_FILE = "schedule.db"
+
+
+def _measurement_still_running(driver) -> bool:
+    """Resume check: is the running-measurement screen still up?"""
+    try:
+        driver.assert_ui_health()
+        return True
+    except Exception:
+        return False
+
+
+# A busy worker that logged nothing for this many heartbeat intervals is
+# treated as stuck: it stops beating, and the supervisor restarts it
+_HEARTBEAT_STALL_BEATS = 5
+
+
+def _start_heartbeat(reporter: RunReporter, interval: float, idle=lambda: False) -> None:
+    """
+    Periodic `heartbeat` events — the supervisor's liveness signal.
+
+    A beat is only sent while the worker demonstrably makes progress: it is
+    idle between scheduled jobs (`idle()`), or it logged a progress event
+    within the last few intervals. A job blocked in an Appium / adb call
+    therefore goes silent and is detected as hung.
+    """
+    stall_sec = interval * _HEARTBEAT_STALL_BEATS
+
+    def _beat():
+        while True:
+            time.sleep(interval)
+            if not idle() and time.monotonic() - reporter.last_event_at > stall_sec:
+                continue
+            try:
+                reporter.log_event("heartbeat", {"pid": os.getpid()})
+            except Exception:
+                pass
+
+    threading.Thread(target=_beat, name="heartbeat", daemon=True).start()
+
+
 def _run_once(cfg: dict, reporter: RunReporter, artifacts: ArtifactManager) -> None:
     """Connect to device, inject one symptom, then exit — for quick verification."""
     platform = (cfg.get("platform") or "android").lower()
     if platform != "android":
         raise RuntimeError("Only android is supported. Set platform: android")
 
-    a_cfg   = cfg.get("android") or {}
+    # With a `devices:` list, --once uses the first device
+    a_cfg   = {**(cfg.get("android") or {}), **((cfg.get("devices") or [{}])[0] or {})}
     sel     = (cfg.get("selectors") or {}).get("android") or {}
+    popups  = (cfg.get("popup_rules") or {}).get("android")
+    flows   = (cfg.get("workflows") or {}).get("android")
     catalog = cfg.get("symptom_catalog") or []
     plan    = cfg.get("symptom_plan") or []
 
     ensure_uiautomator2(reporter)
-    dm = DeviceManager(a_cfg, sel, artifacts=artifacts, reporter=reporter)
+    dm = DeviceManager(a_cfg, sel, artifacts=artifacts, reporter=reporter,
+                       popup_rules=popups, workflows=flows)
     driver = dm.driver
     try:
         reporter.log_event("device_info", driver.get_device_info())
@@ -164,9 +239,22 @@ def main():
         action="store_true",
         help="Run a single symptom injection for quick verification, then exit",
     )
+    # Worker mode — set by src/supervisor.py
+    ap.add_argument("--device", help="Run only this udid from the config's devices list")
+    ap.add_argument("--device-index", type=int,
+                    help="Run only this entry (0-based) of the devices list — for entries without a udid")
+    ap.add_argument("--out-dir", help="Write into this directory (appending) instead of output/<run_id>")
+    ap.add_argument("--started-at", help="ISO start time of the run being resumed")
+    ap.add_argument("--heartbeat", type=float, default=0,
+                    help="Log a heartbeat event every N seconds (0 = off)")
+    ap.add_argument("--resume", metavar="RUN_ID",
+                    help="Continue the interrupted run output/RUN_ID: keep its start time, "
+                         "run only the jobs it has not run yet, append to its events.jsonl")
     args = ap.parse_args()
 
     cfg            = load_cfg(args.config)
+    if args.device or args.device_index is not None:
+        cfg = _select_device(cfg, args.device, args.device_index)
     platform       = (cfg.get("platform") or "android").lower()
     run_cfg        = cfg.get("run") or {}
     duration_hours = int(run_cfg.get("duration_hours", 24))
@@ -180,9 +268,12 @@ def main():
     if args.dry_run:
         _dry_run(cfg)
 
-    run_id  = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    out_dir = os.path.join("output", run_id)
+    run_id  = args.resume or datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    out_dir = args.out_dir or os.path.join("output", run_id)
+    if args.resume and not os.path.isdir(out_dir):
+        raise SystemExit(f"--resume {args.resume}: {out_dir} does not exist")
     os.makedirs(out_dir, exist_ok=True)
+    started_at = datetime.datetime.fromisoformat(args.started_at) if args.started_at else None
 
     hub_cfg  = cfg.get("hub") or {}
     reporter = RunReporter(
@@ -191,7 +282,7 @@ def main():
         hub_url=hub_cfg.get("url", "") if hub_cfg.get("enabled") else "",
         tester_name=hub_cfg.get("tester_name", ""),
     )
-    artifacts = ArtifactManager(out_dir=out_dir)
+    artifacts = ArtifactManager(out_dir=out_dir, cfg=cfg.get("artifacts") or {})
 
     reporter.log_event(
         "run_start",
@@ -202,8 +293,15 @@ def main():
             "jitter_seconds": jitter_seconds,
             "quiet_hours": quiet_hours,
             "once": args.once,
+            "device": args.device,
+            "resumed_from": args.started_at,
+            "resume": args.resume,
         },
     )
+    schedulers: list[LongRunScheduler] = []   # running schedulers, for the heartbeat
+    if args.heartbeat > 0:
+        _start_heartbeat(reporter, args.heartbeat,
+                         idle=lambda: bool(schedulers) and all(s.idle for s in schedulers))
     log_event(f"run started: {run_cfg.get('name', 'run')} ({duration_hours}h)")
 
     # ── Single injection mode ────────────────────────────────────────────────
@@ -214,6 +312,7 @@ def main():
             reporter.log_event("run_failed", {"error": str(e)})
             raise
         finally:
+            artifacts.close()
             try:
                 reporter.render_html_summary()
             except Exception:
@@ -222,6 +321,7 @@ def main():
 
     # ── Full long-run mode ───────────────────────────────────────────────────
     dm = None
+    devices = cfg.get("devices") or None   # multi-device run: one slot per entry
     try:
         if platform != "android":
             raise RuntimeError(
@@ -230,54 +330,99 @@ def main():
 
         a_cfg   = cfg.get("android") or {}
         sel     = (cfg.get("selectors") or {}).get("android") or {}
+        popups  = (cfg.get("popup_rules") or {}).get("android")
+        flows   = (cfg.get("workflows") or {}).get("android")
         catalog = cfg.get("symptom_catalog") or []
 
         ensure_uiautomator2(reporter)
-        dm = DeviceManager(a_cfg, sel, artifacts=artifacts, reporter=reporter)
-        driver = dm.driver
-        reporter.log_event("device_info", driver.get_device_info())
-
-        ensure_measurement_started(driver, duration_hours=duration_hours)
-        reporter.log_event("measurement_started", {})
-        log_event("measurement started")
-
-        def job(at_hour: float | None = None, payload: dict | None = None):
-            payload  = payload or {}
-            symptoms = payload.get("symptoms") or []
-            other    = payload.get("other_text") or ""
-            acts     = payload.get("activities") or []
-            if not symptoms:
-                pick     = random.choice(catalog) if catalog else "Palpitations"
-                symptoms = [pick]
-            inject_symptom_event(driver, symptoms=symptoms, other_text=other, activities=acts)
-
-        scheduler = LongRunScheduler(
-            duration_hours=duration_hours,
-            interval_hours=interval_hours,
-            start_immediately=start_imm,
-            plan=cfg.get("symptom_plan") or [],
-            catalog=catalog,
-            reporter=reporter,
-            jitter_seconds=jitter_seconds,
-            quiet_hours=quiet_hours,
-            recovery_cfg=recovery_cfg,
-        )
-        scheduler.run(job, driver=driver)
-
-        reporter.log_event("run_complete", {"status": "ok"})
+        dm = DeviceManager(a_cfg, sel, artifacts=artifacts, reporter=reporter,
+                           popup_rules=popups, workflows=flows, devices=devices)
+
+        def run_device(slot):
+            """Measurement start + long-run schedule for one device."""
+            driver = slot.driver
+            slot.reporter.log_event("device_info", driver.get_device_info())
+
+            # Durable schedule: a resumed / restarted run continues from here
+            store = ScheduleStore(os.path.join(slot.artifacts.out_dir, SCHEDULE_FILE))
+            if store.get("measurement_started") and _measurement_still_running(driver):
+                slot.reporter.log_event("measurement_resumed", {"start_time": store.get("start_time")})
+            else:
+                ensure_measurement_started(driver, duration_hours=duration_hours)
+                store.set("measurement_started", True)
+                slot.reporter.log_event("measurement_started", {})
+                log_event(f"measurement started ({slot.udid})" if devices else "measurement started")
+
+            def job(at_hour: float | None = None, payload: dict | None = None, job_id: str | None = None):
+                payload  = payload or {}
+                symptoms = payload.get("symptoms") or []
+                other    = payload.get("other_text") or ""
+                acts     = payload.get("activities") or []
+                if not symptoms:
+                    pick     = random.choice(catalog) if catalog else "Palpitations"
+                    symptoms = [pick]
+                inject_symptom_event(driver, symptoms=symptoms, other_text=other, activities=acts,
+                                     job_id=job_id)
+
+            scheduler = LongRunScheduler(
+                duration_hours=duration_hours,
+                interval_hours=interval_hours,
+                start_immediately=start_imm,
+                plan=cfg.get("symptom_plan") or [],
+                catalog=catalog,
+                reporter=slot.reporter,
+                jitter_seconds=jitter_seconds,
+                quiet_hours=quiet_hours,
+                recovery_cfg=recovery_cfg,
+                store=store,
+                catch_up_cfg=run_cfg.get("catch_up"),
+                clock_cfg=run_cfg.get("clock_monitor"),
+            )
+            schedulers.append(scheduler)
+            scheduler.run(job, driver=driver, start=started_at)
+
+        if devices:
+            # One thread per device; a device that fails does not stop the others
+            reporter.log_event("devices_started", {"udids": [slot.udid for slot in dm]})
+
+            def run_device_guarded(slot):
+                try:
+                    run_device(slot)
+                except Exception as e:
+                    slot.reporter.log_event("run_failed", {"error": str(e)})
+                    save_failure_artifacts(slot.driver, e, label=f"{run_id}_{slot.udid}")
+                    raise
+
+            errors = dm.run_parallel(run_device_guarded)
+            failed = sorted(udid for udid, err in errors.items() if err)
+            reporter.log_event("devices_finished", {"errors": errors})
+            if len(failed) == len(errors):
+                raise RuntimeError(f"All devices failed: {errors}")
+            reporter.log_event("run_complete", {"status": "partial" if failed else "ok",
+                                                "failed_devices": failed})
+        else:
+            run_device(dm.slots[0])
+            reporter.log_event("run_complete", {"status": "ok"})
         log_event("run complete")
 
     except Exception as e:
         reporter.log_event("run_failed", {"error": str(e)})
         log_event(f"run failed: {e}")
-        save_failure_artifacts(dm.driver if dm else None, e, label=run_id)
+        if not devices:  # multi-device failures are collected per device
+            save_failure_artifacts(dm.driver if dm else None, e, label=run_id)
         raise
 
     finally:
         if dm:
             dm.close()
+        artifacts.close()
         try:
-            reporter.render_html_summary()
+            if dm and devices:
+                for slot in dm:
+                    slot.reporter.render_html_summary()
+                reporter.render_fleet_summary([(slot.udid, slot.reporter, slot.error) for slot in dm])
+            else:
+                reporter.render_html_summary()
         except Exception:
             pass
         slack_cfg = cfg.get("slack") or {}
@@ -0,0 +1,115 @@
+"""
+Persistent per-device recovery statistics.
+
+A fixed 1 → 2 → 3 recovery ladder wastes a step (and its wait) on every
+recovery on firmware where step 1 (back key) never fixes anything.
+RecoveryStats remembers, per device and failure signature, how often each
+recovery step was tried and how often the UI was healthy afterwards, so the
+ladder can start with the step most likely to work. The file survives
+across runs.
+
+File layout (JSON), keyed by the driver's stable device_id:
+    {
+      "<device_id>": {
+        "ui_health_check_failed": {
+          "1": {"tried": 6, "ok": 0, "updated": "..."},
+          "2": {"tried": 6, "ok": 5, "updated": "..."}
+        }
+      }
+    }
+
+Several workers (threads or processes) may share the file. Each record()
+re-reads it and applies its increment under a cross-process lock
+(src.file_lock), so concurrent workers never lose each other's counts.
+The run summary reads its table back from the file (rows()), so it shows
+the history the ladder actually orders by, not just this run's attempts.
+"""
+
+import datetime
+import json
+import logging
+import os
+import tempfile
+
+from src.file_lock import locked, thread_lock
+
+# Same runtime folder as the locator cache
+DEFAULT_STATS_PATH = "automation/runtime/recovery_stats.json"
+
+
+def _bump(data: dict, device: str, signature: str, step, ok: bool) -> None:
+    entry = (
+        data.setdefault(device, {})
+        .setdefault(signature, {})
+        .setdefault(str(step), {"tried": 0, "ok": 0})
+    )
+    entry["tried"] += 1
+    entry["ok"] += int(ok)
+    entry["updated"] = datetime.datetime.now().isoformat(timespec="seconds")
+
+
+class RecoveryStats:
+    def __init__(self, path: str = DEFAULT_STATS_PATH):
+        self.path = path
+        self._lock = thread_lock(path)
+        self._data = self._load()
+
+    def _load(self) -> dict:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as f:
+                    return json.load(f) or {}
+        except Exception as e:
+            logging.info("[RECOVERY] stats unreadable, starting cold: %s", e)
+        return {}
+
+    def score(self, device: str, signature: str, step) -> float:
+        """Smoothed success rate — 0.5 for a step never tried."""
+        with self._lock:
+            entry = ((self._data.get(device) or {}).get(signature) or {}).get(str(step)) or {}
+        return (entry.get("ok", 0) + 1) / (entry.get("tried", 0) + 2)
+
+    def order(self, device: str, signature: str, steps=(1, 2, 3)) -> list:
+        """`steps` most-likely-first; ties keep the escalation order."""
+        return sorted(steps, key=lambda s: -self.score(device, signature, s))
+
+    def record(self, device: str, signature: str, step, ok: bool) -> None:
+        """Count one attempt of `step` and persist (best-effort)."""
+        with self._lock:
+            try:
+                with locked(self.path):
+                    merged = self._load()
+                    _bump(merged, device, signature, step, ok)
+                    self._save(merged)
+                self._data = merged
+            except Exception as e:
+                logging.info("[RECOVERY] stats save failed: %s", e)
+                _bump(self._data, device, signature, step, ok)
+
+    def rows(self, device: str) -> list[dict]:
+        """Persisted counts for `device`, one row per (signature, step)."""
+        with self._lock:
+            saved = self._load().get(device) or {}
+        return [
+            {
+                "signature": sig, "step": step,
+                "tried": entry.get("tried", 0), "ok": entry.get("ok", 0),
+                "rate": entry.get("ok", 0) / entry["tried"] if entry.get("tried") else 0.0,
+                "updated": entry.get("updated", ""),
+            }
+            for sig, steps in sorted(saved.items())
+            for step, entry in sorted(steps.items())
+        ]
+
+    def _save(self, data: dict) -> None:
+        """Atomically replace the file with `data` (caller holds locked())."""
+        d = os.path.dirname(self.path) or "."
+        os.makedirs(d, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=d, prefix=".recovery_stats.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
@@ -1,6 +1,49 @@
-import os, json, datetime, threading
+import os, json, datetime, math, threading, time
 from jinja2 import Template
 
+
+def _percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list."""
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[k]
+
+
+class StepTimer:
+    """
+    Sequential step spans for one workflow run.
+
+    begin(step) closes the open step (if any) and starts the next; end()
+    closes the last one. Each closed step is logged as a `step_span` event
+    with monotonic start/end times, so a linear flow needs one call per step.
+    """
+
+    def __init__(self, reporter: "RunReporter", workflow: str):
+        self.reporter = reporter
+        self.workflow = workflow
+        self._open: tuple[str, float, dict] | None = None
+
+    def begin(self, step: str, **data) -> None:
+        self.end()
+        self._open = (step, time.monotonic(), data)
+
+    def end(self, ok: bool = True) -> None:
+        if self._open is None:
+            return
+        step, t0, data = self._open
+        self._open = None
+        t1 = time.monotonic()
+        self.reporter.log_event("step_span", {
+            "workflow": self.workflow,
+            "step": step,
+            "start": round(t0, 3),
+            "end": round(t1, 3),
+            "duration_sec": round(t1 - t0, 3),
+            "ok": ok,
+            **data,
+        })
+
+
 class RunReporter:
     def __init__(self, out_dir: str, run_name: str, hub_url: str = "", tester_name: str = ""):
         self.out_dir = out_dir
@@ -8,6 +51,12 @@ class RunReporter:
         self.events_path = os.path.join(out_dir, "events.jsonl")
         self._hub_url = (hub_url or "").rstrip("/")
         self._tester_name = tester_name or run_name
+        self.last_event_at = time.monotonic()   # last progress (non-heartbeat) event
+        self._recovery_stats = None             # (RecoveryStats, device_id) for the summary
+
+    def attach_recovery_stats(self, stats, device_id: str) -> None:
+        """Render the summary's recovery table from `stats` (persisted) for `device_id`."""
+        self._recovery_stats = (stats, device_id)
 
     def log_event(self, event: str, data: dict):
         rec = {
@@ -17,9 +66,43 @@ class RunReporter:
         }
         with open(self.events_path, "a", encoding="utf-8") as f:
             f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        if event != "heartbeat":
+            self.last_event_at = time.monotonic()
         if self._hub_url:
             self._forward_to_hub(rec)
 
+    def step_timer(self, workflow: str) -> StepTimer:
+        return StepTimer(self, workflow)
+
+    def child(self, subdir: str, label: str) -> "RunReporter":
+        """Reporter for one device of a multi-device run: <out_dir>/<subdir>."""
+        out_dir = os.path.join(self.out_dir, subdir)
+        os.makedirs(out_dir, exist_ok=True)
+        return RunReporter(
+            out_dir=out_dir,
+            run_name=f"{self.run_name} [{label}]",
+            hub_url=self._hub_url,
+            tester_name=f"{self._tester_name} ({label})",
+        )
+
+    def load_events(self) -> list[dict]:
+        events = []
+        if os.path.exists(self.events_path):
+            with open(self.events_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except Exception:
+                        pass
+        return events
+
+    def job_counts(self, events: list[dict] | None = None) -> tuple[int, int]:
+        """(passed, failed) job_result counts."""
+        events = self.load_events() if events is None else events
+        results = [e for e in events if e["event"] == "job_result"]
+        ok = sum(1 for e in results if e["data"].get("success"))
+        return ok, len(results) - ok
+
     def _forward_to_hub(self, rec: dict):
         payload = {**rec, "tester_name": self._tester_name}
         def _send():
@@ -38,22 +121,16 @@ class RunReporter:
         threading.Thread(target=_send, daemon=True).start()
 
     def render_html_summary(self):
-        events = []
-        if os.path.exists(self.events_path):
-            with open(self.events_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    try:
-                        events.append(json.loads(line))
-                    except Exception:
-                        pass
+        # heartbeat events are a supervisor liveness signal, not run history
+        events = [e for e in self.load_events() if e["event"] != "heartbeat"]
 
         # ── Summary stats ─────────────────────────────────────────────────
         job_results     = [e for e in events if e["event"] == "job_result"]
-        injections_ok   = sum(1 for e in job_results if e["data"].get("success"))
-        injections_fail = len(job_results) - injections_ok
+        injections_ok, injections_fail = self.job_counts(events)
         run_start_ts    = next((e["ts"] for e in events if e["event"] == "run_start"), "")
+        # last one: a resumed run appends after an earlier run_failed
         run_end_ts      = next(
-            (e["ts"] for e in events if e["event"] in ("run_complete", "run_failed")), ""
+            (e["ts"] for e in reversed(events) if e["event"] in ("run_complete", "run_failed")), ""
         )
         device_info  = next((e["data"] for e in events if e["event"] == "device_info"), {})
         overall_ok   = injections_fail == 0 and any(e["event"] == "run_complete" for e in events)
@@ -71,6 +148,44 @@ class RunReporter:
             "once_inject_done", "run_complete",
         }
 
+        # ── Per-step latency across the run (step_span events) ───────────
+        durations: dict[tuple[str, str], list[float]] = {}
+        failures: dict[tuple[str, str], int] = {}
+        for e in events:
+            if e["event"] != "step_span":
+                continue
+            key = (e["data"].get("workflow", ""), e["data"].get("step", ""))
+            durations.setdefault(key, []).append(float(e["data"].get("duration_sec", 0)))
+            if not e["data"].get("ok", True):
+                failures[key] = failures.get(key, 0) + 1
+        step_stats = [
+            {
+                "workflow": wf, "step": step, "count": len(vals),
+                "p50": _percentile(vals, 50), "p95": _percentile(vals, 95),
+                "max": max(vals), "failed": failures.get((wf, step), 0),
+            }
+            for (wf, step), vals in durations.items()
+        ]
+
+        # ── Recovery ladder history (persisted RecoveryStats) ─────────────
+        # Counts come from the stats file the ladder orders by; only the
+        # wait column is this run's (recovery_step_result events).
+        waits: dict[tuple[str, str], list[float]] = {}
+        for e in events:
+            if e["event"] != "recovery_step_result":
+                continue
+            if e["data"].get("ok") and "waited_sec" in e["data"]:
+                key = (e["data"].get("signature", ""), str(e["data"].get("step")))
+                waits.setdefault(key, []).append(float(e["data"]["waited_sec"]))
+        recovery_stats = []
+        recovery_device = ""
+        if self._recovery_stats is not None:
+            stats, recovery_device = self._recovery_stats
+            for r in stats.rows(recovery_device):
+                key = (r["signature"], r["step"])
+                r["wait_p50"] = _percentile(waits[key], 50) if key in waits else None
+                recovery_stats.append(r)
+
         def row_class(e):
             ev = e["event"]
             if ev in FAIL_EVENTS: return "row-fail"
@@ -122,6 +237,32 @@ pre{margin:0;white-space:pre-wrap;word-break:break-all}
     <div class="val" style="color:#dc3545">{{ injections_fail }}</div><div class="lbl">Failed</div>
   </div>
 </div>
+{% if step_stats %}
+<h3>Step Latency (seconds)</h3>
+<table>
+<tr><th>Workflow</th><th>Step</th><th>Count</th><th>p50</th><th>p95</th><th>Max</th><th>Failed</th></tr>
+{% for s in step_stats %}
+<tr class="{{ 'row-fail' if s.failed else '' }}">
+  <td>{{ s.workflow }}</td><td>{{ s.step }}</td><td>{{ s.count }}</td>
+  <td>{{ '%.2f' % s.p50 }}</td><td>{{ '%.2f' % s.p95 }}</td><td>{{ '%.2f' % s.max }}</td>
+  <td>{{ s.failed }}</td>
+</tr>
+{% endfor %}
+</table>
+{% endif %}
+{% if recovery_stats %}
+<h3>Recovery Steps — {{ recovery_device }} (all runs)</h3>
+<table>
+<tr><th>Failure</th><th>Step</th><th>Tried</th><th>Healthy after</th><th>Success</th><th>Last tried</th><th>Wait p50 this run (s)</th></tr>
+{% for r in recovery_stats %}
+<tr class="{{ 'row-ok' if r.ok else 'row-warn' }}">
+  <td>{{ r.signature }}</td><td>{{ r.step }}</td><td>{{ r.tried }}</td><td>{{ r.ok }}</td>
+  <td>{{ '%.0f%%' % (r.rate * 100) }}</td><td>{{ r.updated }}</td>
+  <td>{{ '%.1f' % r.wait_p50 if r.wait_p50 is not none else '' }}</td>
+</tr>
+{% endfor %}
+</table>
+{% endif %}
 <h3>Event Timeline</h3>
 <table>
 <tr><th>Time</th><th>Event</th><th>Data</th></tr>
@@ -146,8 +287,68 @@ pre{margin:0;white-space:pre-wrap;word-break:break-all}
             injections_ok=injections_ok,
             injections_fail=injections_fail,
             overall_ok=overall_ok,
+            step_stats=step_stats,
+            recovery_stats=recovery_stats,
+            recovery_device=recovery_device,
             row_class=row_class,
         )
         out = os.path.join(self.out_dir, "summary.html")
         with open(out, "w", encoding="utf-8") as f:
             f.write(html)
+
+    def render_fleet_summary(self, devices: list[tuple[str, "RunReporter", str]]) -> str:
+        """
+        Merged summary.html for a multi-device run: one row per device
+        (udid, child reporter, error or "") linking to its own summary.
+        Returns the written path.
+        """
+        rows = []
+        for udid, rep, error in devices:
+            events = rep.load_events()
+            ok, fail = rep.job_counts(events)
+            rows.append({
+                "udid": udid,
+                "link": os.path.relpath(os.path.join(rep.out_dir, "summary.html"), self.out_dir),
+                "passed": ok,
+                "failed": fail,
+                "status": "FAIL" if error or fail else "PASS",
+                "error": error,
+                "last_event": events[-1]["ts"] if events else "",
+            })
+        tpl = Template(r"""<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{{ name }} — Devices</title>
+<style>
+body{font-family:Arial,sans-serif;margin:24px;background:#fafafa;color:#222}
+.summary{display:flex;gap:18px;margin:14px 0;flex-wrap:wrap}
+.card{background:#fff;border:1px solid #ddd;border-radius:8px;padding:10px 18px;min-width:120px}
+.card .val{font-size:2em;font-weight:bold}.card .lbl{font-size:.8em;color:#666}
+table{border-collapse:collapse;width:100%;background:#fff}
+td,th{border:1px solid #e0e0e0;padding:6px 10px;font-size:.84em}
+th{background:#f0f0f0;font-weight:600}
+tr.row-fail td{background:#fff3f3}tr.row-ok td{background:#f3fff6}
+</style>
+</head>
+<body>
+<h2>{{ name }}</h2>
+<div class="summary">
+  <div class="card"><div class="val">{{ rows|length }}</div><div class="lbl">Devices</div></div>
+  <div class="card"><div class="val" style="color:#28a745">{{ rows|sum(attribute='passed') }}</div><div class="lbl">Passed</div></div>
+  <div class="card"><div class="val" style="color:#dc3545">{{ rows|sum(attribute='failed') }}</div><div class="lbl">Failed</div></div>
+</div>
+<table>
+<tr><th>Device</th><th>Status</th><th>Passed</th><th>Failed</th><th>Last event</th><th>Error</th></tr>
+{% for r in rows %}
+<tr class="{{ 'row-fail' if r.status == 'FAIL' else 'row-ok' }}">
+  <td><a href="{{ r.link }}">{{ r.udid }}</a></td><td>{{ r.status }}</td>
+  <td>{{ r.passed }}</td><td>{{ r.failed }}</td><td>{{ r.last_event }}</td><td>{{ r.error }}</td>
+</tr>
+{% endfor %}
+</table>
+</body></html>""")
+        out = os.path.join(self.out_dir, "summary.html")
+        with open(out, "w", encoding="utf-8") as f:
+            f.write(tpl.render(name=self.run_name, rows=rows))
+        return out
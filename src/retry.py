@@ -1,16 +1,26 @@
 import time
 from functools import wraps
 
-def retry(tries: int = 3, delay: float = 1.0):
+def retry(tries: int = 3, delay: float = 1.0, giveup: tuple = ()):
+    """
+    Retry on any exception except those in `giveup`, which propagate at once.
+    A `deadline` keyword argument of the call (a workflows.engine.Deadline)
+    also bounds the retries: no further attempt once it cannot fit the delay.
+    """
     def deco(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
+            deadline = kwargs.get("deadline")
             last = None
             for i in range(tries):
                 try:
                     return fn(*args, **kwargs)
+                except giveup:
+                    raise
                 except Exception as e:
                     last = e
+                    if deadline is not None and deadline.remaining() <= delay:
+                        break
                     time.sleep(delay)
             raise last
         return wrapper
@@ -0,0 +1,142 @@
+"""
+Durable schedule store — lets an interrupted long run resume in place.
+
+One SQLite file per run (per device in multi-device runs) next to
+events.jsonl:
+
+    run   (key, value)              start_time, mode, measurement_started, …
+    jobs  (id, kind, idx, at_hour, run_at, payload, status, updated)
+          id      "plan:<n>" / "interval:<n>"
+          status  pending | running | done | failed | missed | skipped
+
+LongRunScheduler writes every job (with its jitter already applied) before
+handing it to APScheduler and marks it when it finishes, so a restarted
+process (`main.py --resume <run_id>`, or a supervisor restart) rebuilds only
+the jobs that have not run yet and keeps the original start time.
+
+Each call opens its own short-lived connection: jobs finish on APScheduler
+worker threads, and sqlite3 connections must not cross threads.
+"""
+
+import contextlib
+import datetime
+import json
+import sqlite3
+import threading
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS run (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id      TEXT PRIMARY KEY,
+    kind    TEXT NOT NULL,
+    idx     INTEGER NOT NULL,
+    at_hour REAL,
+    run_at  TEXT NOT NULL,
+    payload TEXT,
+    status  TEXT NOT NULL DEFAULT 'pending',
+    updated TEXT
+);
+"""
+
+FINISHED = ("done", "failed", "missed", "skipped")
+
+
+class ScheduleStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._conn() as db:
+            db.executescript(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _conn(self):
+        """Connection committed on success and always closed."""
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------------
+    # Run metadata
+    # ------------------------------------------------------------------
+
+    def get(self, key: str, default=None):
+        with self._conn() as db:
+            row = db.execute("SELECT value FROM run WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key: str, value) -> None:
+        with self._lock, self._conn() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO run (key, value) VALUES (?, ?)",
+                (key, json.dumps(value, ensure_ascii=False)),
+            )
+
+    @property
+    def start_time(self) -> datetime.datetime | None:
+        value = self.get("start_time")
+        return datetime.datetime.fromisoformat(value) if value else None
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def add_job(
+        self,
+        kind: str,
+        idx: int,
+        run_at: datetime.datetime,
+        at_hour: float | None = None,
+        payload: dict | None = None,
+    ) -> str:
+        """Record a job (no-op if it already exists). Returns its id."""
+        job_id = f"{kind}:{idx}"
+        with self._lock, self._conn() as db:
+            db.execute(
+                "INSERT OR IGNORE INTO jobs (id, kind, idx, at_hour, run_at, payload, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, idx, at_hour, run_at.isoformat(),
+                 json.dumps(payload or {}, ensure_ascii=False), _now()),
+            )
+        return job_id
+
+    def mark(self, job_id: str, status: str) -> None:
+        with self._lock, self._conn() as db:
+            db.execute("UPDATE jobs SET status = ?, updated = ? WHERE id = ?", (status, _now(), job_id))
+
+    def jobs(self, kind: str | None = None, unfinished: bool = False) -> list[dict]:
+        """Jobs ordered by index; `unfinished` = not yet done / failed / missed / skipped."""
+        sql = "SELECT id, kind, idx, at_hour, run_at, payload, status FROM jobs"
+        where, args = [], []
+        if kind:
+            where.append("kind = ?")
+            args.append(kind)
+        if unfinished:
+            where.append(f"status NOT IN ({', '.join('?' * len(FINISHED))})")
+            args.extend(FINISHED)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._conn() as db:
+            rows = db.execute(sql + " ORDER BY idx", args).fetchall()
+        return [
+            {
+                "id": r[0], "kind": r[1], "idx": r[2], "at_hour": r[3],
+                "run_at": datetime.datetime.fromisoformat(r[4]),
+                "payload": json.loads(r[5] or "{}"), "status": r[6],
+            }
+            for r in rows
+        ]
+
+    def max_index(self, kind: str) -> int:
+        with self._conn() as db:
+            row = db.execute("SELECT MAX(idx) FROM jobs WHERE kind = ?", (kind,)).fetchone()
+        return row[0] if row and row[0] is not None else -1
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat(timespec="seconds")
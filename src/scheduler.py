@@ -12,17 +12,40 @@ Pre-job health checks (in order):
   2. App brought to foreground — driver.bring_to_foreground()
   3. UI health assert          — driver.assert_ui_health()
      (checks that the measurement screen is unobstructed)
-Any check failure triggers 3-step escalating recovery before the job runs.
+Any check failure triggers 3-step escalating recovery before the job runs;
+the steps are tried in the order that has worked best on this device for
+that kind of failure (src/recovery_stats.py).
+
+Host sleep / clock jumps:
+  A ClockMonitor (src/clock_monitor.py) logs `clock_jump_detected` and, on a
+  jump, reconnects ADB / Appium right away (driver.on_wake()) and wakes the
+  scheduler so overdue jobs are looked at immediately. A job that starts more
+  than `late_after_sec` after its slot is handled by the catch-up policy:
+    skip               — missed injections are dropped (logged as job_missed)
+    run_once           — one injection for the whole gap (default)
+    run_all_compressed — every missed injection, `spacing_sec` apart
+  Jobs never overlap: they take turns on the device.
 """
 
 import dataclasses
 import datetime
 import random
+import threading
 import time
 
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.schedulers.background import BackgroundScheduler
 
+from src.clock_monitor import ClockMonitor
+from src.recovery_stats import DEFAULT_STATS_PATH, RecoveryStats
+from src.schedule_store import FINISHED
+
+# APScheduler runs a late job if it is at most this overdue; a resumed run
+# uses the same limit to decide whether a job left behind is still worth running
+_MISFIRE_GRACE_SEC = 3600
+
+CATCH_UP_POLICIES = ("skip", "run_once", "run_all_compressed")
+
 
 # ------------------------------------------------------------------
 # Job result
@@ -37,6 +60,8 @@ class JobResult:
     end_ts: str = ""
     attempt: int = 1
     reason: str = ""
+    health_check: str = ""        # "full" / "cached" / "" (no driver)
+    precheck_sec: float = 0.0     # time from job start to the injection itself
     artifact_paths: list = dataclasses.field(default_factory=list)
 
 
@@ -56,6 +81,9 @@ class LongRunScheduler:
         jitter_seconds: float = 0,
         quiet_hours: dict = None,
         recovery_cfg: dict = None,
+        store=None,
+        catch_up_cfg: dict = None,
+        clock_cfg: dict = None,
     ):
         self.duration_hours = duration_hours
         self.interval_hours = interval_hours
@@ -66,22 +94,177 @@ class LongRunScheduler:
         self.jitter_seconds = float(jitter_seconds or 0)
         self.quiet_hours = quiet_hours or {}
         self.recovery_cfg = recovery_cfg or {}
-
-    def run(self, job_callable, driver=None):
+        self.recovery_stats = (
+            RecoveryStats(self.recovery_cfg.get("stats_path", DEFAULT_STATS_PATH))
+            if self.recovery_cfg.get("adaptive", True) else None
+        )
+        self.store = store            # ScheduleStore — None keeps state in memory only
+        self.resumed = False
+
+        catch_up = catch_up_cfg or {}
+        self.catch_up_policy = catch_up.get("policy", "run_once")
+        if self.catch_up_policy not in CATCH_UP_POLICIES:
+            raise ValueError(
+                f"run.catch_up.policy must be one of {', '.join(CATCH_UP_POLICIES)}, "
+                f"got {self.catch_up_policy!r}"
+            )
+        self.late_after_sec = float(catch_up.get("late_after_sec", 300))
+        self.spacing_sec = float(catch_up.get("spacing_sec", 120))
+        self.clock_cfg = clock_cfg or {}
+        self._job_lock = threading.Lock()   # one job on the device at a time
+        self._caught_up_at = None           # run_once: when the gap was last covered
+        self._sched = None
+        self._driver = None
+        self._running = False
+
+    @property
+    def idle(self) -> bool:
+        """Scheduling and waiting for the next job (no job on the device)."""
+        return self._running and not self._job_lock.locked()
+
+    def run(self, job_callable, driver=None, start: datetime.datetime | None = None):
         """
         Block until the run duration has elapsed.
 
         Args:
-            job_callable: called with (at_hour, payload) kwargs.
+            job_callable: called with (at_hour, payload, job_id) kwargs.
             driver: AndroidDriver instance (optional) used for session health checks.
+            start: original start of a run being resumed (e.g. a restarted
+                   supervisor worker). The run still ends at start + duration;
+                   jobs whose time has already passed are not run again.
+
+        With a ScheduleStore the start time and every job are persisted, and
+        a store that already holds a start time resumes that run: finished
+        jobs are skipped, and only the remaining ones are scheduled.
         """
-        start = datetime.datetime.now()
+        stored = self.store.start_time if self.store else None
+        self.resumed = stored is not None or start is not None
+        start = stored or start or datetime.datetime.now()
         end = start + datetime.timedelta(hours=self.duration_hours)
 
-        if self.plan:
-            self._run_plan(job_callable, driver, start, end)
-        else:
-            self._run_interval(job_callable, driver, start, end)
+        if self.store and stored is None:
+            self.store.set("start_time", start.isoformat())
+            self.store.set("mode", "plan" if self.plan else "interval")
+        if self.resumed:
+            self.reporter.log_event("scheduler_resumed", {
+                "start_time": start.isoformat(),
+                "end_time": end.isoformat(),
+                "from_store": stored is not None,
+            })
+
+        self._driver = driver
+        if self.recovery_stats is not None and driver is not None and driver.device_id:
+            self.reporter.attach_recovery_stats(self.recovery_stats, driver.device_id)
+        monitor = None
+        if self.clock_cfg.get("enabled", True):
+            monitor = ClockMonitor(
+                self.reporter,
+                on_jump=self._on_clock_jump,
+                interval_sec=float(self.clock_cfg.get("interval_sec", 10)),
+                threshold_sec=float(self.clock_cfg.get("threshold_sec", 30)),
+            ).start()
+        self._running = True
+        try:
+            if self.plan:
+                self._run_plan(job_callable, driver, start, end)
+            else:
+                self._run_interval(job_callable, driver, start, end)
+        finally:
+            self._running = False
+            if monitor is not None:
+                monitor.stop()
+
+    def _recovery_kwargs(self) -> dict:
+        """Recovery settings handed to every _run_with_health_check call."""
+        return {
+            "cooldown_seconds": int(self.recovery_cfg.get("cooldown_seconds_between_steps", 30)),
+            "poll_seconds": float(self.recovery_cfg.get("health_poll_seconds", 2)),
+            "stats": self.recovery_stats,
+        }
+
+    def _on_clock_jump(self, info: dict) -> None:
+        """Reconnect on wake (between jobs), then let APScheduler re-check due jobs."""
+        if self._driver is not None:
+            with self._job_lock:
+                try:
+                    self._driver.on_wake()
+                except Exception as e:
+                    self.reporter.log_event("wake_reconnect_failed", {"error": str(e)})
+        if self._sched is not None:
+            self._sched.wakeup()
+
+    def _late_by(self, run_at: datetime.datetime | None) -> float:
+        """Seconds past `run_at` beyond the late_after_sec tolerance (0 = on time)."""
+        if run_at is None:
+            return 0.0
+        late = (datetime.datetime.now() - run_at).total_seconds()
+        return late if late > self.late_after_sec else 0.0
+
+    def _tracked(self, job_id: str | None, fn, run_at: datetime.datetime | None = None,
+                 catch_up: bool = True):
+        """
+        Wrap a job so jobs run one at a time, a late plan job goes through
+        the catch-up policy and the outcome is recorded in the store
+        (a job that returns False was skipped and counts as missed).
+
+        Lateness is measured when APScheduler fires the job, before it waits
+        for the device: a job held up behind a long injection is not late.
+        catch_up=False leaves lateness to the job, which is called as fn(late).
+        """
+        def _job():
+            late = self._late_by(run_at)
+            plan_late = late if catch_up else 0.0
+            with self._job_lock:
+                if plan_late and not self._catch_up_plan(job_id, run_at, plan_late):
+                    if self.store and job_id:
+                        self.store.mark(job_id, "missed")
+                    return
+                if self.store and job_id:
+                    self.store.mark(job_id, "running")
+                try:
+                    ran = fn() if catch_up else fn(late)
+                except Exception:
+                    if self.store and job_id:
+                        self.store.mark(job_id, "failed")
+                    raise
+                finally:
+                    if plan_late and self.catch_up_policy == "run_all_compressed":
+                        time.sleep(self.spacing_sec)  # keep catch-up injections apart
+                if self.store and job_id:
+                    self.store.mark(job_id, "missed" if ran is False else "done")
+        return _job
+
+    def _catch_up_plan(self, job_id: str | None, run_at: datetime.datetime, late: float) -> bool:
+        """Apply the catch-up policy to one overdue plan job. True = run it."""
+        run = self.catch_up_policy == "run_all_compressed" or (
+            self.catch_up_policy == "run_once"
+            and (self._caught_up_at is None or run_at > self._caught_up_at)
+        )
+        if run and self.catch_up_policy == "run_once":
+            self._caught_up_at = datetime.datetime.now()   # later overdue jobs are covered
+        self.reporter.log_event("job_catch_up" if run else "job_missed", {
+            "job": job_id, "run_at": run_at.isoformat(), "late_sec": round(late),
+            "policy": self.catch_up_policy,
+        })
+        return run
+
+    def _resume_check(self, job: dict | None, when: datetime.datetime, grace_sec: float) -> str | None:
+        """
+        On resume: why a job must not be scheduled again ('done', 'missed', …),
+        or None to schedule it. A job left 'running' by the dead process is
+        run again — the injection checkpoint resumes it without duplicates.
+        """
+        if not self.resumed:
+            return None
+        if job is not None and job["status"] in FINISHED:
+            return job["status"]
+        if when < datetime.datetime.now() - datetime.timedelta(seconds=grace_sec):
+            if job is not None:
+                self.store.mark(job["id"], "missed")
+            return "missed"
+        if job is None and self.store is None and when < datetime.datetime.now():
+            return "missed"   # no store: cannot tell whether it already ran
+        return None
 
     # ------------------------------------------------------------------
     # Plan mode — absolute time offsets
@@ -101,18 +284,34 @@ class LongRunScheduler:
             },
         )
 
-        sched = BlockingScheduler(job_defaults={"misfire_grace_time": 3600})
-        cooldown = int(self.recovery_cfg.get("cooldown_seconds_between_steps", 30))
+        # No misfire limit: however late a job fires, the catch-up policy decides
+        sched = self._sched = BlockingScheduler(job_defaults={"misfire_grace_time": None})
+        recovery = self._recovery_kwargs()
+        stored = {j["idx"]: j for j in self.store.jobs("plan")} if self.store else {}
 
-        for item in self.plan:
+        for i, item in enumerate(self.plan):
             at = float(item.get("at_hour", 0))
-            jitter = random.uniform(-self.jitter_seconds, self.jitter_seconds) if self.jitter_seconds else 0
-            when = start + datetime.timedelta(hours=at) + datetime.timedelta(seconds=jitter)
+            job = stored.get(i)
+            if job is not None:
+                # Persisted with its jitter — keep the original time
+                when, jitter = job["run_at"], 0.0
+            else:
+                jitter = random.uniform(-self.jitter_seconds, self.jitter_seconds) if self.jitter_seconds else 0
+                when = start + datetime.timedelta(hours=at) + datetime.timedelta(seconds=jitter)
 
             if when > end:
                 continue
 
+            reason = self._resume_check(job, when, _MISFIRE_GRACE_SEC)
+            if reason:
+                self.reporter.log_event("job_skipped_resume", {
+                    "at_hour": at, "run_at": when.isoformat(), "status": reason,
+                })
+                continue
+
             if _is_quiet_hour(when, self.quiet_hours):
+                if self.store:
+                    self.store.mark(self.store.add_job("plan", i, when, at), "skipped")
                 self.reporter.log_event(
                     "job_skipped_quiet_hours",
                     {"at_hour": at, "run_at": when.isoformat(), "quiet_hours": self.quiet_hours},
@@ -124,17 +323,19 @@ class LongRunScheduler:
                 "other_text": item.get("other_text", ""),
                 "activities": item.get("activities") or [],
             }
+            job_id = self.store.add_job("plan", i, when, at, payload) if self.store else None
             self.reporter.log_event(
                 "schedule_add",
                 {"type": "plan", "at_hour": at, "run_at": when.isoformat(), "jitter_sec": round(jitter, 1)},
             )
 
-            def _make_job(at_h, p, cd):
+            def _make_job(at_h, p, rec, slot):
                 def _job():
-                    _run_with_health_check(job_callable, driver, at_h, p, self.reporter, cd)
+                    _run_with_health_check(job_callable, driver, at_h, p, self.reporter, job_id=slot, **rec)
                 return _job
 
-            sched.add_job(_make_job(at, payload, cooldown), "date", run_date=when)
+            sched.add_job(self._tracked(job_id, _make_job(at, payload, recovery, f"plan:{i}"), when),
+                          "date", run_date=when)
 
         sched.add_job(lambda: sched.shutdown(wait=False), "date", run_date=end)
         sched.start()
@@ -144,12 +345,72 @@ class LongRunScheduler:
     # ------------------------------------------------------------------
 
     def _run_interval(self, job_callable, driver, start, end):
-        sched = BackgroundScheduler(job_defaults={"misfire_grace_time": 3600})
+        sched = self._sched = BackgroundScheduler(job_defaults={"misfire_grace_time": None})
+        interval = datetime.timedelta(hours=self.interval_hours)
         counter = [0]
-        cooldown = int(self.recovery_cfg.get("cooldown_seconds_between_steps", 30))
-
-        def _schedule_next():
+        recovery = self._recovery_kwargs()
+        pending = None
+
+        # A resumed run continues the chain; with nothing recorded yet it
+        # starts like a fresh one
+        resume_chain = self.resumed and (self.store is None or self.store.max_index("interval") >= 0)
+        if resume_chain and self.store:
+            # Re-register the job that was due (or running) when the process
+            # died, else carry on after the last one
+            unfinished = self.store.jobs("interval", unfinished=True)
+            pending = unfinished[-1] if unfinished else None
+            counter[0] = pending["idx"] if pending is not None else self.store.max_index("interval")
+        elif resume_chain:
+            # Continue with the first interval slot that is still ahead
+            elapsed_h = (datetime.datetime.now() - start).total_seconds() / 3600.0
+            counter[0] = max(0, int(elapsed_h // self.interval_hours))
+
+        def _add(idx: int, run_at: datetime.datetime) -> None:
+            job_id = self.store.add_job("interval", idx, run_at) if self.store else None
+            sched.add_job(self._tracked(job_id, lambda late: _job(run_at, idx, late), run_at, catch_up=False),
+                          "date", run_date=run_at)
+
+        def _job(run_at: datetime.datetime, idx: int, late: float) -> bool:
+            runs = 1
+            if late:
+                # The chain only ever holds the next slot, so the slots that
+                # went by while the host slept were never registered
+                now, missed = datetime.datetime.now(), 0
+                while start + (counter[0] + missed + 1) * interval <= min(now, end):
+                    missed += 1
+                runs = {"skip": 0, "run_once": 1, "run_all_compressed": 1 + missed}[self.catch_up_policy]
+                self.reporter.log_event("job_catch_up" if runs else "job_missed", {
+                    "index": counter[0], "run_at": run_at.isoformat(), "late_sec": round(late),
+                    "missed_slots": missed, "runs": runs, "policy": self.catch_up_policy,
+                })
+                counter[0] += missed
+
+            for n in range(runs):
+                if n:
+                    time.sleep(self.spacing_sec)
+                # Check quiet hours at run time (interval jobs are chained dynamically)
+                if _is_quiet_hour(datetime.datetime.now(), self.quiet_hours):
+                    self.reporter.log_event(
+                        "job_skipped_quiet_hours",
+                        {"index": counter[0], "quiet_hours": self.quiet_hours},
+                    )
+                else:
+                    # Each catch-up run is its own injection (own checkpoint)
+                    slot = f"interval:{idx}" + (f"#{n}" if n else "")
+                    _run_with_health_check(job_callable, driver, None, None, self.reporter,
+                                           job_id=slot, **recovery)
+            _schedule_next(caught_up=bool(late))
+            return runs > 0
+
+        def _schedule_next(caught_up: bool = False):
             counter[0] += 1
+            # Slots that went by while the process was down are not replayed;
+            # after a catch-up the gap is covered, so only future slots count
+            horizon = datetime.datetime.now()
+            if not caught_up:
+                horizon -= datetime.timedelta(seconds=_MISFIRE_GRACE_SEC)
+            while start + counter[0] * interval < horizon:
+                counter[0] += 1
             offset_hours = counter[0] * self.interval_hours
             jitter = random.uniform(-self.jitter_seconds, self.jitter_seconds) if self.jitter_seconds else 0
             next_run = start + datetime.timedelta(hours=offset_hours) + datetime.timedelta(seconds=jitter)
@@ -166,19 +427,7 @@ class LongRunScheduler:
                     "jitter_sec": round(jitter, 1),
                 },
             )
-
-            def _job():
-                # Check quiet hours at run time (interval jobs are chained dynamically)
-                if _is_quiet_hour(datetime.datetime.now(), self.quiet_hours):
-                    self.reporter.log_event(
-                        "job_skipped_quiet_hours",
-                        {"index": counter[0], "quiet_hours": self.quiet_hours},
-                    )
-                else:
-                    _run_with_health_check(job_callable, driver, None, None, self.reporter, cooldown)
-                _schedule_next()
-
-            sched.add_job(_job, "date", run_date=next_run)
+            _add(counter[0], next_run)
 
         self.reporter.log_event(
             "scheduler_started",
@@ -194,18 +443,27 @@ class LongRunScheduler:
             },
         )
 
-        if self.start_immediately:
+        if pending is not None and not self._resume_check(pending, pending["run_at"], _MISFIRE_GRACE_SEC):
+            self.reporter.log_event(
+                "schedule_add",
+                {"type": "interval_resumed", "index": pending["idx"], "run_at": pending["run_at"].isoformat()},
+            )
+            sched.add_job(self._tracked(pending["id"], lambda late: _job(pending["run_at"], pending["idx"], late),
+                                        pending["run_at"], catch_up=False),
+                          "date", run_date=max(pending["run_at"], datetime.datetime.now()))
+        elif resume_chain:
+            if pending is not None:
+                self.reporter.log_event("job_skipped_resume", {
+                    "index": pending["idx"], "run_at": pending["run_at"].isoformat(), "status": "missed",
+                })
+            _schedule_next()
+        elif self.start_immediately:
             first_run = datetime.datetime.now() + datetime.timedelta(seconds=5)
             self.reporter.log_event(
                 "schedule_add",
                 {"type": "interval_immediate", "run_at": first_run.isoformat()},
             )
-
-            def _first_job():
-                _run_with_health_check(job_callable, driver, None, None, self.reporter, cooldown)
-                _schedule_next()
-
-            sched.add_job(_first_job, "date", run_date=first_run)
+            _add(0, first_run)
         else:
             _schedule_next()
 
@@ -237,16 +495,26 @@ def _is_quiet_hour(dt: datetime.datetime, quiet_hours: dict) -> bool:
         return h >= start or h < end
 
 
-def _run_with_health_check(job_callable, driver, at_hour, payload, reporter, cooldown_seconds=30):
+def _run_with_health_check(job_callable, driver, at_hour, payload, reporter, cooldown_seconds=30,
+                           stats=None, poll_seconds=2.0, job_id=None):
     """
     Run pre-job health checks then execute the job.
+    `job_id` ("plan:3", "interval:7") identifies the scheduled slot; it is
+    passed on to job_callable so a re-run of the same slot (after a process
+    restart) can resume its injection, and no other slot ever does.
     Returns a JobResult; also emits job_result event to the reporter.
 
     Checks (in order):
       1. Appium session alive
       2. Bring app to foreground
       3. UI health assert (measurement screen unobstructed)
-    Any failure triggers 3-step escalating recovery with cooldown+recheck.
+    Any failure triggers 3-step escalating recovery with a health poll after
+    each step (see _attempt_recovery).
+
+    While the driver's health cache is fresh (verified within
+    android.health_cache_ttl_sec, no session error since) the checks are
+    replaced by one cheap probe; a failed probe falls back to the full
+    checks. Recoveries and failed jobs clear the cache.
     """
     start_ts = datetime.datetime.now().isoformat(timespec="seconds")
     result = JobResult(
@@ -255,14 +523,20 @@ def _run_with_health_check(job_callable, driver, at_hour, payload, reporter, coo
         start_ts=start_ts,
     )
     reporter.log_event("job_start", {"at_hour": at_hour, "start_ts": start_ts})
+    t0 = time.monotonic()
 
-    if driver is not None:
+    if driver is not None and driver.health_cached() and driver.probe_health():
+        result.health_check = "cached"
+        reporter.log_event("health_check_cached", {})
+    elif driver is not None:
+        result.health_check = "full"
         # 1. Session check
         try:
             driver.ensure_session()
         except Exception as e:
             reporter.log_event("session_check_failed", {"error": str(e)})
-            _attempt_recovery(driver, reporter, cooldown_seconds)
+            _attempt_recovery(driver, reporter, cooldown_seconds,
+                              _recovery_signature("session_check_failed", e), stats, poll_seconds)
 
         # 2. Bring app to foreground
         driver.bring_to_foreground()
@@ -273,16 +547,21 @@ def _run_with_health_check(job_callable, driver, at_hour, payload, reporter, coo
             driver.assert_ui_health()
         except Exception as e:
             reporter.log_event("ui_health_check_failed", {"error": str(e)})
-            _attempt_recovery(driver, reporter, cooldown_seconds)
+            _attempt_recovery(driver, reporter, cooldown_seconds,
+                              _recovery_signature("ui_health_check_failed", e), stats, poll_seconds)
+            driver.invalidate_health()   # re-verify fully after a recovery
 
+    result.precheck_sec = round(time.monotonic() - t0, 2)
     try:
-        job_callable(at_hour=at_hour, payload=payload)
+        job_callable(at_hour=at_hour, payload=payload, job_id=job_id)
         result.success = True
         result.reason = "ok"
     except Exception as e:
         result.success = False
         result.reason = str(e)
         reporter.log_event("job_failed", {"error": str(e), "at_hour": at_hour})
+        if driver is not None:
+            driver.invalidate_health()
         raise
     finally:
         result.end_ts = datetime.datetime.now().isoformat(timespec="seconds")
@@ -300,26 +579,62 @@ def _is_instrumentation_crash(exc: Exception) -> bool:
     )
 
 
-def _attempt_recovery(driver, reporter, cooldown_seconds=30):
+def _recovery_signature(context: str, exc: Exception | None) -> str:
+    """Failure signature the recovery statistics are kept under."""
+    if exc is not None and _is_instrumentation_crash(exc):
+        return "instrumentation_crash"
+    return context
+
+
+def _attempt_recovery(driver, reporter, cooldown_seconds=30, signature="unknown",
+                      stats=None, poll_seconds=2.0):
     """
-    3-step escalating recovery with cooldown + UI re-check after each step.
+    Escalating recovery with a UI health poll after each step.
 
     Step 1: back key + short wait
     Step 2: activate_app (force relaunch)
     Step 3: terminate + activate (kill/relaunch)
 
+    With `stats` (RecoveryStats) the steps are tried most-likely-first for
+    this device and failure signature, and every outcome is recorded; with
+    no history the order stays 1 → 2 → 3.
+
     Special case: if UiAutomator2 instrumentation is dead (specific error),
     skip app-level steps and immediately recreate the Appium session.
 
-    After each step: wait cooldown_seconds, then re-check UI health.
-    Returns as soon as a step results in a healthy UI.
+    After each step the UI is polled every `poll_seconds` until healthy,
+    for at most `cooldown_seconds`. Returns as soon as a step results in a
+    healthy UI.
     """
-    for step in [1, 2, 3]:
+    device = getattr(driver, "device_id", "")
+    if not device:
+        stats = None   # no stable id: fixed order, nothing persisted
+
+    def _record(step, ok: bool, waited: float | None = None) -> None:
+        data = {"signature": signature, "step": step, "ok": ok}
+        if waited is not None:
+            data["waited_sec"] = waited
+        reporter.log_event("recovery_step_result", data)
+        if stats is not None:
+            stats.record(device, signature, step, ok)
+
+    if signature == "instrumentation_crash":
+        # Every app-level step is proxied through the dead instrumentation
+        if _recreate_session(driver, reporter):
+            _record("reconnect", True)
+            return
+        _record("reconnect", False)
+
+    steps = stats.order(device, signature) if stats is not None else [1, 2, 3]
+    reporter.log_event("recovery_ladder", {"signature": signature, "order": steps})
+
+    for step in steps:
         reporter.log_event("recovery_step_start", {"step": step})
         try:
             driver.recover_session(step=step)
         except Exception as e:
             reporter.log_event("recovery_step_error", {"step": step, "error": str(e)})
+            _record(step, False)
 
             if _is_instrumentation_crash(e):
                 # UiAutomator2 instrumentation process is dead.
@@ -327,17 +642,10 @@ def _attempt_recovery(driver, reporter, cooldown_seconds=30):
                 # every Appium command is proxied through the dead instrumentation.
                 # Skip remaining steps and recreate the session immediately.
                 reporter.log_event("instrumentation_crash_detected", {"step": step})
-                try:
-                    reporter.log_event("session_recreate_for_instrumentation_crash", {})
-                    driver.reconnect()
-                    driver.wait_idle(2.0)
-                    driver.assert_ui_health()
-                    reporter.log_event("post_recreate_ui_health_result", {"healthy": True})
+                if _recreate_session(driver, reporter):
+                    _record("reconnect", True)
                     return  # recovered
-                except Exception as health_exc:
-                    reporter.log_event("post_recreate_ui_health_result", {
-                        "healthy": False, "error": str(health_exc)
-                    })
+                _record("reconnect", False)
             else:
                 # Non-instrumentation failure — restore session as safety net
                 # before proceeding to the next recovery step.
@@ -348,18 +656,34 @@ def _attempt_recovery(driver, reporter, cooldown_seconds=30):
 
             continue
 
-        # Wait for app to stabilize before checking
-        time.sleep(cooldown_seconds)
-
+        # Poll until the app has stabilized instead of a fixed cooldown
         try:
             driver.ensure_session()
             driver.bring_to_foreground()
-            driver.wait_idle(2.0)
-            driver.assert_ui_health()
-            reporter.log_event("recovery_succeeded", {"step": step})
-            return  # healthy — done
+            waited = driver.wait_ui_health(cooldown_seconds, poll=poll_seconds)
         except Exception:
-            reporter.log_event("recovery_ui_still_unhealthy", {"step": step})
-            # Fall through to next step
+            waited = None
+        _record(step, waited is not None, waited)
+        if waited is not None:
+            reporter.log_event("recovery_succeeded", {"step": step, "waited_sec": waited})
+            return  # healthy — done
+        reporter.log_event("recovery_ui_still_unhealthy", {"step": step})
+        # Fall through to next step
+
+    reporter.log_event("session_recovery_failed", {"tried_steps": len(steps)})
 
-    reporter.log_event("session_recovery_failed", {"tried_steps": 3})
+
+def _recreate_session(driver, reporter) -> bool:
+    """Recreate the Appium session and verify the UI. True when healthy."""
+    try:
+        reporter.log_event("session_recreate_for_instrumentation_crash", {})
+        driver.reconnect()
+        driver.wait_idle(2.0)
+        driver.assert_ui_health()
+        reporter.log_event("post_recreate_ui_health_result", {"healthy": True})
+        return True
+    except Exception as health_exc:
+        reporter.log_event("post_recreate_ui_health_result", {
+            "healthy": False, "error": str(health_exc)
+        })
+        return False
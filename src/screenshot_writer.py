@@ -0,0 +1,156 @@
+"""
+Asynchronous screenshot writer.
+
+The device capture (`get_screenshot_as_base64`) has to happen on the workflow
+thread — it must show the screen at that moment. Everything after it runs on
+a background thread: base64 decode, optional downscale / re-encode, near-
+duplicate detection and the disk write.
+
+Encoding (artifacts.screenshots.format):
+  png  — original PNG bytes from the device (no re-encode)
+  jpeg — optionally downscaled JPEG   (requires Pillow)
+  webp — optionally downscaled WebP   (requires Pillow)
+
+Dedup: consecutive frames whose 64-bit difference hash (dHash) differs by at
+most `dedup_distance` bits are not written again; the skip is recorded in
+screenshots/dedup.jsonl so every returned path can still be resolved.
+Frames submitted with force=True (failure evidence) are always written.
+
+With a BlobStore (`store`) frames go through store.put() instead of becoming
+files in ss_dir, and a deduplicated frame is recorded in the store's
+manifest as another occurrence of the frame it repeats.
+Pillow is in requirements.txt; without it the formats fall back to PNG and
+dedup to byte-identical frames, with a warning when the writer starts.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import queue
+import threading
+
+try:
+    from PIL import Image
+except ImportError:  # optional dependency
+    Image = None
+
+_EXT = {"png": "png", "jpeg": "jpg", "jpg": "jpg", "webp": "webp"}
+
+
+def _dhash(img) -> int:
+    """64-bit difference hash: compares adjacent pixels of a 9x8 greyscale thumbnail."""
+    small = img.convert("L").resize((9, 8))
+    px = list(small.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = px[row * 9 + col]
+            right = px[row * 9 + col + 1]
+            bits = (bits << 1) | (1 if left > right else 0)
+    return bits
+
+
+class ScreenshotWriter:
+    def __init__(self, ss_dir: str, cfg: dict | None = None, store=None):
+        cfg = cfg or {}
+        self.ss_dir = ss_dir
+        self.store = store
+        fmt = str(cfg.get("format", "png")).lower()
+        if fmt not in _EXT or (fmt != "png" and Image is None):
+            if fmt != "png":
+                logging.warning("[SCREENSHOT] format %r needs Pillow — writing PNG", fmt)
+            fmt = "png"
+        self.format = fmt
+        self.scale = float(cfg.get("scale", 1.0))
+        self.quality = int(cfg.get("quality", 80))
+        self.dedup = bool(cfg.get("dedup", True))
+        self.dedup_distance = int(cfg.get("dedup_distance", 4))
+        if self.dedup and Image is None:
+            logging.warning("[SCREENSHOT] dedup without Pillow only skips byte-identical frames")
+        self._q: queue.Queue = queue.Queue(maxsize=int(cfg.get("queue_size", 64)))
+        self._prev_hash = None
+        self._prev_path = ""
+        self._prev_blob = ""
+        self._thread = threading.Thread(target=self._run, name="screenshot-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def ext(self) -> str:
+        return _EXT[self.format]
+
+    def submit(self, b64_png: str, path: str, force: bool = False) -> None:
+        """
+        Queue a captured frame; blocks only if the writer is far behind.
+        force=True writes it even if it duplicates the previous frame.
+        """
+        self._q.put((b64_png, path, force))
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Block until every queued frame has been written (or skipped)."""
+        if timeout is None:
+            self._q.join()
+            return
+        done = threading.Event()
+        threading.Thread(target=lambda: (self._q.join(), done.set()), daemon=True).start()
+        done.wait(timeout)
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            b64_png, path, force = self._q.get()
+            try:
+                self._write(base64.b64decode(b64_png), path, force)
+            except Exception as e:
+                logging.info("[SCREENSHOT] write failed for %s: %s", path, e)
+            finally:
+                self._q.task_done()
+
+    def _write(self, png: bytes, path: str, force: bool = False) -> None:
+        img = None
+        if Image is not None and (self.dedup or self.format != "png"):
+            img = Image.open(io.BytesIO(png))
+
+        if self.dedup:
+            if img is not None:
+                h = _dhash(img)
+                dup = self._prev_hash is not None and bin(h ^ self._prev_hash).count("1") <= self.dedup_distance
+            else:
+                h = hashlib.sha1(png).hexdigest()
+                dup = h == self._prev_hash
+            if dup and self._prev_path and not force:
+                self._record_dup(path, self._prev_path)
+                return
+            self._prev_hash = h
+
+        if self.format == "png":
+            data = png
+        else:
+            if self.scale != 1.0:
+                w, h = img.size
+                img = img.resize((max(1, int(w * self.scale)), max(1, int(h * self.scale))))
+            buf = io.BytesIO()
+            if self.format in ("jpeg", "jpg"):
+                img.convert("RGB").save(buf, "JPEG", quality=self.quality, optimize=True)
+            else:
+                img.save(buf, "WEBP", quality=self.quality)
+            data = buf.getvalue()
+
+        if self.store is not None:
+            self._prev_blob = self.store.put(data, os.path.basename(path), event="screenshot")
+        else:
+            with open(path, "wb") as f:
+                f.write(data)
+        self._prev_path = path
+
+    def _record_dup(self, path: str, same_as: str) -> None:
+        if self.store is not None and self._prev_blob:
+            self.store.ref(self._prev_blob, os.path.basename(path), event="screenshot")
+        rec = {"path": os.path.basename(path), "same_as": os.path.basename(same_as)}
+        with open(os.path.join(self.ss_dir, "dedup.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec) + "\n")
@@ -0,0 +1,239 @@
+"""
+Multi-device supervisor — one worker process per device.
+
+    python src/supervisor.py --config config/my-app.yaml [--max-workers 4]
+
+Every entry of the config's `devices:` list (or the single `android:` device)
+runs as its own `src/main.py --device <udid>` process (`--device-index <n>`
+for an entry without a udid), so a crashed Appium session, driver or
+interpreter only takes down that device, and screenshot encoding / XML
+parsing / HTTP clients of different phones never share a GIL.
+
+Per worker the supervisor:
+  - passes a fixed output dir (<run>/devices/<udid>/) and, on restart, the
+    run's start time, so a restarted worker appends to the same event log, resumes an
+    interrupted injection from its checkpoint and only schedules what is
+    left of the run (see LongRunScheduler.run(start=...))
+  - watches the worker's events.jsonl; a worker that stops writing for
+    `heartbeat_timeout_sec` is killed and restarted. The worker only sends
+    heartbeats while it is idle between jobs or still logging progress, so
+    a job stuck in a blocked Appium / adb call goes silent
+  - restarts a worker that exits non-zero, up to `max_restarts` times with
+    `restart_backoff_sec` between attempts
+At most `max_workers` workers run at once; the rest wait for a free slot.
+
+Config (all optional):
+    supervisor:
+      max_workers: 4
+      heartbeat_sec: 60
+      heartbeat_timeout_sec: 600
+      max_restarts: 5
+      restart_backoff_sec: 30
+"""
+
+import argparse
+import dataclasses
+import datetime
+import os
+import subprocess
+import sys
+import time
+
+# Allow running as `python src/supervisor.py` from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yaml
+
+from src.device_manager import device_dirname
+from src.reporter import RunReporter
+
+_MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+_POLL_SEC = 5.0
+
+
+@dataclasses.dataclass
+class Worker:
+    udid: str                     # label: the device's udid, or "device<n>" without one
+    out_dir: str
+    select: list = dataclasses.field(default_factory=list)   # main.py device-selection args
+    proc: subprocess.Popen | None = None
+    restarts: int = 0
+    done: bool = False
+    error: str = ""
+    next_start: float = 0.0       # monotonic time the (re)start is due
+    events_size: int = 0          # events.jsonl size at the last heartbeat check
+    last_beat: float = 0.0
+
+    @property
+    def events_path(self) -> str:
+        return os.path.join(self.out_dir, "events.jsonl")
+
+
+class Supervisor:
+    def __init__(self, config_path: str, cfg: dict, run_dir: str, reporter: RunReporter):
+        sup = cfg.get("supervisor") or {}
+        self.config_path = config_path
+        self.run_dir = run_dir
+        self.reporter = reporter
+        self.max_workers = max(1, int(sup.get("max_workers", 4)))
+        self.heartbeat_sec = float(sup.get("heartbeat_sec", 60))
+        self.heartbeat_timeout = float(sup.get("heartbeat_timeout_sec", 600))
+        self.max_restarts = int(sup.get("max_restarts", 5))
+        self.backoff = float(sup.get("restart_backoff_sec", 30))
+        self.started_at = datetime.datetime.now().isoformat(timespec="seconds")
+
+        listed = bool(cfg.get("devices"))
+        devices = cfg.get("devices") or [cfg.get("android") or {}]
+        self.workers = []
+        for i, dev in enumerate(devices):
+            real = (dev or {}).get("udid") or ""
+            if real:
+                select = ["--device", real]
+            elif listed:
+                select = ["--device-index", str(i)]
+            else:
+                select = []   # the single android: device, as configured
+            udid = real or f"device{i + 1}"   # made-up name: folder / label only
+            out_dir = os.path.join(run_dir, "devices", device_dirname(udid))
+            os.makedirs(out_dir, exist_ok=True)
+            self.workers.append(Worker(udid=udid, out_dir=out_dir, select=select))
+
+    # ------------------------------------------------------------------
+    # Worker lifecycle
+    # ------------------------------------------------------------------
+
+    def _start(self, w: Worker) -> None:
+        cmd = [
+            sys.executable, _MAIN,
+            "--config", self.config_path,
+            *w.select,
+            "--out-dir", w.out_dir,
+            "--heartbeat", str(self.heartbeat_sec),
+        ]
+        if w.restarts:
+            cmd += ["--started-at", self.started_at]  # resume: same end time
+        log = open(os.path.join(w.out_dir, "worker.log"), "a", encoding="utf-8")
+        w.proc = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT)
+        log.close()  # the child holds its own handle
+        w.last_beat = time.monotonic()
+        w.events_size = _size(w.events_path)
+        self.reporter.log_event("worker_started", {
+            "udid": w.udid, "pid": w.proc.pid, "restarts": w.restarts,
+        })
+
+    def _exited(self, w: Worker, code: int) -> None:
+        w.proc = None
+        if code == 0:
+            w.done, w.error = True, ""
+            self.reporter.log_event("worker_finished", {"udid": w.udid})
+            return
+        w.error = f"exit code {code}"
+        self._schedule_restart(w, "crashed")
+
+    def _schedule_restart(self, w: Worker, reason: str) -> None:
+        if w.restarts >= self.max_restarts:
+            w.done = True
+            self.reporter.log_event("worker_gave_up", {
+                "udid": w.udid, "reason": reason, "restarts": w.restarts, "error": w.error,
+            })
+            return
+        w.restarts += 1
+        w.next_start = time.monotonic() + self.backoff
+        self.reporter.log_event("worker_restarting", {
+            "udid": w.udid, "reason": reason, "restart": w.restarts,
+            "error": w.error, "backoff_sec": self.backoff,
+        })
+
+    def _check_heartbeat(self, w: Worker) -> None:
+        """Any growth of the worker's event log counts as a heartbeat."""
+        size = _size(w.events_path)
+        now = time.monotonic()
+        if size != w.events_size:
+            w.events_size, w.last_beat = size, now
+            return
+        if now - w.last_beat < self.heartbeat_timeout:
+            return
+        w.error = f"no heartbeat for {int(now - w.last_beat)}s"
+        self.reporter.log_event("worker_hung", {"udid": w.udid, "pid": w.proc.pid, "error": w.error})
+        w.proc.kill()
+        w.proc.wait()
+        w.proc = None
+        self._schedule_restart(w, "hung")
+
+    # ------------------------------------------------------------------
+    # Main loop
+    # ------------------------------------------------------------------
+
+    def run(self) -> dict[str, str]:
+        """Supervise until every worker finished or gave up. Returns {udid: error}."""
+        self.reporter.log_event("supervisor_started", {
+            "devices": [w.udid for w in self.workers],
+            "max_workers": self.max_workers,
+            "started_at": self.started_at,
+        })
+        try:
+            while not all(w.done for w in self.workers):
+                for w in self.workers:
+                    if w.proc is None:
+                        continue
+                    code = w.proc.poll()
+                    if code is None:
+                        self._check_heartbeat(w)
+                    else:
+                        self._exited(w, code)
+
+                running = sum(1 for w in self.workers if w.proc is not None)
+                now = time.monotonic()
+                for w in self.workers:
+                    if running >= self.max_workers:
+                        break
+                    if w.proc is None and not w.done and now >= w.next_start:
+                        self._start(w)
+                        running += 1
+                time.sleep(_POLL_SEC)
+        finally:
+            for w in self.workers:
+                if w.proc is not None and w.proc.poll() is None:
+                    w.proc.terminate()
+        return {w.udid: w.error for w in self.workers}
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run one SpatchEx worker process per device")
+    ap.add_argument("--config", required=True, help="Path to run.yaml")
+    ap.add_argument("--max-workers", type=int, help="Override supervisor.max_workers")
+    args = ap.parse_args()
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        cfg = yaml.safe_load(f)
+    if args.max_workers:
+        cfg.setdefault("supervisor", {})["max_workers"] = args.max_workers
+
+    run_cfg = cfg.get("run") or {}
+    run_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    run_dir = os.path.join("output", run_id)
+    os.makedirs(run_dir, exist_ok=True)
+    reporter = RunReporter(out_dir=run_dir, run_name=run_cfg.get("name", "run"))
+
+    supervisor = Supervisor(args.config, cfg, run_dir, reporter)
+    errors = supervisor.run()
+    reporter.log_event("supervisor_finished", {"errors": errors})
+    try:
+        reporter.render_fleet_summary([
+            (w.udid, reporter.child(os.path.relpath(w.out_dir, run_dir), label=w.udid), w.error)
+            for w in supervisor.workers
+        ])
+    except Exception:
+        pass
+    sys.exit(1 if any(errors.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,22 @@
 import json
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
 
 _ROOT = Path(__file__).resolve().parent.parent
 TIMELINE_FILE = str(_ROOT / "artifacts" / "timeline.json")
 
+# Device threads of a multi-device run share the file (read-modify-write)
+_lock = threading.Lock()
+
 
 def log_event(event: str):
+    with _lock:
+        _append(event)
+
+
+def _append(event: str):
     os.makedirs(os.path.dirname(TIMELINE_FILE), exist_ok=True)
 
     if not os.path.exists(TIMELINE_FILE):
@@ -0,0 +1,84 @@
+"""
+Persisted step progress for multi-step workflows.
+
+A StepCheckpoint records which steps of one workflow run have completed in
+a small JSON file under the run's output directory. When a retry starts it
+loads the file and, if it belongs to the same run (same key, recent
+enough), the workflow can resume after the last completed step instead of
+starting over — e.g. not reopening the symptom picker once the diary entry
+has already been saved.
+
+File format:
+    {"key": "...", "updated": <epoch>, "completed": ["step", ...], "data": {...}}
+"""
+
+import json
+import logging
+import os
+import time
+
+
+class StepCheckpoint:
+    def __init__(self, path: str, key: str, max_age_sec: float = 600.0):
+        self.path = path
+        self.key = key
+        self.completed: list[str] = []
+        self.data: dict = {}
+        self._load(max_age_sec)
+
+    def _load(self, max_age_sec: float) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        if saved.get("key") != self.key:
+            return
+        if time.time() - float(saved.get("updated", 0)) > max_age_sec:
+            return
+        self.completed = list(saved.get("completed") or [])
+        self.data = dict(saved.get("data") or {})
+
+    @property
+    def last(self) -> str | None:
+        return self.completed[-1] if self.completed else None
+
+    def done(self, step: str) -> bool:
+        return step in self.completed
+
+    def complete(self, step: str, **data) -> None:
+        """Mark `step` completed (with optional data) and persist immediately."""
+        if step not in self.completed:
+            self.completed.append(step)
+        self.data.update(data)
+        self._save()
+
+    def note(self, **data) -> None:
+        """Persist facts learned mid-step (e.g. the entry was saved)."""
+        self.data.update(data)
+        self._save()
+
+    def reset(self) -> None:
+        self.completed = []
+        self.data = {}
+        self._save()
+
+    def clear(self) -> None:
+        """The run finished — drop the file so nothing resumes from it."""
+        self.completed = []
+        self.data = {}
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _save(self) -> None:
+        rec = {"key": self.key, "updated": time.time(), "completed": self.completed, "data": self.data}
+        tmp = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(rec, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.info("[CHECKPOINT] save failed for %s: %s", self.path, e)
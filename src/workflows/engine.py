@@ -0,0 +1,277 @@
+"""
+Small step-graph workflow engine.
+
+A Workflow is an ordered list of Steps plus an overall time budget. Each
+step names an action (a registered Python function, or one of the generic
+actions below), a time budget, an optional success condition and fallbacks:
+
+    steps:
+      - name: picker_open
+        action: picker_open            # registered action
+        timeout: 30                    # seconds for this step (incl. `until`)
+        until: symptom_picker_title    # selector key (or literal) that must appear
+        fallbacks:                     # tried in order until `until` holds
+          - {action: tap, target: symptom_add_text}
+        evidence: picker_not_opened    # screenshot (always kept) if `until` never holds
+        optional: false                # true = log and continue on failure
+
+Generic actions: tap (target), back, wait (seconds), foreground.
+
+The budget is a Deadline that propagates to every step: a step gets
+min(step timeout, time left in the budget) and the runner refuses to start
+a step once the budget is spent (DeadlineExceeded). Actions are expected to
+honour the timeout they are given; as a backstop the runner also checks the
+budget after every action and fallback, so a blocking call can overrun the
+budget by at most itself and the flow then stops instead of carrying on.
+
+Workflows are defined in code (the built-in flow) and can be tuned from YAML
+under `workflows.android.<name>`. A YAML step only needs `name` plus the
+fields it changes — anything omitted is taken from the built-in step of the
+same name, so budgets can be tuned without re-listing actions.
+"""
+
+import dataclasses
+import logging
+import time
+from typing import Callable
+
+from src.driver import AndroidDriver
+
+
+class DeadlineExceeded(RuntimeError):
+    """The workflow's overall time budget ran out."""
+
+
+class StepFailed(RuntimeError):
+    """A step's success condition was not met, even after its fallbacks."""
+
+
+class Deadline:
+    """Absolute monotonic deadline; None seconds = unbounded."""
+
+    def __init__(self, seconds: float | None):
+        self.budget = seconds
+        self.expires_at = None if seconds is None else time.monotonic() + float(seconds)
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return float("inf")
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def cap(self, timeout: float) -> float:
+        """`timeout` limited to what is left of the budget."""
+        return max(0.0, min(float(timeout), self.remaining()))
+
+    def check(self, what: str) -> None:
+        if self.expired:
+            raise DeadlineExceeded(f"Time budget of {self.budget}s exhausted before '{what}'")
+
+    def check_after(self, what: str) -> None:
+        if self.expired:
+            raise DeadlineExceeded(f"Time budget of {self.budget}s exhausted during '{what}'")
+
+
+@dataclasses.dataclass
+class Step:
+    name: str
+    action: str
+    timeout: float = 30.0
+    until: str | list | None = None
+    fallbacks: list[dict] = dataclasses.field(default_factory=list)
+    optional: bool = False
+    checkpoint: bool = True      # record completion in the run's StepCheckpoint
+    target: str | list | None = None
+    wait: float = 0.0
+    evidence: str | None = None  # screenshot name captured when `until` is not met
+
+    @classmethod
+    def from_cfg(cls, raw: dict, base: "Step | None" = None) -> "Step":
+        fields = dataclasses.asdict(base) if base else {}
+        fields.update({k: v for k, v in raw.items() if k in cls.__dataclass_fields__})
+        if "action" not in fields:
+            fields["action"] = fields["name"]
+        return cls(**fields)
+
+
+@dataclasses.dataclass
+class Workflow:
+    name: str
+    steps: list[Step]
+    budget_sec: float | None = None
+
+    @classmethod
+    def load(cls, default: "Workflow", cfg: dict | None) -> "Workflow":
+        """Built-in workflow, overridden by `workflows.android.<name>` if configured."""
+        wf_cfg = (cfg or {}).get(default.name) or {}
+        if not wf_cfg:
+            return default
+        by_name = {s.name: s for s in default.steps}
+        steps = default.steps
+        if wf_cfg.get("steps"):
+            steps = [Step.from_cfg(raw, by_name.get(raw.get("name"))) for raw in wf_cfg["steps"]]
+        return cls(default.name, steps, wf_cfg.get("budget_sec", default.budget_sec))
+
+    def step_names(self) -> list[str]:
+        return [s.name for s in self.steps]
+
+
+# action(d, ctx, step, timeout) — timeout is already capped by the deadline;
+# actions pass it (not a fixed wait) to whatever they block on
+Action = Callable[[AndroidDriver, dict, Step, float], None]
+
+
+def _resolve(d: AndroidDriver, spec):
+    """Selector key → configured value; anything else is used literally."""
+    if isinstance(spec, str) and spec in d.sel:
+        return d.sel[spec]
+    return spec
+
+
+def _generic_tap(d: AndroidDriver, ctx: dict, step: Step, timeout: float) -> None:
+    d.tap_text(_resolve(d, step.target), timeout=timeout, contains=True, deadline=Deadline(timeout))
+
+
+def _generic_back(d: AndroidDriver, ctx: dict, step: Step, timeout: float) -> None:
+    d.press_keycode(4)  # KEYCODE_BACK
+
+
+def _generic_wait(d: AndroidDriver, ctx: dict, step: Step, timeout: float) -> None:
+    d.wait_idle(min(step.wait or 1.0, timeout))
+
+
+def _generic_foreground(d: AndroidDriver, ctx: dict, step: Step, timeout: float) -> None:
+    d.bring_to_foreground()
+
+
+GENERIC_ACTIONS: dict[str, Action] = {
+    "tap": _generic_tap,
+    "back": _generic_back,
+    "wait": _generic_wait,
+    "foreground": _generic_foreground,
+}
+
+
+class WorkflowRunner:
+    """
+    Execute a Workflow against one driver.
+
+    `actions` maps action names to functions; generic actions are always
+    available. `timer` (a StepTimer) receives one span per step and
+    `checkpoint` (a StepCheckpoint) records each completed step, which the
+    runner also uses to skip steps completed by an earlier attempt.
+    """
+
+    def __init__(
+        self,
+        d: AndroidDriver,
+        workflow: Workflow,
+        actions: dict[str, Action],
+        ctx: dict,
+        deadline: Deadline | None = None,
+        timer=None,
+        checkpoint=None,
+    ):
+        self.d = d
+        self.workflow = workflow
+        self.actions = {**GENERIC_ACTIONS, **actions}
+        self.ctx = ctx
+        self.deadline = deadline or Deadline(workflow.budget_sec)
+        self.timer = timer
+        self.checkpoint = checkpoint
+
+    def run(self, start_at: str | None = None) -> None:
+        names = self.workflow.step_names()
+        first = names.index(start_at) if start_at in names else 0
+        for step in self.workflow.steps[first:]:
+            if self.checkpoint is not None and step.checkpoint and self.checkpoint.done(step.name):
+                continue
+            self.deadline.check(step.name)
+            if self.timer:
+                self.timer.begin(step.name)
+            t0 = time.monotonic()
+            try:
+                self._run_step(step, self.deadline.cap(step.timeout))
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                if not step.optional:
+                    raise
+                if self.timer:
+                    self.timer.end(ok=False)
+                logging.info("[WORKFLOW] optional step %s failed: %s", step.name, e)
+                self.d.reporter.log_event("workflow_step_skipped", {
+                    "workflow": self.workflow.name, "step": step.name, "error": str(e),
+                })
+                continue
+            elapsed = time.monotonic() - t0
+            if elapsed > step.timeout:
+                self.d.reporter.log_event("workflow_step_over_budget", {
+                    "workflow": self.workflow.name,
+                    "step": step.name,
+                    "elapsed_sec": round(elapsed, 2),
+                    "timeout_sec": step.timeout,
+                })
+            self.ctx["last_step"] = step.name
+            if self.checkpoint is not None and step.checkpoint:
+                self.checkpoint.complete(step.name)
+        if self.timer:
+            self.timer.end()
+
+    def _action(self, name: str) -> Action:
+        try:
+            return self.actions[name]
+        except KeyError:
+            raise StepFailed(f"Workflow '{self.workflow.name}': unknown action '{name}'") from None
+
+    def _run_step(self, step: Step, timeout: float) -> None:
+        step_deadline = Deadline(timeout)
+        error: Exception | None = None
+        try:
+            self._action(step.action)(self.d, self.ctx, step, timeout)
+            self.deadline.check_after(step.name)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            if not step.fallbacks:
+                raise
+            error = e
+        if error is None and self._until_met(step, step_deadline):
+            return
+
+        for raw in step.fallbacks:
+            fb = Step.from_cfg({"name": f"{step.name}.fallback", **raw})
+            self.d.reporter.log_event("workflow_fallback", {
+                "workflow": self.workflow.name, "step": step.name, "action": fb.action,
+            })
+            try:
+                self._action(fb.action)(self.d, self.ctx, fb, step_deadline.remaining())
+                self.deadline.check_after(fb.name)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                error = e
+                continue
+            error = None
+            if self._until_met(step, step_deadline):
+                return
+
+        if step.evidence:
+            self.d.screenshot(step.evidence, evidence=True)
+        if error is not None:
+            raise error
+        raise StepFailed(
+            f"Step '{step.name}': {step.until!r} not visible within {step.timeout}s"
+        )
+
+    def _until_met(self, step: Step, step_deadline: Deadline) -> bool:
+        if not step.until:
+            return True
+        # Live query — `until` is often checked while the symptom picker is up
+        found, _ = self.d.wait_any(
+            {"until": _resolve(self.d, step.until)}, step_deadline.remaining(), live=True
+        )
+        return found is not None
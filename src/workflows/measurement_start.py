@@ -1,181 +1,217 @@
 """
-Best-effort, idempotent measurement start flow.
-
-Supported paths:
-  A)  Already running          → 'Add Symptom' visible → return immediately
-  A1) Running but sub-screen   → dismiss dialog / tap main tab → return
-  A2) "검사 진행 현황" screen  → press back → continue to B
-  B)  Home screen (Korean)     → 'Start Now' → consent (all-agree + agree)
-                                  → [test_info popup if web-portal test found]
-                                  → [offline popup if no test found]
-                                  → 'Use S-Patch' → duration → 'Confirm'
-                                  → [battery warning popup]
-  B)  Home screen (English)    → 'Start Now' → consent (checkbox + Accept)
-                                  → [test_info popup if web-portal test found]
-                                  → [offline popup "No test found" if offline]
-                                  → duration → 'Confirm'
+Best-effort, idempotent measurement start flow — driven by a screen state machine.
+
+Each iteration takes ONE hierarchy snapshot, classifies the current SpatchEx
+screen (see MEASUREMENT_SCREENS) and jumps straight to that screen's handler,
+instead of probing every possible screen in a fixed order.
+
+Screens (first match wins):
+  running           'Add Symptom' visible                → done
+  connection_lost   "S-Patch connection lost" popup      → tap confirm
+  battery_warning   "Not a New Battery" popup            → checkbox + start
+  duration_sheet    'Select a test period'               → duration → 'Confirm'
+  test_info         web-portal test found popup          → confirm
+  offline           "No test found" / offline popup      → offline consent
+  consent           'Agree' (+ 'Agree to All')           → agree
+  use_spatch        'Use S-Patch'                        → tap
+  dialog            any confirm/OK dialog                → tap confirm
+  status_screen     "검사 진행 현황" status screen        → press back
+  home              'Start Now'                          → tap
+  sub_tab           running but on a sub-tab (e.g. Diary) → tap main tab
+  (none)            loading / web-portal query pending   → wait_any poll
+
+`dialog` matches any confirm button, so it must follow every popup whose
+handler taps confirm itself (connection_lost … consent), and precede the
+plain screens: an overlay (e.g. the ECG quality warning) has to be closed
+before status_screen / home / sub_tab can act on what is underneath.
 
 Offline detection:
   `offline_mode_text` (KO: "오프라인 모드로 실행" / EN: "No test found") triggers
   the offline consent flow: tick checkbox → tap confirm button.
 """
 
+import time
+
 from src.driver import AndroidDriver
 from src.retry import retry
+from src.workflows.engine import Deadline
+from src.workflows.screens import Screen, classify_screen
+
+# Overall budget for reaching the running screen, per attempt
+# (override: workflows.android.measurement_start.budget_sec). With
+# @retry(tries=3) the worst case is three budgets — about 9 minutes.
+_START_BUDGET_SEC = 180
+# Same screen handled this many times in a row → the handler is not working
+_MAX_SAME_SCREEN = 5
+
+
+# ------------------------------------------------------------------
+# Transition actions — each handles exactly one screen
+# ------------------------------------------------------------------
+
+
+def _on_connection_lost(d: AndroidDriver, ctx: dict) -> None:
+    d.reporter.log_event("connection_lost_popup_detected", {"attempt": ctx["repeats"]})
+    ok_btn = d.sel.get("confirm_text", "OK")
+    if d.is_visible_text(ok_btn):
+        d.tap_text(ok_btn, contains=False)
+    d.wait_idle(2.0)
+
+
+def _on_battery_warning(d: AndroidDriver, ctx: dict) -> None:
+    d.reporter.log_event("battery_warning_detected", {})
+    checkbox = d.sel.get("battery_confirm_checkbox_text")
+    if checkbox and d.is_visible_text(checkbox):
+        d.tap_text(checkbox, contains=True)
+        d.wait_idle(0.5)
+    start_btn = d.sel.get("battery_confirm_start_text")
+    if start_btn and d.is_visible_text(start_btn):
+        d.tap_text(start_btn, contains=False)
+    d.wait_idle(2.0)
+
+
+def _on_duration_sheet(d: AndroidDriver, ctx: dict) -> None:
+    _select_duration(d, ctx["duration_hours"])
+    confirm = d.sel.get("confirm_text", "Confirm")
+    if d.is_visible_text(confirm):
+        d.tap_text(confirm, contains=False)
+    d.wait_idle(2.0)
+
+
+def _on_test_info(d: AndroidDriver, ctx: dict) -> None:
+    d.reporter.log_event("test_info_popup_detected", {})
+    confirm_btn = d.sel.get("confirm_text", "확인")
+    if d.is_visible_text(confirm_btn):
+        d.tap_text(confirm_btn, contains=False)
+    d.wait_idle(1.5)
+
+
+def _on_offline(d: AndroidDriver, ctx: dict) -> None:
+    d.reporter.log_event("offline_mode_detected", {})
+    _handle_offline_consent(d)
+    d.wait_idle(1.0)
+
+
+def _on_consent(d: AndroidDriver, ctx: dict) -> None:
+    # Tap "Agree to All" checkbox first if present (required before confirm button)
+    all_agree = d.sel.get("consent_all_agree_text")
+    if all_agree and d.is_visible_text(all_agree):
+        d.tap_text(all_agree, contains=True)
+        d.wait_idle(0.5)
+    d.tap_text(d.sel.get("consent_agree_text", "Agree"), contains=False)
+    d.wait_idle(1.5)
+
+
+def _on_use_spatch(d: AndroidDriver, ctx: dict) -> None:
+    d.tap_text(d.sel.get("use_spatch_text", "Use S-Patch"))
+    d.wait_idle(1.5)
+
+
+def _on_status_screen(d: AndroidDriver, ctx: dict) -> None:
+    d.reporter.log_event("measurement_status_screen_detected", {})
+    d.press_keycode(4)  # KEYCODE_BACK
+    d.wait_idle(1.5)
+
+
+def _on_sub_tab(d: AndroidDriver, ctx: dict) -> None:
+    d.tap_text(d.sel.get("main_tab_text"), timeout=5, contains=True)
+    d.wait_idle(1.0)
+
+
+def _on_home(d: AndroidDriver, ctx: dict) -> None:
+    d.reporter.log_event("tapping_start_now", {})
+    d.tap_text(d.sel.get("start_now_text", "Start Now"), contains=False)
+    d.wait_idle(2.0)
+
+
+def _on_dialog(d: AndroidDriver, ctx: dict) -> None:
+    # Overlay dialogs (e.g. ECG quality warning) on top of any screen
+    d.tap_text(d.sel.get("confirm_text"), timeout=3, contains=False)
+    d.wait_idle(0.5)
+
+
+MEASUREMENT_SCREENS: list[Screen] = [
+    Screen("running",         "symptom_add_text",               "Add Symptom"),
+    Screen("connection_lost", "connection_lost_text",           None, _on_connection_lost),
+    Screen("battery_warning", "battery_warning_text",           None, _on_battery_warning),
+    Screen("duration_sheet",  "duration_sheet_title",           "Select a test period", _on_duration_sheet),
+    Screen("test_info",       "test_info_title_text",           None, _on_test_info),
+    Screen("offline",         "offline_mode_text",              "Offline", _on_offline),
+    Screen("consent",         "consent_agree_text",             "Agree", _on_consent),
+    Screen("use_spatch",      "use_spatch_text",                "Use S-Patch", _on_use_spatch),
+    Screen("dialog",          "confirm_text",                   None, _on_dialog),
+    Screen("status_screen",   "measurement_status_screen_text", None, _on_status_screen),
+    Screen("home",            "start_now_text",                 "Start Now", _on_home),
+    Screen("sub_tab",         "main_tab_text",                  None, _on_sub_tab),
+]
 
 
 @retry(tries=3, delay=3)
 def ensure_measurement_started(d: AndroidDriver, duration_hours: int = 24):
     d.reporter.log_event("ensure_measurement_started", {})
 
+    steps = d.reporter.step_timer("measurement_start")
+    try:
+        _drive_to_running(d, duration_hours, steps)
+        steps.end()
+    except Exception:
+        steps.end(ok=False)
+        raise
+
+
+def _drive_to_running(d: AndroidDriver, duration_hours: int, steps) -> None:
     # ── 0. Ensure app is in foreground ────────────────────────────────
+    steps.begin("foreground")
     d.bring_to_foreground()
     d.wait_idle(3.0)
 
-    # ── A. Already running? ───────────────────────────────────────────
-    symptom_btn = d.sel.get("symptom_add_text", "Add Symptom")
-    if d.is_visible_text(symptom_btn):
-        d.reporter.log_event("measurement_already_running", {})
-        return
+    # workflows.android.measurement_start: {budget_sec, max_same_screen}
+    flow_cfg = d.workflows.get("measurement_start") or {}
+    budget = float(flow_cfg.get("budget_sec", _START_BUDGET_SEC))
+    max_same = int(flow_cfg.get("max_same_screen", _MAX_SAME_SCREEN))
 
-    # ── A1. Measurement running but on sub-screen or behind a dialog ─
-    # Step 1: dismiss overlay dialogs (e.g. ECG quality warning).
-    confirm = d.sel.get("confirm_text")
-    if confirm and d.is_visible_text(confirm):
-        try:
-            d.tap_text(confirm, timeout=3, contains=False)
-            d.wait_idle(0.5)
-            if d.is_visible_text(symptom_btn):
-                d.reporter.log_event("measurement_already_running", {})
-                return
-        except Exception:
-            pass
+    ctx = {"duration_hours": duration_hours, "repeats": 0}
+    t_start = time.monotonic()
+    deadline = Deadline(budget)
+    last_name = None
+    path: list[str] = []
 
-    # Step 2: navigate to main ECG tab if on a sub-screen (e.g. Diary).
-    main_tab = d.sel.get("main_tab_text")
-    if main_tab and d.is_visible_text(main_tab):
-        try:
-            d.tap_text(main_tab, timeout=5, contains=True)
-            d.wait_idle(1.0)
-            if d.is_visible_text(symptom_btn):
-                d.reporter.log_event("measurement_already_running", {})
-                return
-        except Exception:
-            pass
-
-    # ── A2. "검사 진행 현황" status screen → press back to return home ─
-    status_screen = d.sel.get("measurement_status_screen_text")
-    if status_screen and d.is_visible_text(status_screen):
-        d.reporter.log_event("measurement_status_screen_detected", {})
-        d.drv.press_keycode(4)  # KEYCODE_BACK
-        d.wait_idle(1.5)
-
-    # ── B. Home screen → tap "Start Now" first ────────────────────────
-    start_now = d.sel.get("start_now_text", "Start Now")
-    if d.is_visible_text(start_now, timeout=5):
-        d.reporter.log_event("tapping_start_now", {})
-        d.tap_text(start_now, contains=False)
-        d.wait_idle(2.0)
-
-    # ── Consent screen ────────────────────────────────────────────────
-    agree = d.sel.get("consent_agree_text", "Agree")
-    if d.is_visible_text(agree):
-        # Tap "Agree to All" checkbox first if present (required before confirm button)
-        all_agree = d.sel.get("consent_all_agree_text")
-        if all_agree and d.is_visible_text(all_agree):
-            d.tap_text(all_agree, contains=True)
-            d.wait_idle(0.5)
-        d.tap_text(agree, contains=False)
-        d.wait_idle(1.5)
-
-    # ── Connection error popup (e.g. "S-Patch connection lost") → dismiss ─
-    # Retries up to 5 times in case the popup reappears after each OK tap.
-    conn_error = d.sel.get("connection_lost_text")
-    if conn_error:
-        for _attempt in range(5):
-            if not d.is_visible_text(conn_error):
-                break
-            d.reporter.log_event("connection_lost_popup_detected", {"attempt": _attempt + 1})
-            ok_btn = d.sel.get("confirm_text", "OK")
-            if d.is_visible_text(ok_btn):
-                d.tap_text(ok_btn, contains=False)
-            d.wait_idle(2.0)
-
-    # ── Wait for web portal response (test_info or offline popup) ────
-    # After consent the app queries the web portal; the response popup
-    # can take up to ~30s depending on network. Poll until one appears
-    # or we have moved past the popups already (Use S-Patch / symptom btn).
-    import time as _t
-    _test_info_sel  = d.sel.get("test_info_title_text")
-    _offline_sel    = d.sel.get("offline_mode_text", "Offline")
-    _use_spatch_sel = d.sel.get("use_spatch_text", "Use S-Patch")
-    _portal_deadline = _t.monotonic() + 30
-    while _t.monotonic() < _portal_deadline:
-        if _test_info_sel and d.is_visible_text(_test_info_sel, timeout=1):
-            break
-        if d.is_visible_text(_offline_sel, timeout=1):
-            break
-        if d.is_visible_text(_use_spatch_sel, timeout=1):
+    while not deadline.expired:
+        # Blocks through loading / the web-portal query (can take ~30s),
+        # re-checking every screen together once per poll.
+        steps.begin("classify")
+        screen = classify_screen(d, MEASUREMENT_SCREENS, timeout=deadline.remaining())
+        if screen is None:
             break
-        if d.is_visible_text(symptom_btn, timeout=1):
-            break
-
-    # ── Web portal test info popup (test registered → just confirm) ───
-    test_info = d.sel.get("test_info_title_text")
-    if test_info and d.is_visible_text(test_info):
-        d.reporter.log_event("test_info_popup_detected", {})
-        confirm_btn = d.sel.get("confirm_text", "확인")
-        if d.is_visible_text(confirm_btn):
-            d.tap_text(confirm_btn, contains=False)
-        d.wait_idle(1.5)
-
-    # ── Offline branch ────────────────────────────────────────────────
-    offline_text = d.sel.get("offline_mode_text", "Offline")
-    if d.is_visible_text(offline_text):
-        d.reporter.log_event("offline_mode_detected", {})
-        _handle_offline_consent(d)
-
-    # ── "Use S-Patch" button ──────────────────────────────────────────
-    use_text = d.sel.get("use_spatch_text", "Use S-Patch")
-    if d.is_visible_text(use_text):
-        d.tap_text(use_text)
-
-    # ── Duration sheet ────────────────────────────────────────────────
-    sheet_title = d.sel.get("duration_sheet_title", "Select a test period")
-    if d.is_visible_text(sheet_title):
-        _select_duration(d, duration_hours)
-        confirm = d.sel.get("confirm_text", "Confirm")
-        if d.is_visible_text(confirm):
-            d.tap_text(confirm, contains=False)
-        d.wait_idle(2.0)
-
-    # ── Battery warning popup (optional) ─────────────────────────────
-    battery_warning = d.sel.get("battery_warning_text")
-    if battery_warning and d.is_visible_text(battery_warning):
-        d.reporter.log_event("battery_warning_detected", {})
-        checkbox = d.sel.get("battery_confirm_checkbox_text")
-        if checkbox and d.is_visible_text(checkbox):
-            d.tap_text(checkbox, contains=True)
-            d.wait_idle(0.5)
-        start_btn = d.sel.get("battery_confirm_start_text")
-        if start_btn and d.is_visible_text(start_btn):
-            d.tap_text(start_btn, contains=False)
-        d.wait_idle(2.0)
-
-    # ── Wait for running screen ───────────────────────────────────────
-    d.bring_to_foreground()
-    d.wait_idle(2.0)
+        name = screen.name
 
-    if not d.is_visible_text(symptom_btn):
-        d.wait_idle(5.0)
+        if name == "running":
+            elapsed = round(time.monotonic() - t_start, 1)
+            event = "measurement_already_running" if not path else "measurement_confirmed_running"
+            d.reporter.log_event(event, {"path": path, "elapsed_sec": elapsed})
+            return
 
-    if not d.is_visible_text(symptom_btn):
-        d.screenshot("measurement_start_failed")
-        raise RuntimeError(
-            "Could not confirm measurement running (symptom button not visible)."
-        )
+        ctx["repeats"] = ctx["repeats"] + 1 if name == last_name else 1
+        if ctx["repeats"] > max_same:
+            d.screenshot("measurement_start_stuck", evidence=True)
+            raise RuntimeError(
+                f"Measurement start stuck on screen '{name}' "
+                f"after {max_same} attempts (path: {path})"
+            )
+        last_name = name
+        path.append(name)
+        d.reporter.log_event("measurement_screen", {
+            "screen": name,
+            "elapsed_sec": round(time.monotonic() - t_start, 1),
+        })
+        steps.begin(f"screen_{name}")
+        screen.action(d, ctx)
 
-    d.reporter.log_event("measurement_confirmed_running", {})
+    d.screenshot("measurement_start_failed", evidence=True)
+    raise RuntimeError(
+        f"Could not confirm measurement running within {budget:.0f}s "
+        f"(symptom button not visible; path: {path})."
+    )
 
 
 # ------------------------------------------------------------------
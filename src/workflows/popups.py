@@ -0,0 +1,163 @@
+"""
+Single-pass popup dismissal rules.
+
+Every injection used to probe the confirm, wearing-check, battery-low,
+disconnect and sub-screen states one at a time, each a multi-candidate
+is_visible_text with its own timeout. dismiss_popups() instead evaluates a
+rules table against ONE page_source snapshot per round: the first matching
+rule's action runs, the screen is re-snapshotted, and the loop ends when no
+rule matches. With no popup up, the whole sweep costs one hierarchy fetch.
+
+Rule fields (YAML `popup_rules.android`, or DEFAULT_POPUP_RULES):
+  name        identifier used in events
+  match       selector key (or literal text / list) that identifies the popup
+  default     texts used when `match` is not a key in selectors
+  contains    substring match for `match` (default true)
+  configured  only run when `match` is set in selectors (no built-in texts)
+  unless      selector key — skip the rule while this is visible
+  action      tap | back | wait
+  target      tap target selector key        (tap only, default confirm_text)
+  fallback    back | wait | none — used when the tap target is not visible
+  wait        wait_idle seconds after the action (default 1.0)
+  max_repeats rounds this rule may fire before the sweep gives up (default 3)
+  event       event name logged when the rule fires (default popup_rule_matched)
+
+First match wins, so specific popups must come before generic ones.
+"""
+
+from src.driver import AndroidDriver
+from src.workflows.engine import Deadline
+
+_MAX_ROUNDS = 20
+
+_CONFIRM = ["확인", "Confirm", "OK"]
+_MAIN_SCREEN = ["증상 추가", "Add Symptom"]
+
+DEFAULT_POPUP_RULES: list[dict] = [
+    # Modal with S-Patch placement illustration + '확인' at the bottom;
+    # appears when signal quality is unstable.
+    {"name": "wearing_check", "match": "device_conn_check_text",
+     "default": ["기기 착용 상태 확인", "Check device wearing", "Wearing Check"],
+     "action": "tap", "target": "confirm_text", "fallback": "back",
+     "event": "conn_check_popup_detected"},
+    # "배터리 잔량 부족 (958)" — S-Patch battery depleted during measurement
+    {"name": "battery_low", "match": "battery_low_text",
+     "default": ["배터리 잔량 부족", "Battery Low", "Insufficient Battery", "Low Battery"],
+     "action": "tap", "target": "confirm_text", "fallback": "none",
+     "event": "battery_low_popup_detected"},
+    # Reconnect in progress — just give it time
+    {"name": "reconnect_waiting", "match": "device_reconnect_waiting_text",
+     "default": "잠시 기다려주세요", "unless": "symptom_add_text",
+     "action": "wait", "wait": 3.0, "max_repeats": 10},
+    # 연결 끊김 (Bluetooth disconnection): tap 재연결 and give it time
+    {"name": "disconnect", "match": "device_disconnect_text",
+     "default": ["연결 끊김", "Disconnected", "Connection Lost"],
+     "unless": "symptom_add_text",
+     "action": "tap", "target": "device_reconnect_text", "fallback": "wait",
+     "wait": 6.0, "max_repeats": 10, "event": "disconnect_popup_detected"},
+    # Generic confirm dialog — only with a configured confirm_text: OK / 확인
+    # buttons also appear on legitimate screens (e.g. the symptom picker)
+    {"name": "confirm", "match": "confirm_text", "configured": True, "contains": False,
+     "action": "tap", "target": "confirm_text", "fallback": "none", "wait": 0.5,
+     "event": "popup_dismissed_before_inject"},
+    # Sub-screens that need KEYCODE_BACK to return to the main ECG tab
+    # (Settings is 2 levels deep: Settings → Test Progress → main).
+    {"name": "wearing_status", "match": "device_wearing_status_text",
+     "default": ["기기 착용 상태", "Device Status", "Wearing Status"],
+     "unless": "symptom_add_text", "action": "back", "wait": 1.5,
+     "event": "sub_screen_dismissed"},
+    {"name": "realtime_ecg", "match": "realtime_ecg_text",
+     "default": ["실시간 심전도", "Real-time ECG", "Realtime ECG"],
+     "unless": "symptom_add_text", "action": "back", "wait": 1.5,
+     "event": "sub_screen_dismissed"},
+    {"name": "test_progress", "match": "test_progress_text",
+     "default": ["검사 진행 현황", "Test Progress", "Exam Progress"],
+     "unless": "symptom_add_text", "action": "back", "wait": 1.5,
+     "event": "sub_screen_dismissed"},
+    {"name": "settings", "match": "settings_text", "default": ["설정", "Settings"],
+     "unless": "symptom_add_text", "action": "back", "wait": 1.5,
+     "event": "sub_screen_dismissed"},
+]
+
+# Built-in texts for the `unless` / `target` keys the default rules use
+_KEY_DEFAULTS = {
+    "symptom_add_text": _MAIN_SCREEN,
+    "confirm_text": _CONFIRM,
+    "device_reconnect_text": ["재연결", "Reconnect", "다시 연결"],
+}
+
+
+def _resolve(d: AndroidDriver, spec, default=None):
+    """Selector key → configured value; unknown key → `default`, else the literal."""
+    if isinstance(spec, str) and spec in d.sel:
+        return d.sel[spec] or default
+    if isinstance(spec, str) and default is None:
+        default = _KEY_DEFAULTS.get(spec)
+    return default if default is not None else spec
+
+
+def _matches(d: AndroidDriver, rule: dict, deadline: Deadline) -> bool:
+    if rule.get("configured") and not d.sel.get(rule.get("match")):
+        return False
+    sel = _resolve(d, rule.get("match"), rule.get("default"))
+    if not sel or not d.is_visible_text(sel, contains=rule.get("contains", True), timeout=deadline.cap(1)):
+        return False
+    unless = rule.get("unless")
+    return not (unless and d.is_visible_text(_resolve(d, unless), timeout=deadline.cap(1)))
+
+
+def _apply(d: AndroidDriver, rule: dict, deadline: Deadline) -> None:
+    action = rule.get("action", "tap")
+    if action == "tap":
+        target = _resolve(d, rule.get("target", "confirm_text"))
+        # Exact match only — a substring tap could hit an unrelated button
+        if target and d.is_visible_text(target, timeout=deadline.cap(1), exact=True):
+            d.tap_text(target, timeout=5, deadline=deadline, exact=True)
+            action = None
+        else:
+            action = rule.get("fallback", "back")
+    if action == "back":
+        d.press_keycode(4)  # KEYCODE_BACK
+    d.wait_idle(deadline.cap(float(rule.get("wait", 1.0))))
+
+
+def dismiss_popups(
+    d: AndroidDriver,
+    rules: list[dict] | None = None,
+    max_rounds: int = _MAX_ROUNDS,
+    timeout: float | None = None,
+) -> list[str]:
+    """
+    Dismiss blocking popups / sub-screens until no rule matches, for at most
+    `max_rounds` rounds and (if given) `timeout` seconds.
+
+    Returns the names of the rules that fired, in order. Never raises for an
+    unresolved popup: the sweep logs `popup_sweep_gave_up` and the caller's
+    next step fails with its own, more specific error.
+    """
+    rules = rules or DEFAULT_POPUP_RULES
+    fired: list[str] = []
+    counts: dict[str, int] = {}
+    deadline = Deadline(timeout)
+    try:
+        for _ in range(max_rounds):
+            if deadline.expired:
+                break
+            d.take_snapshot()
+            rule = next((r for r in rules if _matches(d, r, deadline)), None)
+            if rule is None:
+                return fired
+            name = rule.get("name", str(rule.get("match")))
+            counts[name] = counts.get(name, 0) + 1
+            if counts[name] > int(rule.get("max_repeats", 3)):
+                break
+            d.reporter.log_event(rule.get("event", "popup_rule_matched"), {
+                "rule": name,
+                "attempt": counts[name],
+            })
+            fired.append(name)
+            _apply(d, rule, deadline)  # any tap / back / idle wait invalidates the snapshot
+        d.reporter.log_event("popup_sweep_gave_up", {"fired": fired})
+        return fired
+    finally:
+        d.invalidate_snapshot()
@@ -0,0 +1,41 @@
+"""
+Declarative screen model.
+
+A Screen names one recognisable SpatchEx app state, the selector key that
+identifies it, and the transition action to run when it is showing.
+classify_screen() answers every screen's identifying probe from ONE
+hierarchy fetch per poll (AndroidDriver.wait_any), so picking the current
+state costs a single fetch instead of a chain of negative is_visible_text
+timeouts.
+
+Order matters: screens are tested in list order and the first visible one
+wins, so overlays and more specific screens must come before generic ones.
+"""
+
+import dataclasses
+from typing import Callable
+
+from src.driver import AndroidDriver
+
+
+@dataclasses.dataclass(frozen=True)
+class Screen:
+    """One recognisable app screen: how to identify it and what to do on it."""
+    name: str
+    selector_key: str
+    default: str | list | None = None
+    action: Callable | None = None   # action(d, ctx) — None for terminal screens
+
+    def selector(self, d: AndroidDriver):
+        return d.sel.get(self.selector_key, self.default)
+
+
+def classify_screen(d: AndroidDriver, screens: list[Screen], timeout: float = 0) -> Screen | None:
+    """
+    Return the first screen in `screens` whose selector is visible, waiting up
+    to `timeout` seconds for one to appear (0 = check once). None if nothing
+    matched.
+    """
+    by_name = {s.name: s for s in screens}
+    name, _ = d.wait_any({s.name: s.selector(d) for s in screens}, timeout)
+    return by_name.get(name) if name else None
@@ -1,23 +1,37 @@
 """
 Inject a symptom event while the measurement is running.
 
-Artifact policy (every injection):
+Routine artifacts (subject to artifacts.capture_policy — each injection is
+one capture scope, see ArtifactManager):
   - screenshot  before tapping 'Add Symptom'
   - screenshot  after  symptom picker closes
   - screenshot  after  journal submission
   - adb logcat  after  submission
-  - JSONL event with elapsed_sec + success/failure
+  - JSONL event with elapsed_sec + success/failure (always)
 
-On failure:
-  - extra screenshot of current screen
+On failure (always captured, regardless of policy):
+  - screenshot, logcat and page source of the current screen
+  - held rolling-buffer screenshots are written out
   - last successful step is recorded in JSONL
+  - completed steps are checkpointed (<out_dir>/inject_checkpoint.json); the
+    @retry attempt — or a re-run of the same scheduled job after a restart —
+    resumes from them when the screen matches
 """
 
+import dataclasses
+import hashlib
+import json
 import logging
+import os
 import time
+import uuid
 
 from src.driver import AndroidDriver
+from src.hierarchy import HierarchyIndex, first_match_center
 from src.retry import retry
+from src.workflows.checkpoint import StepCheckpoint
+from src.workflows.engine import Deadline, DeadlineExceeded, Step, Workflow, WorkflowRunner
+from src.workflows.popups import dismiss_popups
 
 # Picker always shows English labels — map Korean alternatives to English
 _KO_TO_EN: dict[str, str] = {
@@ -30,6 +44,11 @@ _KO_TO_EN: dict[str, str] = {
 }
 _KNOWN_EN: frozenset[str] = frozenset({"Chest Pain", "Palpitations", "Dizziness", "Short Breath"})
 
+# Swipes UiScrollable may make per candidate before giving up
+_SCROLL_INTO_VIEW_MAX_SWIPES = 5
+# Step progress of the injection in flight, under the run's output dir
+_CHECKPOINT_FILE = "inject_checkpoint.json"
+
 
 def _resolve_english(texts: list[str]) -> str | None:
     """Return the canonical English picker label from a bilingual candidate list.
@@ -49,14 +68,189 @@ def _resolve_english(texts: list[str]) -> str | None:
     return None
 
 
-@retry(tries=3, delay=3)
+# ------------------------------------------------------------------
+# Workflow steps — action(d, ctx, step, timeout); see workflows/engine.py
+# ------------------------------------------------------------------
+
+
+def _step_foreground(d: AndroidDriver, ctx: dict, step: Step, timeout: float) -> None:
+    d.bring_to_foreground()
+    d.wait_idle(min(1.0, timeout))
+    d.screenshot("inject_before")
+
+
+def _step_popup_sweep(d: AndroidDriver, ctx: dict, step: Step, timeout: float) -> None:
+    # Confirm, wearing-check, battery-low and disconnect popups plus the
+    # sub-screens that need BACK are one rules table (workflows/popups.py,
+    # overridable via popup_rules in YAML), evaluated against one
+    # snapshot per round until nothing matches.
+    deadline = Deadline(timeout)
+    dismiss_popups(d, d.popup_rules, timeout=timeout)
+
+    # Tap main ECG tab if on the Diary tab
+    symptom_add = d.sel.get("symptom_add_text", ["증상 추가", "Add Symptom"])
+    main_tab = d.sel.get("main_tab_text")
+    if main_tab:
+        d.take_snapshot()
+        if d.is_visible_text(main_tab) and not d.is_visible_text(symptom_add):
+            d.reporter.log_event("navigate_to_main_tab", {})
+            d.tap_text(main_tab, timeout=5, contains=True, deadline=deadline)
+            d.wait_idle(1.0)
+
+
+def _step_picker_open(d: AndroidDriver, ctx: dict, step: Step, timeout: float) -> None:
+    # Everything from here on runs live: no snapshots while the picker is up.
+    # The step's `until` (picker title) confirms the sheet opened.
+    d.invalidate_snapshot()
+    symptom_add = d.sel.get("symptom_add_text", "Add Symptom")
+    d.tap_text(symptom_add, timeout=15, contains=True, deadline=Deadline(timeout))
+    d.wait_idle(1.0, adaptive=False)  # brief settle before checking picker (slow devices)
+
+
+def _step_select_symptoms(d: AndroidDriver, ctx: dict, step: Step, timeout: float) -> None:
+    picker_title = ctx["picker_title"]
+    deadline = Deadline(timeout)   # every find / scroll / tap below fits in it
+    d.screenshot("symptom_picker_open")
+    # NOTE: do NOT call _dump_page_source here — page_source triggers
+    # UiAutomator2 accessibility events that dismiss the React Native
+    # bottom-sheet picker before we can tap anything.
+    d.wait_idle(0.3)  # brief settle; keep this short so picker stays open
+
+    # Fast path: one parse of the picker → label → coordinates map, tap
+    # every symptom from it. Anything it cannot place or confirm goes
+    # through the per-symptom locator strategies.
+    taps = d.reporter.step_timer("inject_symptom.taps")
+    symptoms = ctx["symptoms"]
+    remaining = list(symptoms)
+    if d.cfg.get("picker_map", True):
+        remaining = _tap_symptoms_from_map(d, symptoms, picker_title, taps, deadline)
+    for s in remaining:
+        taps.begin("symptom_tap", symptom=s, via="locator")
+        _tap_symptom_item(d, s, picker_title=picker_title, deadline=deadline)
+    taps.end()
+    if not d.sel.get("symptom_confirm_text"):
+        ctx["checkpoint"].note(entry_saved=True)  # auto-closing picker saved on tap
+
+
+def _step_other_text(d: AndroidDriver, ctx: dict, step: Step, timeout: float) -> None:
+    if ctx["other_text"]:
+        _enter_other_text(d, ctx["other_text"], Deadline(timeout))
+
+
+def _step_submit(d: AndroidDriver, ctx: dict, step: Step, timeout: float) -> None:
+    # Some app versions (e.g. Korean) have an explicit confirm button;
+    # others (e.g. English) auto-close the picker on selection.
+    d.wait_idle(0.5)
+    symptom_confirm = d.sel.get("symptom_confirm_text")
+    if symptom_confirm and d.is_visible_text(symptom_confirm, timeout=min(2, timeout)):
+        d.tap_text(symptom_confirm, timeout=10, contains=True, deadline=Deadline(timeout))
+        ctx["checkpoint"].note(entry_saved=True)
+        d.screenshot("symptom_picker_submitted")
+
+
+def _step_journal_submit(d: AndroidDriver, ctx: dict, step: Step, timeout: float) -> None:
+    submit = d.sel.get("symptom_done_text")
+    if submit and d.is_visible_text(submit, contains=True, timeout=min(2, timeout)):
+        d.tap_text(submit, timeout=15, contains=True, deadline=Deadline(timeout))
+        ctx["checkpoint"].note(entry_saved=True)
+        d.screenshot("journal_submitted")
+
+
+def _step_activities(d: AndroidDriver, ctx: dict, step: Step, timeout: float) -> None:
+    if ctx["activities"]:
+        _add_activities(d, ctx["activities"], Deadline(timeout))
+
+
+def _step_success_wait(d: AndroidDriver, ctx: dict, step: Step, timeout: float) -> None:
+    # Checks (in order): configured success text → main screen indicator.
+    # Only fails if BOTH are absent within timeout.
+    deadline = Deadline(timeout)
+    signal = d.wait_for_symptom_success(timeout=timeout)
+    d.screenshot(f"symptom_success_{signal}")
+    ctx["signal"] = signal
+
+    # Samsung Korean app goes to diary tab after symptom injection.
+    # Return to ECG tab so the next health check sees "증상 추가".
+    if signal == "success_signal":
+        main_tab = d.sel.get("main_tab_text")
+        if main_tab and d.is_visible_text(main_tab, timeout=deadline.cap(2)):
+            d.tap_text(main_tab, timeout=5, contains=True, deadline=deadline)
+            d.wait_idle(1.0)
+
+
+def _step_after_artifacts(d: AndroidDriver, ctx: dict, step: Step, timeout: float) -> None:
+    d.screenshot("inject_after")
+    ctx["logcat_path"] = d.logcat("inject_logcat")
+
+
+INJECT_ACTIONS = {
+    "foreground": _step_foreground,
+    "popup_sweep": _step_popup_sweep,
+    "picker_open": _step_picker_open,
+    "select_symptoms": _step_select_symptoms,
+    "other_text": _step_other_text,
+    "submit": _step_submit,
+    "journal_submit": _step_journal_submit,
+    "activities": _step_activities,
+    "success_wait": _step_success_wait,
+    "after_artifacts": _step_after_artifacts,
+}
+
+# Built-in flow; tune per app build under workflows.android.inject_symptom
+DEFAULT_INJECT_WORKFLOW = Workflow("inject_symptom", budget_sec=300, steps=[
+    Step("foreground",      "foreground",      timeout=15),
+    Step("popup_sweep",     "popup_sweep",     timeout=90),
+    Step("picker_open",     "picker_open",     timeout=30, until="symptom_picker_title",
+         fallbacks=[{"action": "tap", "target": "symptom_add_text"}], evidence="picker_not_opened"),
+    Step("symptoms",        "select_symptoms", timeout=120),
+    Step("other_text",      "other_text",      timeout=30),
+    Step("submit",          "submit",          timeout=20),
+    Step("journal_submit",  "journal_submit",  timeout=30),
+    Step("activities",      "activities",      timeout=60),
+    Step("success_wait",    "success_wait",    timeout=10),
+    Step("after_artifacts", "after_artifacts", timeout=30, checkpoint=False),
+])
+
+# Where a resumed attempt picks the flow back up (see _resume_point)
+_RESUME_AT = {"picker": "other_text", "saved": "journal_submit"}
+
+
 def inject_symptom_event(
     d: AndroidDriver,
     symptoms: list[str | list[str]],
     other_text: str = "",
     activities: list[str] | None = None,
+    job_id: str | None = None,
+):
+    """
+    Run the injection workflow. The workflow's time budget covers every
+    @retry attempt together, so an injection never overruns its slot.
+
+    `job_id` names the scheduled slot. Only attempts of the same injection
+    share a checkpoint: the @retry attempts of this call, and a re-run of
+    the same slot after a restart. Without a job_id the checkpoint lasts
+    for this call only.
+    """
+    workflow = Workflow.load(DEFAULT_INJECT_WORKFLOW, d.workflows)
+    deadline = Deadline(workflow.budget_sec)
+    key = _injection_key(job_id or uuid.uuid4().hex, symptoms, other_text, activities or [])
+    d.artifacts.begin_scope("inject_symptom")
+    try:
+        return _inject_attempt(d, symptoms, other_text, activities or [], workflow, deadline, key)
+    finally:
+        d.artifacts.end_scope()
+
+
+@retry(tries=3, delay=3, giveup=(DeadlineExceeded,))
+def _inject_attempt(
+    d: AndroidDriver,
+    symptoms: list,
+    other_text: str,
+    activities: list,
+    workflow: Workflow,
+    deadline: Deadline,
+    key: str,
 ):
-    activities = activities or []
     t_start = time.monotonic()
 
     d.reporter.log_event(
@@ -68,201 +262,60 @@ def inject_symptom_event(
         },
     )
 
-    last_step = "init"
+    picker_title = d.sel.get(
+        "symptom_picker_title",
+        ["Check your symptoms", "증상을 선택해주세요."],
+    )
+    cp = StepCheckpoint(
+        os.path.join(d.artifacts.out_dir, _CHECKPOINT_FILE),
+        key=key,
+    )
+    ctx = {
+        "symptoms": symptoms,
+        "other_text": other_text,
+        "activities": activities,
+        "picker_title": picker_title,
+        "checkpoint": cp,
+        "last_step": cp.last or "init",
+    }
+    steps = d.reporter.step_timer("inject_symptom")
+    resume = None
     try:
-        # ── 1. Bring app to foreground ────────────────────────────────
-        d.bring_to_foreground()
-        d.wait_idle(1.0)
-
-        # ── 2. Screenshot BEFORE ──────────────────────────────────────
-        d.screenshot("inject_before")
-        last_step = "before_screenshot"
-
-        # ── 2b. Dismiss any blocking popup/dialog ────────────────────
-        confirm = d.sel.get("confirm_text")
-        if confirm and d.is_visible_text(confirm):
-            d.reporter.log_event("popup_dismissed_before_inject", {})
-            d.tap_text(confirm, timeout=5, contains=False)
-            d.wait_idle(0.5)
-
-        # ── 2b-1. Dismiss '기기 착용 상태 확인' warning popup ──
-        # Modal with S-Patch placement illustration + '확인' button at bottom.
-        # Appears when signal quality is unstable.
-        conn_check = d.sel.get(
-            "device_conn_check_text",
-            ["기기 착용 상태 확인", "Check device wearing", "Wearing Check"],
-        )
-        if d.is_visible_text(conn_check):
-            d.reporter.log_event("conn_check_popup_detected", {})
-            confirm_btn = d.sel.get("confirm_text", ["확인", "Confirm", "OK"])
-            if d.is_visible_text(confirm_btn):
-                d.tap_text(confirm_btn, timeout=5, contains=False)
-            else:
-                d.drv.press_keycode(4)  # KEYCODE_BACK fallback
-            d.reporter.log_event("conn_check_popup_dismissed", {})
-            d.wait_idle(1.0)
-
-        # ── 2b-2. Dismiss battery low popup (배터리 잔량 부족 / Battery Low 958) ─
-        # Appears during measurement when S-Patch battery is depleted.
-        # Korean: "배터리 잔량 부족 (958)" / English: "Battery Low (958)" (exact wording TBC)
-        # Action: tap 확인 / OK to dismiss and continue.
-        battery_low = d.sel.get(
-            "battery_low_text",
-            ["배터리 잔량 부족", "Battery Low", "Insufficient Battery", "Low Battery"],
-        )
-        if d.is_visible_text(battery_low, contains=True):
-            d.reporter.log_event("battery_low_popup_detected", {})
-            confirm_btn = d.sel.get("confirm_text", ["확인", "OK", "Confirm"])
-            if d.is_visible_text(confirm_btn):
-                d.tap_text(confirm_btn, timeout=5, contains=False)
-            d.reporter.log_event("battery_low_popup_dismissed", {})
-            d.wait_idle(1.0)
-
-        # ── 2b-4. Handle 연결 끊김 (Bluetooth disconnection) popup ───
-        # Retries until the main screen is restored or max attempts exceeded.
-        disconnect = d.sel.get(
-            "device_disconnect_text",
-            ["연결 끊김", "Disconnected", "Connection Lost"],
-        )
-        reconnect = d.sel.get(
-            "device_reconnect_text",
-            ["재연결", "Reconnect", "다시 연결"],
-        )
-        waiting_text = d.sel.get("device_reconnect_waiting_text", "잠시 기다려주세요")
-        symptom_add_check = d.sel.get("symptom_add_text", "Add Symptom")
-        if d.is_visible_text(disconnect):
-            d.reporter.log_event("disconnect_popup_detected", {})
-            for attempt in range(10):
-                if d.is_visible_text(symptom_add_check):
-                    break  # back on main screen
-                if d.is_visible_text(reconnect):
-                    d.tap_text(reconnect, timeout=5, contains=True)
-                    d.reporter.log_event("reconnect_tapped", {"attempt": attempt + 1})
-                    d.wait_idle(6.0)  # wait for reconnect result
-                elif d.is_visible_text(waiting_text):
-                    d.wait_idle(3.0)  # still reconnecting
-                else:
-                    d.wait_idle(3.0)
-
-        # ── 2c. Navigate back to main ECG tab if on a sub-screen ─────
-        # Known sub-screens (all require KEYCODE_BACK to exit):
-        #   - "기기 착용 상태" / Wearing Status
-        #   - "실시간 심전도" / Real-time ECG  (landscape)
-        #   - "검사 진행 현황" / Test Progress
-        #   - "설정" / Settings  (2 levels deep: Settings → Test Progress → main)
-        # Loop presses BACK until "증상 추가" is visible or max attempts reached.
-        # After escaping sub-screens, tap main ECG tab if on Diary tab.
-        symptom_add = d.sel.get("symptom_add_text", ["증상 추가", "Add Symptom"])
-        sub_screens = [
-            d.sel.get("device_wearing_status_text", ["기기 착용 상태", "Device Status", "Wearing Status"]),
-            d.sel.get("realtime_ecg_text", ["실시간 심전도", "Real-time ECG", "Realtime ECG"]),
-            d.sel.get("test_progress_text", ["검사 진행 현황", "Test Progress", "Exam Progress"]),
-            d.sel.get("settings_text", ["설정", "Settings"]),
-        ]
-        for attempt in range(4):
-            if d.is_visible_text(symptom_add):
-                break
-            on_sub = next((s for s in sub_screens if d.is_visible_text(s)), None)
-            if on_sub:
-                d.reporter.log_event("sub_screen_dismissed", {"screen": str(on_sub), "attempt": attempt + 1})
-                d.drv.press_keycode(4)  # KEYCODE_BACK
-                d.wait_idle(1.5)
-            else:
-                break
-
-        main_tab = d.sel.get("main_tab_text")
-        if main_tab and d.is_visible_text(main_tab) and not d.is_visible_text(symptom_add):
-            d.reporter.log_event("navigate_to_main_tab", {})
-            d.tap_text(main_tab, timeout=5, contains=True)
-            d.wait_idle(1.0)
-
-        # ── 3. Open symptom picker ────────────────────────────────────
-        symptom_add = d.sel.get("symptom_add_text", "Add Symptom")
-        d.tap_text(symptom_add, timeout=15, contains=True)
-        d.wait_idle(1.0)  # brief settle before checking picker (slow devices)
-
-        # Wait for the picker title to confirm the UI is ready
-        picker_title = d.sel.get(
-            "symptom_picker_title",
-            ["Check your symptoms", "증상을 선택해주세요."],
-        )
-        _wait_for_picker(d, picker_title, timeout=20)
-        d.screenshot("symptom_picker_open")
-        # NOTE: do NOT call _dump_page_source here — page_source triggers
-        # UiAutomator2 accessibility events that dismiss the React Native
-        # bottom-sheet picker before we can tap anything.
-        d.wait_idle(0.3)  # brief settle; keep this short so picker stays open
-        last_step = "picker_open"
-
-        # ── 4. Select each symptom ────────────────────────────────────
-        for s in symptoms:
-            _tap_symptom_item(d, s, picker_title=picker_title)
-        last_step = "symptoms_selected"
-
-        # ── 5. Handle 'Other' free-text input ────────────────────────
-        if other_text:
-            _enter_other_text(d, other_text)
-            last_step = "other_text_entered"
-
-        # ── 6. Submit symptom picker (optional confirm button) ────────
-        # Some app versions (e.g. Korean) have an explicit confirm button;
-        # others (e.g. English) auto-close the picker on selection.
-        d.wait_idle(0.5)
-        symptom_confirm = d.sel.get("symptom_confirm_text")
-        if symptom_confirm and d.is_visible_text(symptom_confirm):
-            d.tap_text(symptom_confirm, timeout=10, contains=True)
-            d.screenshot("symptom_picker_submitted")
-            last_step = "picker_submitted"
-
-        # ── 7. Journal submission screen (optional) ────────────────────
-        submit = d.sel.get("symptom_done_text")
-        if submit and d.is_visible_text(submit, contains=True):
-            d.tap_text(submit, timeout=15, contains=True)
-            d.screenshot("journal_submitted")
-            last_step = "journal_submitted"
-
-        # ── 8. Optional: add activities ───────────────────────────────
-        if activities:
-            _add_activities(d, activities)
-            last_step = "activities_added"
-
-        # ── 9. Wait for success confirmation ─────────────────────────────
-        # Checks (in order): configured success text → main screen indicator.
-        # Only fails if BOTH are absent within timeout.
-        signal = d.wait_for_symptom_success(timeout=10)
-        d.screenshot(f"symptom_success_{signal}")
-        last_step = f"success_{signal}"
-
-        # ── 9b. Navigate back to ECG main tab if on diary screen ─────────
-        # Samsung Korean app goes to diary tab after symptom injection.
-        # Return to ECG tab so the next health check sees "증상 추가".
-        if signal == "success_signal":
-            main_tab = d.sel.get("main_tab_text")
-            if main_tab and d.is_visible_text(main_tab):
-                d.tap_text(main_tab, timeout=5, contains=True)
-                d.wait_idle(1.0)
-
-        # ── 10. Screenshot AFTER + logcat ────────────────────────────
-        d.screenshot("inject_after")
-        logcat_path = d.logcat("inject_logcat")
-
+        # A retry continues after the last completed step when the screen
+        # agrees: back inside the open picker, or past the point where the
+        # diary entry was saved (never reopen the picker → no duplicates).
+        if cp.completed:
+            steps.begin("resume_classify")
+            resume = _resume_point(d, cp, picker_title)
+            if resume is None:
+                cp.reset()
+                ctx["last_step"] = "init"
+
+        runner = WorkflowRunner(d, workflow, INJECT_ACTIONS, ctx,
+                                deadline=deadline, timer=steps, checkpoint=cp)
+        runner.run(start_at=_RESUME_AT.get(resume))
+
+        cp.clear()
         elapsed = round(time.monotonic() - t_start, 1)
         d.reporter.log_event(
             "inject_symptom_done",
             {
                 "status": "ok",
                 "elapsed_sec": elapsed,
-                "last_step": last_step,
-                "logcat_path": logcat_path,
+                "last_step": ctx["last_step"],
+                "signal": ctx.get("signal"),
+                "resumed": resume,
+                "logcat_path": ctx.get("logcat_path"),
             },
         )
 
     except Exception as exc:
+        steps.end(ok=False)
         elapsed = round(time.monotonic() - t_start, 1)
         # Capture comprehensive failure evidence
         try:
-            d.screenshot("inject_failed_screen")
-            d.logcat("inject_failed_logcat")
+            d.screenshot("inject_failed_screen", evidence=True)
+            d.logcat("inject_failed_logcat", evidence=True)
             _dump_page_source(d, "inject_failed")
             # Also capture current UI state if possible
             try:
@@ -283,7 +336,7 @@ def inject_symptom_event(
             {
                 "error": str(exc),
                 "elapsed_sec": elapsed,
-                "last_step": last_step,
+                "last_step": ctx["last_step"],
             },
         )
         raise
@@ -294,20 +347,100 @@ def inject_symptom_event(
 # ------------------------------------------------------------------
 
 
+def _injection_key(job_id: str, symptoms: list, other_text: str, activities: list) -> str:
+    """Identifies one injection (one scheduled slot) across its attempts."""
+    raw = json.dumps([job_id, symptoms, other_text, activities], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _entry_saved(cp: StepCheckpoint) -> bool:
+    """
+    Did the failed attempt record that the diary entry was written? Pickers
+    with a confirm button save on submit; auto-closing pickers save when the
+    symptom is tapped. _resume_point checks the screen separately.
+    """
+    return bool(cp.data.get("entry_saved"))
+
+
+def _resume_point(d: AndroidDriver, cp: StepCheckpoint, picker_title) -> str | None:
+    """
+    Classify the current screen against the checkpoint of a failed attempt.
+
+    Returns "saved" (entry written — only finish the remaining steps),
+    "picker" (symptoms selected, picker still open — submit it), or None
+    (start over: nothing was saved, or the screen does not match).
+    """
+    screens = {
+        "picker": picker_title,
+        "journal": d.sel.get("symptom_done_text"),
+        "success": d.sel.get("symptom_success_signal_text"),
+        "main": d.sel.get("symptom_add_text", ["증상 추가", "Add Symptom"]),
+    }
+    # Live query — the picker may be open and page_source would dismiss it
+    screen, _ = d.wait_any(screens, timeout=0, live=True)
+    if screen is None:
+        d.bring_to_foreground()
+        d.wait_idle(1.0)
+        screen, _ = d.wait_any(screens, timeout=3, live=True)
+
+    if _entry_saved(cp) and screen in ("journal", "success", "main"):
+        resume = "saved"
+    elif cp.done("symptoms") and screen == "picker":
+        resume = "picker"
+    else:
+        resume = None
+    d.reporter.log_event("inject_symptom_resume", {
+        "last_completed": cp.last,
+        "screen": screen,
+        "resume": resume or "restart",
+    })
+    return resume
+
+
 def _wait_for_picker(d: AndroidDriver, title: str | list, timeout: int = 10) -> None:
     """
     Poll until one of the picker title strings appears on screen.
     Raises RuntimeError if none appear within timeout.
     """
-    deadline = time.monotonic() + timeout
-    while time.monotonic() < deadline:
-        if d.is_visible_text(title):
-            return
-        time.sleep(0.5)
-    d.screenshot("picker_not_opened")
+    # Live combined query per tick — page_source could dismiss the sheet
+    found, _ = d.wait_any({"picker": title}, timeout, live=True)
+    if found:
+        return
+    d.screenshot("picker_not_opened", evidence=True)
     raise RuntimeError(f"Symptom picker did not open within {timeout}s (title: {title!r})")
 
 
+def _search_order(texts: list[str]) -> list[str]:
+    """English picker label first, then the remaining alternatives."""
+    en_label = _resolve_english(texts)
+    order = [en_label] if en_label else []
+    return order + [t for t in texts if t and t != en_label]
+
+
+def _scroll_into_view(d: AndroidDriver, texts: list[str]):
+    """
+    Let UiAutomator scroll the picker list on the device until the symptom
+    is on screen and return it — one command instead of swipe + 10s search
+    rounds. Returns None if the item is not found (or the query is rejected).
+    """
+    from appium.webdriver.common.appiumby import AppiumBy as By
+
+    scrollable = (
+        "new UiScrollable(new UiSelector().scrollable(true).instance(0))"
+        f".setMaxSearchSwipes({_SCROLL_INTO_VIEW_MAX_SWIPES})"
+    )
+    order = _search_order(texts)
+    statements = [f'{scrollable}.scrollIntoView(new UiSelector().description("{t}"))' for t in order]
+    statements += [f'{scrollable}.scrollIntoView(new UiSelector().textContains("{t}"))' for t in order]
+    try:
+        el = d.drv.find_element(By.ANDROID_UIAUTOMATOR, ";".join(statements))
+        logging.info("[SYMPTOM] found via UiScrollable.scrollIntoView, search_order=%r", order)
+        return el
+    except Exception as exc:
+        logging.info("[SYMPTOM] scrollIntoView failed: %s", exc)
+        return None
+
+
 def _find_symptom_element(d: AndroidDriver, texts: list[str], timeout: int = 10):
     """
     Locate the symptom item element in the picker.
@@ -315,7 +448,7 @@ def _find_symptom_element(d: AndroidDriver, texts: list[str], timeout: int = 10)
     Always resolves to the English label first (picker only exposes English
     content-desc / text). Falls back to textContains with all candidates.
     """
-    from selenium.webdriver.common.by import By
+    from appium.webdriver.common.appiumby import AppiumBy as By
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
 
@@ -328,12 +461,7 @@ def _find_symptom_element(d: AndroidDriver, texts: list[str], timeout: int = 10)
     # English picker → English matches on first cycle (Korean fails instantly).
     # Korean picker  → Korean matches on first cycle (English fails instantly).
     # Both cases resolve within the first poll without wasting per-label timeout.
-    search_order = []
-    if en_label:
-        search_order.append(en_label)
-    for t in texts:
-        if t != en_label:
-            search_order.append(t)
+    search_order = _search_order(texts)
 
     def _any_desc(driver):
         # Exact description match first — avoids matching container elements
@@ -366,7 +494,7 @@ def _find_symptom_element(d: AndroidDriver, texts: list[str], timeout: int = 10)
         last_exc = exc
 
     # Pass 2: textContains fallback (finds inner TextView)
-    per = max(timeout // max(len(search_order), 1), 1)
+    per = max(timeout / max(len(search_order), 1), min(1, timeout))
     for t in search_order:
         try:
             el = d.find(t, timeout=per, contains=True)
@@ -378,33 +506,147 @@ def _find_symptom_element(d: AndroidDriver, texts: list[str], timeout: int = 10)
     raise last_exc
 
 
-def _find_coords_in_xml(xml_str: str, texts: list[str]) -> "tuple[int, int] | None":
+@dataclasses.dataclass
+class _PickerItem:
+    label: str
+    x: int
+    y: int
+    area: int
+
+
+def _picker_items(index: HierarchyIndex) -> list[_PickerItem]:
+    """Every labelled node (text or content-desc) with a non-empty bounds box."""
+    items = []
+    for i, label in index.labelled():
+        x, y = index.center(i)
+        items.append(_PickerItem(label, x, y, index.area(i)))
+    return items
+
+
+def _lookup_picker_item(items: list[_PickerItem], texts: list[str]) -> _PickerItem | None:
     """
-    Parse UiAutomator2 page_source XML and return the center (cx, cy) of the first
-    node whose text or content-desc contains any of the given strings.
-    Returns None if not found or parsing fails.
+    Exact label match first (English label before alternatives), then the
+    smallest node containing it — a container's content-desc concatenates
+    every child label, so the smallest box is the item itself.
     """
-    import xml.etree.ElementTree as ET
-    import re
+    en = _resolve_english(texts)
+    order = ([en] if en else []) + [t for t in texts if t and t != en]
+    for t in order:
+        exact = [it for it in items if it.label == t]
+        if exact:
+            return min(exact, key=lambda it: it.area)
+    for t in order:
+        partial = [it for it in items if t in it.label]
+        if partial:
+            return min(partial, key=lambda it: it.area)
+    return None
+
+
+def _reopen_picker_if_closed(d: AndroidDriver, picker_title, deadline: Deadline) -> bool:
+    """page_source can dismiss the bottom sheet; re-open it. True if it had to."""
+    if not picker_title or d.is_visible_text(picker_title, timeout=deadline.cap(2)):
+        return False
+    logging.info("[SYMPTOM] picker dismissed by page_source, re-opening")
+    _reopen_picker(d, picker_title, deadline)
+    return True
+
+
+def _reopen_picker(d: AndroidDriver, picker_title, deadline: Deadline) -> None:
+    d.tap_text(d.sel.get("symptom_add_text", ["증상 추가", "Add Symptom"]),
+               timeout=8, contains=True, deadline=deadline)
+    _wait_for_picker(d, picker_title, timeout=deadline.cap(8))
+
 
+def _map_picker(d: AndroidDriver, picker_title, deadline: Deadline) -> tuple[list[_PickerItem], bool]:
+    """
+    Parse the open picker from ONE hierarchy fetch, without scrolling.
+
+    The fetch can dismiss the bottom sheet; it is then re-opened and the
+    second value is True. A re-opened sheet need not be laid out (or
+    scrolled) the same way, so its coordinates are only good after a live
+    re-check (_live_center).
+    """
+    items = _picker_items(d.hierarchy())
+    return items, _reopen_picker_if_closed(d, picker_title, deadline)
+
+
+def _live_center(d: AndroidDriver, label: str, deadline: Deadline) -> tuple[int, int] | None:
+    """Where `label` is on screen right now (one live query), or None."""
     try:
-        root = ET.fromstring(xml_str)
-    except Exception:
+        rect = d.find(label, timeout=deadline.cap(2), contains=False).rect
+    except Exception as e:
+        logging.info("[SYMPTOM] live re-check of %r failed: %s", label, e)
         return None
-    for node in root.iter():
-        node_text = node.get("text", "")
-        node_desc = node.get("content-desc", "")
-        for t in texts:
-            if not t:
+    return rect["x"] + rect["width"] // 2, rect["y"] + rect["height"] // 2
+
+
+def _tap_symptoms_from_map(
+    d: AndroidDriver, symptoms: list, picker_title, steps=None, deadline: Deadline | None = None,
+) -> list:
+    """
+    Tap every symptom visible in one picker map, in plan order.
+
+    No element lookups run between taps: after each one only the picker
+    title is re-checked, and success is verified once, when the sheet closes
+    (auto-submit) or later by the confirm-button step (multi-select). Only
+    when mapping had to re-open the sheet is each target first re-located
+    live — the mapped coordinates are not trusted on a re-opened sheet.
+
+    Returns the symptoms still to be selected the slow way: those not on the
+    first picker screen (or not found again after a re-open), those left
+    when `deadline` runs out, and — if the sheet closed with no success
+    signal (backdrop dismiss) — everything from the tap that closed it
+    onwards.
+    """
+    deadline = deadline or Deadline(None)
+    wanted = []
+    for s in symptoms:
+        wanted.append([t.strip() for t in s.split(",") if t.strip()] if isinstance(s, str) else list(s))
+    if steps:
+        steps.begin("picker_map")
+    try:
+        items, reopened = _map_picker(d, picker_title, deadline)
+    except Exception as e:
+        logging.info("[SYMPTOM] picker map failed: %s", e)
+        return list(symptoms)
+
+    placed = [(i, _lookup_picker_item(items, texts)) for i, texts in enumerate(wanted)]
+    fallback = [symptoms[i] for i, it in placed if it is None]
+    plan = [(i, it) for i, it in placed if it is not None]
+    d.reporter.log_event("symptom_picker_mapped", {
+        "labels": len({it.label for it in items}),
+        "placed": [it.label for _, it in plan],
+        "unplaced": fallback,
+        "reopened": reopened,
+    })
+
+    for n, (i, it) in enumerate(plan):
+        if deadline.expired:
+            return fallback + [symptoms[j] for j, _ in plan[n:]]
+        x, y = it.x, it.y
+        if reopened:
+            pos = _live_center(d, it.label, deadline)
+            if pos is None:
+                fallback.append(symptoms[i])
                 continue
-            if t == node_text or t in node_text or t == node_desc or t in node_desc:
-                bounds = node.get("bounds", "")
-                m = re.match(r'\[(\d+),(\d+)\]\[(\d+),(\d+)\]', bounds)
-                if m:
-                    x1, y1, x2, y2 = (int(m.group(i)) for i in range(1, 5))
-                    if x2 > x1 and y2 > y1:
-                        return (x1 + x2) // 2, (y1 + y2) // 2
-    return None
+            x, y = pos
+        logging.info("[SYMPTOM] strategy=picker_map label=%r cx=%d cy=%d rechecked=%s",
+                     it.label, x, y, reopened)
+        if steps:
+            steps.begin("symptom_tap", symptom=symptoms[i], via="picker_map")
+        d.drv.execute_script("mobile: clickGesture", {"x": x, "y": y})
+        d.wait_idle(0.5, adaptive=False)
+        if picker_title and d.is_visible_text(picker_title, timeout=deadline.cap(1)):
+            continue   # multi-select sheet: item selected, sheet stays up
+        # Sheet closed — the app auto-submitted, or the tap hit the backdrop.
+        try:
+            sig = d.wait_for_symptom_success(timeout=deadline.cap(8))
+            logging.info("[SYMPTOM] picker closed after %r (%s)", it.label, sig)
+            return fallback + [symptoms[j] for j, _ in plan[n + 1:]]
+        except Exception:
+            logging.info("[SYMPTOM] picker closed after %r with no success indicator", it.label)
+            return fallback + [symptoms[j] for j, _ in plan[n:]]
+    return fallback
 
 
 def _tap_symptom_item(
@@ -412,6 +654,7 @@ def _tap_symptom_item(
     symptom: str | list[str],
     scroll_tries: int = 3,
     picker_title: str | list | None = None,
+    deadline: Deadline | None = None,
 ) -> None:
     """
     Tap a single symptom item in the picker.
@@ -420,16 +663,21 @@ def _tap_symptom_item(
     (e.g. ["Chest Pain", "가슴 통증"]). Each alternative is tried in order.
 
     Strategy per attempt:
-      1. Locate the element by textContains (all language alternatives tried).
+      1. Locate the element — first attempt via UiScrollable.scrollIntoView
+         (device-side scroll), otherwise by content-desc / textContains
+         (all language alternatives tried).
       2. Click the nearest clickable ancestor (TouchableOpacity) via XPATH.
       3. Fallback: tap via coordinates.
       4. Fallback: element.click() directly.
     If the element is not visible, scroll the list and retry up to scroll_tries times.
     Before each scroll retry, validate that the picker is still open (if picker_title given).
+    Every wait is capped by `deadline`; no new attempt starts once it has run out.
     On final failure: screenshot + page source dump before raising.
     """
     from selenium.webdriver.common.by import By
 
+    deadline = deadline or Deadline(None)
+
     # Parse incoming value — handles both list and comma-joined string
     # e.g. "두근거림,Palpitations" → ["두근거림", "Palpitations"]
     if isinstance(symptom, str):
@@ -453,27 +701,22 @@ def _tap_symptom_item(
     # One page_source dump may also dismiss the picker, but we re-open it and
     # then tap with stored coordinates — no further find_element calls needed.
     try:
-        xml = d.drv.page_source
-        coords_0 = _find_coords_in_xml(xml, texts)
+        coords_0 = first_match_center(d.drv.page_source, texts)
         if coords_0:
             cx0, cy0 = coords_0
             logging.info("[SYMPTOM] strategy=page_source_coords cx=%d cy=%d", cx0, cy0)
             # Re-open picker if page_source dismissed it
-            if picker_title and not d.is_visible_text(picker_title, timeout=2):
-                logging.info("[SYMPTOM] picker dismissed by page_source, re-opening")
-                _symptom_add = d.sel.get("symptom_add_text", ["증상 추가", "Add Symptom"])
-                d.tap_text(_symptom_add, timeout=8, contains=True)
-                _wait_for_picker(d, picker_title, timeout=8)
+            _reopen_picker_if_closed(d, picker_title, deadline)
             d.drv.execute_script("mobile: clickGesture", {"x": cx0, "y": cy0})
-            d.wait_idle(1.0)
-            picker_still_open = picker_title and d.is_visible_text(picker_title, timeout=1)
+            d.wait_idle(1.0, adaptive=False)
+            picker_still_open = picker_title and d.is_visible_text(picker_title, timeout=deadline.cap(1))
             if picker_still_open:
                 logging.info("[SYMPTOM] success via page_source_coords (multi-select)")
                 return
             # Picker closed — wait up to 8s for either diary screen or main screen.
             # 2s was too short on slow/older devices causing false negatives.
             try:
-                sig = d.wait_for_symptom_success(timeout=8)
+                sig = d.wait_for_symptom_success(timeout=deadline.cap(8))
                 logging.info("[SYMPTOM] success via page_source_coords (%s)", sig)
                 return
             except Exception:
@@ -487,15 +730,22 @@ def _tap_symptom_item(
         logging.info("[SYMPTOM] strategy=page_source_coords error: %s", e)
 
     for attempt in range(scroll_tries + 1):
+        if deadline.expired:
+            last_exc = TimeoutError(f"Step time ran out selecting {texts!r} (attempt {attempt + 1})")
+            break
         # --- locate (try all language alternatives) ---
+        # First attempt: one on-device UiScrollable query scrolls the item
+        # into view; the swipe + search loop below is the fallback.
         try:
-            el = _find_symptom_element(d, texts, timeout=10)
+            el = _scroll_into_view(d, texts) if attempt == 0 else None
+            if el is None:
+                el = _find_symptom_element(d, texts, timeout=deadline.cap(10))
         except Exception as exc:
             last_exc = exc
             if attempt < scroll_tries:
                 # Validate picker is still open before retrying.
-                if picker_title and not d.is_visible_text(picker_title):
-                    d.screenshot(f"picker_closed_{label}_attempt{attempt + 1}")
+                if picker_title and not d.is_visible_text(picker_title, timeout=deadline.cap(2)):
+                    d.screenshot(f"picker_closed_{label}_attempt{attempt + 1}", evidence=True)
                     _dump_page_source(d, f"picker_closed_{label}_attempt{attempt + 1}")
                     raise RuntimeError(
                         f"Symptom picker closed unexpectedly before "
@@ -517,7 +767,7 @@ def _tap_symptom_item(
         except Exception as stale_exc:
             logging.info("[SYMPTOM] element went stale after find, re-finding: %s", stale_exc)
             try:
-                el = _find_symptom_element(d, texts, timeout=5)
+                el = _find_symptom_element(d, texts, timeout=deadline.cap(5))
                 el_clickable = el.get_attribute("clickable") == "true"
             except Exception as refind_exc:
                 last_exc = refind_exc
@@ -536,7 +786,7 @@ def _tap_symptom_item(
         except Exception as stale_loc_exc:
             logging.info("[SYMPTOM] stale at el.location, re-finding: %s", stale_loc_exc)
             try:
-                el = _find_symptom_element(d, texts, timeout=5)
+                el = _find_symptom_element(d, texts, timeout=deadline.cap(5))
                 loc = el.location
                 sz  = el.size
             except Exception as refind_loc_exc:
@@ -559,8 +809,8 @@ def _tap_symptom_item(
                 logging.info("[SYMPTOM] drv.tap also failed: %s", e2)
 
         if _tap_succeeded:
-            d.wait_idle(1.0)
-            picker_still_open = picker_title and d.is_visible_text(picker_title, timeout=1)
+            d.wait_idle(1.0, adaptive=False)
+            picker_still_open = picker_title and d.is_visible_text(picker_title, timeout=deadline.cap(1))
             logging.info("[SYMPTOM] after click_gesture picker_still_open=%s", picker_still_open)
 
             if picker_still_open:
@@ -576,20 +826,18 @@ def _tap_symptom_item(
                 # Only re-open picker if NEITHER is visible (genuine backdrop dismiss).
                 success_signal = d.sel.get("symptom_success_signal_text")
                 main_indicator = d.sel.get("symptom_add_text", ["증상 추가", "Add Symptom"])
-                if success_signal and d.is_visible_text(success_signal, timeout=2):
+                if success_signal and d.is_visible_text(success_signal, timeout=deadline.cap(2)):
                     logging.info("[SYMPTOM] success via click_gesture (success_signal confirmed)")
                     return
-                if d.is_visible_text(main_indicator, timeout=2):
+                if d.is_visible_text(main_indicator, timeout=deadline.cap(2)):
                     logging.info("[SYMPTOM] success via click_gesture (back on main screen)")
                     return
                 # Neither signal found → likely backdrop dismiss
                 logging.info("[SYMPTOM] click_gesture: picker closed but no success indicator "
                              "→ backdrop dismiss suspected; re-opening picker")
                 try:
-                    _symptom_add = d.sel.get("symptom_add_text", ["증상 추가", "Add Symptom"])
-                    d.tap_text(_symptom_add, timeout=8, contains=True)
-                    _wait_for_picker(d, picker_title, timeout=8)
-                    el = _find_symptom_element(d, texts, timeout=8)
+                    _reopen_picker(d, picker_title, deadline)
+                    el = _find_symptom_element(d, texts, timeout=deadline.cap(8))
                     # Refresh bounds after re-open
                     loc = el.location
                     sz  = el.size
@@ -618,7 +866,7 @@ def _tap_symptom_item(
                          clickable.tag_name, anc_bounds)
             clickable.click()
             d.wait_idle(0.5)
-            picker_still_open = picker_title and d.is_visible_text(picker_title, timeout=1)
+            picker_still_open = picker_title and d.is_visible_text(picker_title, timeout=deadline.cap(1))
             logging.info("[SYMPTOM] after ancestor_click picker_still_open=%s", picker_still_open)
             if not picker_title or not picker_still_open:
                 logging.info("[SYMPTOM] success via ancestor_click")
@@ -631,7 +879,7 @@ def _tap_symptom_item(
             logging.info("[SYMPTOM] strategy=element_click cx=%d cy=%d", cx, cy)
             el.click()
             d.wait_idle(0.5)
-            picker_still_open = picker_title and d.is_visible_text(picker_title, timeout=1)
+            picker_still_open = picker_title and d.is_visible_text(picker_title, timeout=deadline.cap(1))
             logging.info("[SYMPTOM] after element_click picker_still_open=%s", picker_still_open)
             if not picker_title or not picker_still_open:
                 logging.info("[SYMPTOM] success via element_click")
@@ -640,11 +888,11 @@ def _tap_symptom_item(
             logging.info("[SYMPTOM] element_click failed: %s", exc)
             last_exc = exc
 
-        if attempt < scroll_tries:
+        if attempt < scroll_tries and not deadline.expired:
             _scroll_symptom_list(d)
 
     # All attempts exhausted
-    d.screenshot(f"symptom_fail_{label}")
+    d.screenshot(f"symptom_fail_{label}", evidence=True)
     _dump_page_source(d, f"symptom_fail_{label}")
     raise last_exc
 
@@ -661,37 +909,33 @@ def _scroll_symptom_list(d: AndroidDriver) -> None:
 
 
 def _dump_page_source(d: AndroidDriver, label: str) -> None:
-    """Write current UI XML (page source) to the log dir as a debug artifact."""
-    import os
-
+    """Store current UI XML (page source) as a debug artifact (deduplicated)."""
     try:
-        xml = d.drv.page_source
-        ts = d.artifacts._ts()
-        path = os.path.join(d.artifacts.log_dir, f"{ts}_{label}.xml")
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(xml)
+        path = d.artifacts.save_text(f"{label}.xml", d.page_source_xml(), event=label)
         d.reporter.log_event("page_source_dumped", {"label": label, "path": path})
     except Exception:
         pass
 
 
-def _enter_other_text(d: AndroidDriver, text: str):
+def _enter_other_text(d: AndroidDriver, text: str, deadline: Deadline | None = None):
     """
     Tap the 'Other' input field and type free text.
     Selector priority: other_text_field_id (resource-id) > 'Other' text tile.
+    Waits are capped by `deadline`.
     """
+    deadline = deadline or Deadline(None)
     field_id = d.sel.get("other_text_field_id")
     if field_id:
-        el = d.find(field_id, timeout=5, contains=False)
+        el = d.find(field_id, timeout=deadline.cap(5), contains=False)
     else:
         # Fall back: tap the 'Other' tile which opens the text input
-        d.tap_text("Other", timeout=5, contains=True)
+        d.tap_text("Other", timeout=5, contains=True, deadline=deadline)
         # Then try to find any visible EditText
         from selenium.webdriver.common.by import By
         from selenium.webdriver.support.ui import WebDriverWait
         from selenium.webdriver.support import expected_conditions as EC
 
-        el = WebDriverWait(d.drv, 5).until(
+        el = WebDriverWait(d.drv, deadline.cap(5)).until(
             EC.presence_of_element_located((By.CLASS_NAME, "android.widget.EditText"))
         )
 
@@ -700,8 +944,8 @@ def _enter_other_text(d: AndroidDriver, text: str):
 
     # Dismiss keyboard
     keyboard_done = d.sel.get("keyboard_done_text", "Done")
-    if d.is_visible_text(keyboard_done):
-        d.tap_text(keyboard_done, timeout=3, contains=False)
+    if d.is_visible_text(keyboard_done, timeout=deadline.cap(2)):
+        d.tap_text(keyboard_done, timeout=3, contains=False, deadline=deadline)
     else:
         try:
             d.drv.hide_keyboard()
@@ -709,18 +953,19 @@ def _enter_other_text(d: AndroidDriver, text: str):
             pass
 
 
-def _add_activities(d: AndroidDriver, activities: list[str]):
+def _add_activities(d: AndroidDriver, activities: list[str], deadline: Deadline | None = None):
+    deadline = deadline or Deadline(None)
     add_act = d.sel.get("add_activity_text", "Add Activity")
-    if not d.is_visible_text(add_act):
+    if not d.is_visible_text(add_act, timeout=deadline.cap(2)):
         return
 
-    d.tap_text(add_act, timeout=10, contains=True)
+    d.tap_text(add_act, timeout=10, contains=True, deadline=deadline)
 
     for a in activities:
-        d.tap_text(a, timeout=10, contains=True)
+        d.tap_text(a, timeout=10, contains=True, deadline=deadline)
 
     act_submit = d.sel.get("activity_submit_text", "Add Activity")
-    if d.is_visible_text(act_submit):
-        d.tap_text(act_submit, timeout=10, contains=True)
+    if d.is_visible_text(act_submit, timeout=deadline.cap(2)):
+        d.tap_text(act_submit, timeout=10, contains=True, deadline=deadline)
 
     d.screenshot("activity_added")
@@ -0,0 +1,140 @@
+import queue
+import re
+
+import pytest
+
+from src import adb_shell
+from src.adb_shell import AdbShell
+
+_LINE = re.compile(r"^(.*); echo (__SPATCH_END_\w+__) \$\?\n$", re.S)
+
+
+class FakeProc:
+    """
+    Stands in for the `adb shell` process: each marker-delimited command
+    written to stdin is answered from `replies` — (output, exit code),
+    "hang" (never answers) or "exit" (the shell dies mid-command).
+    """
+
+    def __init__(self, argv, replies):
+        self.argv = argv
+        self.replies = replies
+        self.commands = []
+        self.returncode = None
+        self.broken_pipe = False
+        self._lines: queue.Queue = queue.Queue()
+        self.stdin = self
+        self.stdout = self
+
+    # stdin
+    def write(self, data: bytes) -> None:
+        if self.broken_pipe:
+            raise BrokenPipeError(32, "Broken pipe")
+        cmd, marker = _LINE.match(data.decode()).groups()
+        self.commands.append(cmd)
+        reply = self.replies.get(cmd, ("", 0))
+        if reply == "hang":
+            return
+        if reply == "exit":
+            self.returncode = 255
+            self._lines.put(None)
+            return
+        out, rc = reply
+        for line in f"{out}{marker} {rc}\n".splitlines(keepends=True):
+            self._lines.put(line.encode())
+
+    def flush(self) -> None:
+        pass
+
+    # stdout
+    def __iter__(self):
+        while (line := self._lines.get()) is not None:
+            yield line
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self) -> None:
+        self.returncode = -9
+        self._lines.put(None)
+
+
+@pytest.fixture
+def replies():
+    return {}
+
+
+@pytest.fixture
+def spawned(monkeypatch, replies):
+    """Every shell process started, oldest first."""
+    procs = []
+
+    def popen(argv, **_):
+        procs.append(FakeProc(argv, replies))
+        return procs[-1]
+
+    monkeypatch.setattr(adb_shell.subprocess, "Popen", popen)
+    return procs
+
+
+def test_output_and_exit_code_parsed(spawned, replies):
+    replies.update({
+        "getprop ro.product.model": ("SM-S911N\n", 0),
+        "pidof com.app": ("4242", 0),                     # no newline: marker shares the line
+        "dumpsys battery": ("level: 80\nstatus: 2\n", 0),
+        "true": ("", 0),
+    })
+    sh = AdbShell("R3CN")
+
+    assert sh.run("getprop ro.product.model") == "SM-S911N"
+    assert sh.run("pidof com.app") == "4242"
+    assert sh.run("dumpsys battery") == "level: 80\nstatus: 2"
+    assert sh.run("true") == ""
+    assert len(spawned) == 1                              # one shell for every command
+    assert "-s R3CN shell" in " ".join(spawned[0].argv)
+
+
+def test_nonzero_exit_raises_with_output(spawned, replies):
+    replies["pm path com.missing"] = ("", 1)
+    replies["ls /nope"] = ("ls: /nope: No such file or directory\n", 2)
+    sh = AdbShell()
+
+    with pytest.raises(RuntimeError, match="exit 1: pm path com.missing"):
+        sh.run("pm path com.missing")
+    with pytest.raises(RuntimeError, match="exit 2: ls /nope: ls: /nope: No such file"):
+        sh.run("ls /nope")
+    assert len(spawned) == 1                              # a failed command keeps the shell
+
+
+def test_timeout_kills_shell_and_next_command_respawns(spawned, replies):
+    replies["logcat -d"] = "hang"
+    replies["echo ok"] = ("ok\n", 0)
+    sh = AdbShell()
+
+    with pytest.raises(TimeoutError, match="timed out after 0.1s: logcat -d"):
+        sh.run("logcat -d", timeout=0.1)
+    assert spawned[0].returncode == -9                    # stale output never leaks into the next command
+
+    assert sh.run("echo ok") == "ok"
+    assert len(spawned) == 2 and spawned[1].commands == ["echo ok"]
+
+
+def test_dead_pipe_restarts_shell_once(spawned, replies):
+    replies["echo ok"] = ("ok\n", 0)
+    sh = AdbShell()
+    sh.run("echo ok")
+    spawned[0].broken_pipe = True                         # ADB dropped between commands
+
+    assert sh.run("echo ok") == "ok"
+    assert len(spawned) == 2 and spawned[1].commands == ["echo ok"]
+
+
+def test_exited_shell_is_respawned_before_the_next_command(spawned, replies):
+    replies["reboot-ish"] = "exit"
+    replies["echo ok"] = ("ok\n", 0)
+    sh = AdbShell()
+
+    with pytest.raises(RuntimeError, match="exited while running: reboot-ish"):
+        sh.run("reboot-ish")
+    assert sh.run("echo ok") == "ok"
+    assert len(spawned) == 2
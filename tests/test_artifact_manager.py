@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+
+import pytest
+
+from src import artifact_manager
+from src.blob_store import BlobStore, read_artifact
+
+
+class Driver:
+    """Capture callables are swapped per test via the module's grab functions."""
+    drv = None
+
+
+@pytest.fixture
+def collect(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_manager, "ARTIFACTS_DIR", tmp_path)
+
+    def run(screenshot, logcat, page_source, deadline_sec=1.0):
+        monkeypatch.setattr(artifact_manager, "_grab_screenshot", screenshot)
+        monkeypatch.setattr(artifact_manager, "_grab_logcat", logcat)
+        monkeypatch.setattr(artifact_manager, "_grab_page_source", page_source)
+        t0 = time.monotonic()
+        out = artifact_manager.save_failure_artifacts(Driver(), RuntimeError("boom"), label="t",
+                                                      deadline_sec=deadline_sec)
+        return out, time.monotonic() - t0
+
+    return run
+
+
+def _drain():
+    artifact_manager._write_pool.submit(lambda: None).result()
+
+
+def _manifest(out) -> dict:
+    return json.loads((out / "manifest.json").read_text(encoding="utf-8"))
+
+
+def test_captures_run_concurrently(collect):
+    def slow(value):
+        def grab(driver):
+            time.sleep(0.3)
+            return value
+        return grab
+
+    out, took = collect(slow(b"png"), slow("log"), slow("<hierarchy/>"))
+    _drain()
+    assert took < 0.75   # three 0.3 s captures side by side, not one after another (0.9 s)
+    assert {n: e["status"] for n, e in _manifest(out).items()} == {
+        "error.txt": "ok", "meta.json": "ok", "screenshot.png": "ok", "logcat.txt": "ok", "page_source.xml": "ok",
+    }
+
+
+def test_failed_capture_records_its_error(collect, tmp_path):
+    def broken(driver):
+        raise ConnectionError("socket hang up")
+
+    out, _ = collect(lambda d: b"png", broken, lambda d: "<hierarchy/>")
+    _drain()
+    entry = _manifest(out)["logcat.txt"]
+    assert entry["status"] == "failed" and entry["error"] == "socket hang up"
+    assert "blob" not in entry
+    assert read_artifact(out, "logcat.txt", BlobStore(tmp_path / "blobs")) is None
+
+
+def test_deadline_returns_and_late_capture_is_kept(collect, tmp_path):
+    release = threading.Event()
+
+    def stuck(driver):
+        release.wait(5)
+        return "<hierarchy/>"
+
+    out, took = collect(lambda d: b"png", lambda d: "log", stuck, deadline_sec=0.2)
+    assert took < 1.0
+    _drain()
+    entry = _manifest(out)["page_source.xml"]
+    assert entry["status"] == "timeout" and entry["elapsed_sec"] >= 0.2
+
+    release.set()
+    for _ in range(50):   # the late capture lands via its done-callback
+        _drain()
+        if _manifest(out)["page_source.xml"]["status"] == "late":
+            break
+        time.sleep(0.05)
+    assert _manifest(out)["page_source.xml"]["status"] == "late"
+    assert read_artifact(out, "page_source.xml", BlobStore(tmp_path / "blobs")) == b"<hierarchy/>"
+
+
+def test_late_failure_stays_failed(collect):
+    release = threading.Event()
+
+    def stuck_then_fail(driver):
+        release.wait(5)
+        raise TimeoutError("adb did not answer")
+
+    out, _ = collect(lambda d: b"png", stuck_then_fail, lambda d: "<hierarchy/>", deadline_sec=0.2)
+    release.set()
+    for _ in range(50):
+        _drain()
+        if _manifest(out)["logcat.txt"]["status"] != "timeout":
+            break
+        time.sleep(0.05)
+    entry = _manifest(out)["logcat.txt"]
+    assert entry["status"] == "failed" and entry["error"] == "adb did not answer"
@@ -0,0 +1,115 @@
+import base64
+import json
+
+import pytest
+
+from src.artifacts import ArtifactManager
+
+
+class FakeWebDriver:
+    def __init__(self):
+        self.captures = 0
+
+    def get_screenshot_as_base64(self):
+        self.captures += 1
+        return base64.b64encode(f"frame-{self.captures}".encode()).decode()
+
+
+def _manager(tmp_path, policy, **cfg):
+    # Sync writes into the blob store: every written frame is one manifest line
+    return ArtifactManager(str(tmp_path), {
+        "capture_policy": policy, "screenshots": {"async": False}, **cfg,
+    })
+
+
+def _written(tmp_path) -> list[str]:
+    path = tmp_path / "blob_manifest.jsonl"
+    if not path.exists():
+        return []
+    return [json.loads(line)["name"].split("_", 2)[2].rsplit(".", 1)[0]
+            for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def _inject(am, drv, n, fail_at=None):
+    """One injection scope with two routine frames; optionally fails after frame `fail_at`."""
+    am.begin_scope(f"inject{n}")
+    for step in ("before", "after"):
+        am.screenshot(drv, f"{n}_{step}")
+        if fail_at == step:
+            am.screenshot(drv, f"{n}_evidence", evidence=True)
+    am.end_scope()
+
+
+def test_full_writes_everything(tmp_path):
+    am, drv = _manager(tmp_path, "full"), FakeWebDriver()
+    _inject(am, drv, 1)
+    assert _written(tmp_path) == ["1_before", "1_after"]
+
+
+def test_on_failure_skips_routine_frames(tmp_path):
+    am, drv = _manager(tmp_path, "on_failure"), FakeWebDriver()
+    am.begin_scope("inject")
+    assert am.screenshot(drv, "before") == ""
+    assert not am.wants_routine_logcat()
+    am.end_scope()
+    assert drv.captures == 0          # not even the device round trip
+    assert _written(tmp_path) == []
+
+
+def test_on_failure_writes_evidence_and_rest_of_failed_scope(tmp_path):
+    am, drv = _manager(tmp_path, "on_failure"), FakeWebDriver()
+    _inject(am, drv, 1, fail_at="before")
+    assert _written(tmp_path) == ["1_evidence", "1_after"]
+
+
+def test_sampled_captures_every_nth_scope(tmp_path):
+    am, drv = _manager(tmp_path, "sampled", sample_every=3), FakeWebDriver()
+    for n in range(1, 8):
+        _inject(am, drv, n)
+    assert _written(tmp_path) == ["1_before", "1_after", "4_before", "4_after", "7_before", "7_after"]
+
+
+def test_rolling_flushes_held_frames_on_failure(tmp_path):
+    am, drv = _manager(tmp_path, "rolling", rolling_frames=8), FakeWebDriver()
+    am.begin_scope("inject")
+    am.screenshot(drv, "before")
+    am.screenshot(drv, "picker")
+    assert _written(tmp_path) == []   # held in memory
+    flushed = am.fail_scope()
+    assert len(flushed) == 2
+    am.screenshot(drv, "after")       # rest of a failed scope is written directly
+    am.end_scope()
+    assert _written(tmp_path) == ["before", "picker", "after"]
+
+
+def test_rolling_drops_held_frames_on_success(tmp_path):
+    am, drv = _manager(tmp_path, "rolling"), FakeWebDriver()
+    _inject(am, drv, 1)
+    am.begin_scope("inject2")
+    am.fail_scope()                   # nothing left over from the successful scope
+    am.end_scope()
+    assert _written(tmp_path) == []
+
+
+def test_rolling_keeps_only_the_last_frames(tmp_path):
+    am, drv = _manager(tmp_path, "rolling", rolling_frames=2), FakeWebDriver()
+    am.begin_scope("inject")
+    for name in ("a", "b", "c"):
+        am.screenshot(drv, name)
+    am.screenshot(drv, "evidence", evidence=True)
+    assert _written(tmp_path) == ["b", "c", "evidence"]
+
+
+@pytest.mark.parametrize("policy", ["full", "on_failure", "sampled", "rolling"])
+def test_evidence_is_always_written(tmp_path, policy):
+    am, drv = _manager(tmp_path, policy, sample_every=100), FakeWebDriver()
+    _inject(am, drv, 1)                                    # sampled: scope 1 is the sample
+    am.begin_scope("inject2")
+    am.screenshot(drv, "2_evidence", evidence=True)
+    am.end_scope()
+    am.screenshot(drv, "outside_evidence", evidence=True)  # no scope open
+    assert _written(tmp_path)[-2:] == ["2_evidence", "outside_evidence"]
+
+
+def test_unknown_policy_falls_back_to_full(tmp_path):
+    assert _manager(tmp_path, "sometimes").policy == "full"
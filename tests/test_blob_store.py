@@ -0,0 +1,115 @@
+import base64
+import gzip
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src import artifact_manager, screenshot_writer
+from src.artifacts import ArtifactManager
+from src.blob_store import BlobStore, artifact_names, read_artifact
+
+
+def _manifest(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_same_content_stored_once(tmp_path):
+    store = BlobStore(tmp_path / "blobs", tmp_path / "blobs.jsonl")
+    a = store.put("<hierarchy/>", "a_page.xml", event="picker_closed")
+    b = store.put("<hierarchy/>", "b_page.xml", event="picker_closed")
+
+    assert a == b
+    assert len(list((tmp_path / "blobs").rglob("*.gz"))) == 1
+    recs = _manifest(tmp_path / "blobs.jsonl")
+    assert [(r["name"], r["new"]) for r in recs] == [("a_page.xml", True), ("b_page.xml", False)]
+    assert recs[0]["blob"] == a and recs[0]["size"] == len("<hierarchy/>")
+
+
+def test_text_is_gzipped_media_is_not(tmp_path):
+    store = BlobStore(tmp_path)
+    xml_sha = store.put("<hierarchy/>", "page.xml")
+    png_sha = store.put(b"\x89PNG...", "shot.png")
+
+    assert gzip.decompress(store.path_for(xml_sha, True).read_bytes()) == b"<hierarchy/>"
+    assert store.path_for(png_sha, False).read_bytes() == b"\x89PNG..."
+    assert store.get(xml_sha) == b"<hierarchy/>"
+    assert store.get(png_sha) == b"\x89PNG..."
+    assert store.get("0" * 64) is None
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_read_artifact_from_disk_or_blob(tmp_path):
+    store = BlobStore(tmp_path / "blobs")
+    sha = store.put("<hierarchy/>", "page.xml")
+    folder = tmp_path / "failure"
+    folder.mkdir()
+    (folder / "error.txt").write_text("boom")
+    (folder / "manifest.json").write_text(json.dumps({"page.xml": {"blob": sha}}))
+
+    assert read_artifact(folder, "error.txt", store) == b"boom"
+    assert read_artifact(folder, "page.xml", store) == b"<hierarchy/>"
+    assert read_artifact(folder, "missing.xml", store) is None
+    assert artifact_names(folder) == ["error.txt", "manifest.json", "page.xml"]
+
+
+def test_read_artifact_without_manifest(tmp_path):
+    assert read_artifact(tmp_path, "page.xml", BlobStore(tmp_path / "blobs")) is None
+
+
+# ── Routine / failure captures go through the store ───────────────────────
+
+class FakeWebDriver:
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.capabilities = {"udid": "R3CN"}
+
+    def get_screenshot_as_base64(self):
+        return base64.b64encode(self.frames.pop(0)).decode()
+
+    def get_screenshot_as_png(self):
+        return self.frames[0]
+
+    def get_screenshot_as_file(self, path):
+        raise AssertionError("screenshots must not bypass the blob store")
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_screenshots_are_stored_as_blobs(tmp_path, monkeypatch, use_async):
+    monkeypatch.setattr(screenshot_writer, "Image", None)
+    am = ArtifactManager(str(tmp_path), {"screenshots": {"async": use_async, "dedup": True}})
+    drv = FakeWebDriver([b"frame-1", b"frame-1", b"frame-2"])
+    am.screenshot(drv, "inject_before")
+    am.screenshot(drv, "inject_after")
+    am.screenshot(drv, "symptom_fail", evidence=True)
+    am.close()
+
+    recs = _manifest(tmp_path / "blob_manifest.jsonl")
+    assert [r["name"].split("_", 2)[2] for r in recs] == ["inject_before.png", "inject_after.png", "symptom_fail.png"]
+    assert recs[0]["blob"] == recs[1]["blob"] != recs[2]["blob"]
+    assert am.blobs.get(recs[2]["blob"]) == b"frame-2"
+    assert not list((tmp_path / "screenshots").glob("*.png"))
+
+
+def test_failure_captures_are_stored_as_blobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_manager, "ARTIFACTS_DIR", tmp_path)
+
+    class Driver:
+        drv = FakeWebDriver([b"\x89PNG-fail"])
+        adb = SimpleNamespace(run=lambda cmd, timeout: "E/App: crash")
+
+        def page_source_xml(self):
+            return "<hierarchy/>"
+
+    out = artifact_manager.save_failure_artifacts(Driver(), RuntimeError("picker did not open"), label="t")
+    artifact_manager._write_pool.submit(lambda: None).result()   # drain queued writes
+
+    store = BlobStore(tmp_path / "blobs")
+    names = ["error.txt", "meta.json", "screenshot.png", "logcat.txt", "page_source.xml"]
+    assert artifact_names(out) == sorted(names + ["manifest.json"])
+    assert read_artifact(out, "logcat.txt", store) == b"E/App: crash"
+    assert read_artifact(out, "screenshot.png", store) == b"\x89PNG-fail"
+    assert b"picker did not open" in read_artifact(out, "error.txt", store)
+    recs = _manifest(tmp_path / "blob_manifest.jsonl")
+    assert sorted(r["name"] for r in recs) == sorted(f"{out.name}/{n}" for n in names)
+    assert {r["event"] for r in recs} == {out.name}
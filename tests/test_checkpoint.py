@@ -0,0 +1,59 @@
+import json
+import time
+
+from src.workflows.checkpoint import StepCheckpoint
+
+
+def test_resume_same_key(tmp_path):
+    path = str(tmp_path / "cp.json")
+    cp = StepCheckpoint(path, "job-1")
+    cp.complete("picker_open")
+    cp.complete("select_symptoms", picked=["Headache"])
+    cp.note(entry_saved=True)
+
+    again = StepCheckpoint(path, "job-1")
+    assert again.completed == ["picker_open", "select_symptoms"]
+    assert again.last == "select_symptoms"
+    assert again.done("picker_open")
+    assert again.data == {"picked": ["Headache"], "entry_saved": True}
+
+
+def test_complete_is_idempotent(tmp_path):
+    cp = StepCheckpoint(str(tmp_path / "cp.json"), "job-1")
+    cp.complete("a")
+    cp.complete("a")
+    assert cp.completed == ["a"]
+
+
+def test_other_key_starts_fresh(tmp_path):
+    path = str(tmp_path / "cp.json")
+    StepCheckpoint(path, "job-1").complete("picker_open")
+    cp = StepCheckpoint(path, "job-2")
+    assert cp.completed == [] and cp.last is None
+
+
+def test_stale_checkpoint_is_ignored(tmp_path):
+    path = tmp_path / "cp.json"
+    path.write_text(json.dumps({
+        "key": "job-1", "updated": time.time() - 3600, "completed": ["picker_open"], "data": {},
+    }))
+    assert StepCheckpoint(str(path), "job-1", max_age_sec=600).completed == []
+    assert StepCheckpoint(str(path), "job-1", max_age_sec=7200).completed == ["picker_open"]
+
+
+def test_unreadable_file_starts_fresh(tmp_path):
+    path = tmp_path / "cp.json"
+    path.write_text("{not json")
+    assert StepCheckpoint(str(path), "job-1").completed == []
+
+
+def test_reset_and_clear(tmp_path):
+    path = tmp_path / "cp.json"
+    cp = StepCheckpoint(str(path), "job-1")
+    cp.complete("a", x=1)
+    cp.reset()
+    assert StepCheckpoint(str(path), "job-1").completed == []
+    cp.complete("a")
+    cp.clear()
+    assert not path.exists()
+    assert cp.completed == [] and cp.data == {}
@@ -0,0 +1,177 @@
+import datetime
+import threading
+import time
+
+import pytest
+
+from src.clock_monitor import ClockMonitor
+from src.schedule_store import ScheduleStore
+from src.scheduler import LongRunScheduler
+
+
+class FakeReporter:
+    def __init__(self):
+        self.events = []
+
+    def log_event(self, event, data):
+        self.events.append((event, data))
+
+    def names(self):
+        return [e for e, _ in self.events]
+
+
+# ── ClockMonitor.check ────────────────────────────────────────────────────
+
+@pytest.fixture
+def monitor():
+    return ClockMonitor(FakeReporter(), interval_sec=10, threshold_sec=30)
+
+
+def test_normal_tick(monitor):
+    assert monitor.check(10.2, 10.0, 10.0) is None
+    assert monitor.check(10.2, 10.0) is None
+
+
+def test_suspend_with_boottime(monitor):
+    info = monitor.check(3610, 10, 3610)
+    assert info["kind"] == "suspend" and info["jump_sec"] == 3600
+
+
+def test_wall_step_with_boottime(monitor):
+    info = monitor.check(-110, 10, 10)
+    assert info["kind"] == "wall_clock_step" and info["jump_sec"] == -120
+
+
+def test_suspend_monotonic_frozen(monitor):
+    # macOS / Windows: monotonic stops while asleep, wall keeps going
+    assert monitor.check(3610, 10)["kind"] == "suspend"
+
+
+def test_suspend_monotonic_counts_sleep(monitor):
+    # Both clocks ran on through the sleep — the tick just came very late
+    info = monitor.check(3610, 3610)
+    assert info["kind"] == "suspend" and info["jump_sec"] == 3600
+
+
+def test_wall_step_backwards_without_boottime(monitor):
+    assert monitor.check(-50, 10)["kind"] == "wall_clock_step"
+
+
+# ── Catch-up policy for late plan jobs ────────────────────────────────────
+
+def _scheduler(policy, store=None, late_after_sec=300):
+    return LongRunScheduler(
+        duration_hours=24, interval_hours=1, start_immediately=False, plan=[], catalog=[],
+        reporter=FakeReporter(), recovery_cfg={"adaptive": False}, store=store,
+        catch_up_cfg={"policy": policy, "late_after_sec": late_after_sec, "spacing_sec": 0},
+    )
+
+
+def _ago(minutes: float) -> datetime.datetime:
+    return datetime.datetime.now() - datetime.timedelta(minutes=minutes)
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError, match="run.catch_up.policy"):
+        _scheduler("run_twice")
+
+
+def test_late_by_tolerance():
+    sched = _scheduler("run_once")
+    assert sched._late_by(None) == 0
+    assert sched._late_by(_ago(2)) == 0          # within late_after_sec
+    assert sched._late_by(_ago(10)) == pytest.approx(600, abs=5)
+
+
+def _run_overdue(sched, store, slots):
+    """Run plan jobs for `slots` (minutes ago, oldest first) as a woken host would."""
+    ran = []
+    for i, minutes in enumerate(slots):
+        run_at = _ago(minutes)
+        job_id = store.add_job("plan", i, run_at)
+        sched._tracked(job_id, lambda i=i: ran.append(i), run_at)()
+    return ran, {j["id"]: j["status"] for j in store.jobs("plan")}
+
+
+def test_skip_drops_overdue_jobs(tmp_path):
+    store = ScheduleStore(str(tmp_path / "s.sqlite"))
+    sched = _scheduler("skip", store)
+    ran, status = _run_overdue(sched, store, [90, 60, 30])
+    assert ran == []
+    assert set(status.values()) == {"missed"}
+    assert sched.reporter.names() == ["job_missed"] * 3
+
+
+def test_run_once_covers_the_gap_with_one_injection(tmp_path):
+    store = ScheduleStore(str(tmp_path / "s.sqlite"))
+    sched = _scheduler("run_once", store)
+    ran, status = _run_overdue(sched, store, [90, 60, 30])
+    assert ran == [0]
+    assert status == {"plan:0": "done", "plan:1": "missed", "plan:2": "missed"}
+
+
+def test_run_once_catches_up_again_after_a_later_gap(tmp_path):
+    store = ScheduleStore(str(tmp_path / "s.sqlite"))
+    sched = _scheduler("run_once", store)
+    _run_overdue(sched, store, [90])
+    sched._caught_up_at = _ago(60)   # that catch-up was an hour ago
+    run_at = _ago(30)                # slot after it, missed by a second sleep
+    ran = []
+    sched._tracked(store.add_job("plan", 1, run_at), lambda: ran.append(1), run_at)()
+    assert ran == [1]
+
+
+def test_run_all_compressed_runs_every_overdue_job(tmp_path):
+    store = ScheduleStore(str(tmp_path / "s.sqlite"))
+    sched = _scheduler("run_all_compressed", store)
+    ran, status = _run_overdue(sched, store, [90, 60, 30])
+    assert ran == [0, 1, 2]
+    assert set(status.values()) == {"done"}
+    assert sched.reporter.names() == ["job_catch_up"] * 3
+
+
+def test_on_time_job_bypasses_policy(tmp_path):
+    store = ScheduleStore(str(tmp_path / "s.sqlite"))
+    sched = _scheduler("skip", store)
+    ran, status = _run_overdue(sched, store, [1])
+    assert ran == [0] and status == {"plan:0": "done"}
+    assert sched.reporter.events == []
+
+
+def test_failed_and_skipped_jobs_are_recorded(tmp_path):
+    store = ScheduleStore(str(tmp_path / "s.sqlite"))
+    sched = _scheduler("run_once", store)
+
+    def boom():
+        raise RuntimeError("device gone")
+
+    with pytest.raises(RuntimeError):
+        sched._tracked(store.add_job("plan", 0, _ago(0)), boom, _ago(0))()
+    sched._tracked(store.add_job("plan", 1, _ago(0)), lambda: False, _ago(0))()
+    assert {j["id"]: j["status"] for j in store.jobs()} == {"plan:0": "failed", "plan:1": "missed"}
+    assert not sched._job_lock.locked()
+
+
+def test_waiting_behind_a_running_job_is_not_late(tmp_path):
+    store = ScheduleStore(str(tmp_path / "s.sqlite"))
+    sched = _scheduler("skip", store, late_after_sec=0.2)
+    ran = []
+    job = sched._tracked(store.add_job("plan", 0, _ago(0)), lambda: ran.append(0), _ago(0))
+
+    with sched._job_lock:   # a long injection holds the device
+        t = threading.Thread(target=job)
+        t.start()           # fired on time
+        time.sleep(0.5)     # ... and waits past late_after_sec for the lock
+    t.join(5)
+
+    assert ran == [0]
+    assert sched.reporter.events == []
+    assert {j["id"]: j["status"] for j in store.jobs()} == {"plan:0": "done"}
+
+
+def test_job_without_catch_up_gets_fire_time_lateness():
+    sched = _scheduler("skip")
+    seen = []
+    sched._tracked(None, seen.append, _ago(10), catch_up=False)()
+    assert seen == [pytest.approx(600, abs=5)]
+    assert sched.reporter.events == []   # the job applies its own policy
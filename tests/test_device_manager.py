@@ -0,0 +1,94 @@
+import os
+import re
+
+import pytest
+
+import src.device_manager as device_manager_mod
+from src.artifacts import ArtifactManager
+from src.device_manager import DeviceManager
+from src.reporter import RunReporter
+
+
+class FakeAndroidDriver:
+    """Records how it was built; `fail` in the cfg makes the session fail to open."""
+
+    def __init__(self, cfg, selectors, artifacts, reporter, popup_rules=None, workflows=None):
+        if cfg.get("fail"):
+            raise RuntimeError(f"no device {cfg['udid']}")
+        self.cfg, self.artifacts, self.reporter = cfg, artifacts, reporter
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    monkeypatch.setattr(device_manager_mod, "AndroidDriver", FakeAndroidDriver)
+    artifacts = ArtifactManager(str(tmp_path), {"screenshots": {"async": False}})
+    reporter = RunReporter(out_dir=str(tmp_path), run_name="soak")
+    return artifacts, reporter
+
+
+def _manager(run, devices):
+    artifacts, reporter = run
+    return DeviceManager({"app_package": "com.app"}, {}, artifacts, reporter, devices=devices)
+
+
+def test_single_device_shares_run_artifacts_and_reporter(run):
+    artifacts, reporter = run
+    dm = DeviceManager({"udid": "R3CN", "app_package": "com.app"}, {}, artifacts, reporter)
+    assert len(dm) == 1 and dm.udid == "R3CN"
+    assert dm.driver.artifacts is artifacts and dm.driver.reporter is reporter
+    assert "system_port" not in dm.driver.cfg
+
+
+def test_slots_get_own_port_and_folders(run, tmp_path):
+    dm = _manager(run, [{"udid": "192.168.0.5:5555"}, {"udid": "R3CN", "system_port": 8300}, {}])
+
+    assert [s.udid for s in dm] == ["192.168.0.5:5555", "R3CN", "device3"]
+    assert [s.cfg["system_port"] for s in dm] == [8200, 8300, 8202]   # explicit port kept
+    assert all(s.cfg["app_package"] == "com.app" for s in dm)        # merged over android:
+    assert all(s.driver is None for s in dm)                          # connected lazily
+
+    root = os.path.join(str(tmp_path), "devices")
+    assert dm.slots[0].artifacts.out_dir == os.path.join(root, "192.168.0.5_5555")
+    assert dm.slots[1].reporter.out_dir == os.path.join(root, "R3CN")
+    assert dm.slots[1].reporter.run_name == "soak [R3CN]"
+    assert os.path.isdir(os.path.join(root, "device3", "screenshots"))
+
+
+def test_run_parallel_isolates_a_failing_device(run):
+    dm = _manager(run, [{"udid": "A"}, {"udid": "B", "fail": True}, {"udid": "C"}])
+    seen = []
+
+    def job(slot):
+        seen.append(slot.udid)
+        slot.reporter.log_event("job_result", {"success": slot.udid == "A"})
+
+    errors = dm.run_parallel(job)
+
+    assert errors == {"A": "", "B": "no device B", "C": ""}
+    assert sorted(seen) == ["A", "C"]
+    assert [e["event"] for e in dm.slots[1].reporter.load_events()] == ["device_failed"]
+    dm.close()
+    assert dm.slots[0].driver.closed and dm.slots[2].driver.closed
+
+
+def test_fleet_summary_links_every_device(run):
+    artifacts, reporter = run
+    dm = _manager(run, [{"udid": "A"}, {"udid": "B"}])
+    dm.slots[0].reporter.log_event("job_result", {"success": True})
+    dm.slots[0].reporter.log_event("job_result", {"success": True})
+    dm.slots[1].reporter.log_event("job_result", {"success": False})
+
+    devices = [(s.udid, s.reporter, "") for s in dm] + [("C", dm.slots[1].reporter, "boom")]
+    path = reporter.render_fleet_summary(devices)
+    with open(path, encoding="utf-8") as f:
+        html = re.sub(r">\s+<", "><", f.read())
+
+    assert path == os.path.join(reporter.out_dir, "summary.html")
+    assert 'href="devices/A/summary.html"' in html
+    assert '<td>PASS</td><td>2</td><td>0</td>' in html
+    assert html.count("<td>FAIL</td>") == 2   # B failed a job, C errored
+    assert "<td>boom</td>" in html
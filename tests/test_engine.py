@@ -0,0 +1,218 @@
+import time
+
+import pytest
+
+from src.retry import retry
+from src.workflows.checkpoint import StepCheckpoint
+from src.workflows.engine import (
+    Deadline,
+    DeadlineExceeded,
+    Step,
+    StepFailed,
+    Workflow,
+    WorkflowRunner,
+)
+
+
+class FakeReporter:
+    def __init__(self):
+        self.events = []
+
+    def log_event(self, event, data):
+        self.events.append((event, data))
+
+    def names(self):
+        return [e for e, _ in self.events]
+
+
+class FakeDriver:
+    """Just enough AndroidDriver for the runner: records calls, scripted `until`."""
+
+    def __init__(self, visible=()):
+        self.reporter = FakeReporter()
+        self.sel = {"main_tab": "Home"}
+        self.visible = set(visible)
+        self.calls = []
+
+    def tap_text(self, text, timeout=10, contains=True, deadline=None):
+        self.calls.append(("tap", text, deadline.cap(timeout) if deadline else timeout))
+
+    def screenshot(self, name, evidence=False):
+        self.calls.append(("screenshot", name, evidence))
+
+    def press_keycode(self, keycode):
+        self.calls.append(("key", keycode))
+        self.visible.add("after-back")
+
+    def wait_idle(self, seconds, adaptive=True):
+        self.calls.append(("wait", seconds))
+
+    def wait_any(self, wanted, timeout, live=False):
+        for name, texts in wanted.items():
+            texts = [texts] if isinstance(texts, str) else texts
+            if any(t in self.visible for t in texts):
+                return name, 0.0
+        return None, timeout
+
+
+def _record(name):
+    def action(d, ctx, step, timeout):
+        d.calls.append((name, round(timeout, 1)))
+    return action
+
+
+# ── Deadline ──────────────────────────────────────────────────────────────
+
+def test_deadline_unbounded():
+    dl = Deadline(None)
+    assert dl.remaining() == float("inf")
+    assert dl.cap(30) == 30
+    dl.check("x")
+    dl.check_after("x")
+
+
+def test_deadline_caps_and_expires():
+    dl = Deadline(0.05)
+    assert dl.cap(30) <= 0.05
+    time.sleep(0.06)
+    assert dl.expired and dl.cap(30) == 0.0
+    with pytest.raises(DeadlineExceeded, match="before 'next'"):
+        dl.check("next")
+    with pytest.raises(DeadlineExceeded, match="during 'slow'"):
+        dl.check_after("slow")
+
+
+# ── Workflow.load ─────────────────────────────────────────────────────────
+
+DEFAULT = Workflow("inject", [
+    Step("open", action="open", timeout=15, until="Picker"),
+    Step("submit", action="submit", timeout=10),
+], budget_sec=120)
+
+
+def test_load_without_config_keeps_default():
+    assert Workflow.load(DEFAULT, None) is DEFAULT
+    assert Workflow.load(DEFAULT, {"other": {"budget_sec": 1}}) is DEFAULT
+
+
+def test_load_overrides_budget_and_steps():
+    wf = Workflow.load(DEFAULT, {"inject": {
+        "budget_sec": 60,
+        "steps": [
+            {"name": "open", "timeout": 20},                    # tuned built-in step
+            {"name": "dismiss", "action": "back", "optional": True},
+            {"name": "submit"},
+        ],
+    }})
+    assert wf.budget_sec == 60
+    assert wf.step_names() == ["open", "dismiss", "submit"]
+    opened = wf.steps[0]
+    assert (opened.action, opened.timeout, opened.until) == ("open", 20, "Picker")
+    assert wf.steps[1].action == "back" and wf.steps[1].optional
+    assert wf.steps[2].timeout == 10
+
+
+def test_step_from_cfg_defaults_action_to_name():
+    assert Step.from_cfg({"name": "tap_home", "unknown_key": 1}).action == "tap_home"
+
+
+# ── WorkflowRunner ────────────────────────────────────────────────────────
+
+def test_runs_steps_in_order_with_capped_timeouts():
+    d = FakeDriver(visible={"Picker"})
+    WorkflowRunner(d, DEFAULT, {"open": _record("open"), "submit": _record("submit")}, {}).run()
+    assert d.calls == [("open", 15.0), ("submit", 10.0)]
+
+
+def test_budget_caps_step_timeout():
+    d = FakeDriver(visible={"Picker"})
+    wf = Workflow("inject", DEFAULT.steps, budget_sec=5)
+    WorkflowRunner(d, wf, {"open": _record("open"), "submit": _record("submit")}, {}).run()
+    assert d.calls[0] == ("open", 5.0)
+
+
+def test_action_overrunning_budget_stops_the_flow():
+    d = FakeDriver()
+
+    def slow(d, ctx, step, timeout):
+        time.sleep(0.1)
+
+    wf = Workflow("x", [Step("a", action="slow"), Step("b", action="b")], budget_sec=0.05)
+    with pytest.raises(DeadlineExceeded, match="during 'a'"):
+        WorkflowRunner(d, wf, {"slow": slow, "b": _record("b")}, {}).run()
+    assert not [c for c in d.calls if c[0] == "b"]
+
+
+def test_fallback_runs_when_until_not_met():
+    d = FakeDriver()
+    wf = Workflow("x", [Step("a", action="a", timeout=1, until="after-back",
+                             fallbacks=[{"action": "back"}])])
+    WorkflowRunner(d, wf, {"a": _record("a")}, {}).run()
+    assert ("key", 4) in d.calls
+    assert "workflow_fallback" in d.reporter.names()
+
+
+def test_until_never_met_fails_step():
+    d = FakeDriver()
+    wf = Workflow("x", [Step("a", action="a", timeout=0.01, until="Nowhere")])
+    with pytest.raises(StepFailed):
+        WorkflowRunner(d, wf, {"a": _record("a")}, {}).run()
+    assert not [c for c in d.calls if c[0] == "screenshot"]
+
+
+def test_until_never_met_captures_evidence():
+    d = FakeDriver()
+    wf = Workflow("x", [Step("open", action="a", timeout=0.01, until="Picker",
+                             fallbacks=[{"action": "back"}], evidence="picker_not_opened")])
+    with pytest.raises(StepFailed):
+        WorkflowRunner(d, wf, {"a": _record("a")}, {}).run()
+    assert d.calls[-1] == ("screenshot", "picker_not_opened", True)
+
+
+def test_optional_step_failure_is_skipped():
+    d = FakeDriver()
+
+    def boom(d, ctx, step, timeout):
+        raise RuntimeError("no popup")
+
+    wf = Workflow("x", [Step("popup", action="boom", optional=True), Step("b", action="b")])
+    WorkflowRunner(d, wf, {"boom": boom, "b": _record("b")}, {}).run()
+    assert d.calls == [("b", 30.0)]
+    assert "workflow_step_skipped" in d.reporter.names()
+
+
+def test_unknown_action_fails():
+    with pytest.raises(StepFailed, match="unknown action"):
+        WorkflowRunner(FakeDriver(), Workflow("x", [Step("a", action="nope")]), {}, {}).run()
+
+
+def test_checkpoint_skips_completed_steps(tmp_path):
+    cp = StepCheckpoint(str(tmp_path / "cp.json"), "job-1")
+    cp.complete("open")
+    d = FakeDriver(visible={"Picker"})
+    WorkflowRunner(d, DEFAULT, {"open": _record("open"), "submit": _record("submit")}, {},
+                   checkpoint=cp).run()
+    assert d.calls == [("submit", 10.0)]
+    assert cp.completed == ["open", "submit"]
+
+
+def test_generic_tap_resolves_selector_key_and_passes_timeout():
+    d = FakeDriver()
+    wf = Workflow("x", [Step("home", action="tap", target="main_tab", timeout=2.5)])
+    WorkflowRunner(d, wf, {}, {}).run()
+    ((action, target, timeout),) = d.calls
+    assert (action, target) == ("tap", "Home")
+    assert timeout == pytest.approx(2.5, abs=0.1)
+
+
+def test_retry_stops_at_deadline():
+    calls = []
+
+    @retry(tries=3, delay=0.2)
+    def flaky(deadline=None):
+        calls.append(deadline.remaining())
+        raise RuntimeError("not found")
+
+    with pytest.raises(RuntimeError):
+        flaky(deadline=Deadline(0.1))
+    assert len(calls) == 1
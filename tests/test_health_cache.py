@@ -0,0 +1,105 @@
+import time
+
+import pytest
+
+import src.scheduler as scheduler_mod
+from src.driver import AndroidDriver
+from src.scheduler import _run_with_health_check
+
+
+class FakeReporter:
+    def __init__(self):
+        self.events = []
+
+    def log_event(self, event, data):
+        self.events.append((event, data))
+
+    def names(self):
+        return [e for e, _ in self.events]
+
+
+class FakeDrv:
+    def __init__(self, package="com.app"):
+        self.current_package = package
+
+
+@pytest.fixture
+def driver():
+    """Real health-cache logic; the device side is stubbed and counted."""
+    d = AndroidDriver.__new__(AndroidDriver)
+    d.cfg = {"app_package": "com.app"}
+    d.sel = {}
+    d.drv = FakeDrv()
+    d.reporter = FakeReporter()
+    d._snapshot = None
+    d._healthy_at = None
+    d._health_ttl = 600.0
+    d.healthy = True
+    d.calls = []
+    d.ensure_session = lambda: d.calls.append("session")
+    d.bring_to_foreground = lambda: d.calls.append("foreground")
+    d.wait_idle = lambda seconds=1.0, adaptive=None: 0.0
+    d.is_visible_text = lambda text, contains=True, timeout=2: d.healthy
+    d.screenshot = lambda name, evidence=False: None
+    return d
+
+
+@pytest.fixture
+def recoveries(monkeypatch):
+    calls = []
+
+    def fake_recovery(driver, reporter, cooldown_seconds=30, signature="unknown", stats=None,
+                      poll_seconds=2.0):
+        calls.append(signature)
+        driver.healthy = True
+        driver._healthy_at = time.monotonic()   # the recovery's health poll passed
+
+    monkeypatch.setattr(scheduler_mod, "_attempt_recovery", fake_recovery)
+    return calls
+
+
+def _run(driver, job=lambda **_: None):
+    return _run_with_health_check(job, driver, None, None, driver.reporter, cooldown_seconds=0)
+
+
+def test_full_check_fills_the_cache_then_next_job_is_cached(driver, recoveries):
+    assert _run(driver).health_check == "full"
+    assert driver.calls == ["session", "foreground"]
+    assert driver.health_cached()
+
+    driver.calls.clear()
+    assert _run(driver).health_check == "cached"
+    assert driver.calls == []
+    assert "health_check_cached" in driver.reporter.names()
+
+
+def test_failed_probe_falls_back_to_full_check(driver, recoveries):
+    driver._healthy_at = time.monotonic()
+    driver.drv.current_package = "com.android.launcher"   # app left the foreground
+
+    assert _run(driver).health_check == "full"
+    assert driver.calls == ["session", "foreground"]
+    assert "health_check_cached" not in driver.reporter.names()
+
+
+def test_expired_cache_runs_full_check(driver, recoveries):
+    driver._healthy_at = time.monotonic() - 601
+    assert _run(driver).health_check == "full"
+
+
+def test_recovery_clears_the_cache(driver, recoveries):
+    driver.healthy = False
+    assert _run(driver).health_check == "full"
+    assert recoveries == ["ui_health_check_failed"]
+    assert not driver.health_cached()   # next job re-verifies fully
+
+
+def test_failed_job_clears_the_cache(driver, recoveries):
+    driver._healthy_at = time.monotonic()
+
+    def boom(**_):
+        raise RuntimeError("picker did not open")
+
+    with pytest.raises(RuntimeError):
+        _run(driver, boom)
+    assert not driver.health_cached()
@@ -0,0 +1,59 @@
+from src.hierarchy import HierarchyIndex, first_match_center
+
+XML = """<?xml version="1.0" encoding="UTF-8"?>
+<hierarchy>
+  <node text="" content-desc="" resource-id="com.app:id/root" bounds="[0,0][1080,1920]" clickable="false">
+    <node text="" content-desc="Back" resource-id="" bounds="[0,0][100,100]" clickable="true"/>
+    <node text="" content-desc="" resource-id="com.app:id/row" bounds="[0,200][1080,300]" clickable="true">
+      <node text="Headache" content-desc="" resource-id="" bounds="[20,220][300,280]" clickable="false"/>
+    </node>
+    <node text="Add Symptom" content-desc="" resource-id="com.app:id/add" bounds="[0,0][0,0]" clickable="true"/>
+  </node>
+</hierarchy>"""
+
+
+def test_index_arrays():
+    index = HierarchyIndex(XML, "com.app")
+    assert len(index) == 6   # <hierarchy> + 5 nodes
+    i = index.lookup("Headache")
+    assert index.bounds[i] == (20, 220, 300, 280)
+    assert index.rid[index.parent[i]] == "com.app:id/row"
+    assert index.bounds[index.lookup("Add Symptom")] is None   # zero-size bounds
+
+
+def test_has_mirrors_find():
+    index = HierarchyIndex(XML, "com.app")
+    assert index.has("Headache")
+    assert index.has("Head")                       # textContains
+    assert index.has("add", contains=False)        # bare id gets the app package
+    assert index.has("Back", contains=False)       # content-desc, exact only
+    assert not index.has("Back")
+    assert not index.has("Nausea", contains=False)
+    assert index.has("Headache", exact=True)
+    assert index.has("Back", exact=True)
+    assert not index.has("Head", exact=True)       # no textContains fallback
+
+
+def test_matches_per_strategy():
+    index = HierarchyIndex(XML, "com.app")
+    assert index.matches("add", "resourceId")
+    assert index.matches("Back", "description")
+    assert index.matches("Headache", "text")
+    assert not index.matches("Head", "text")
+    assert index.matches("Head", "textContains")
+
+
+def test_find_all_and_clickable_ancestor():
+    index = HierarchyIndex(XML, "com.app")
+    hits = index.find_all("Head")
+    assert [index.text[i] for i in hits] == ["Headache"]
+    assert not index.find_all("Head", contains=False)
+    row = index.clickable_ancestor(hits[0])
+    assert index.rid[row] == "com.app:id/row"
+    assert index.center(row) == (540, 250)
+
+
+def test_first_match_center():
+    assert first_match_center(XML, ["Nausea", "Headache"]) == (160, 250)
+    assert first_match_center(XML, ["Nausea"]) is None
+    assert first_match_center("<hierarchy><node", ["x"]) is None
@@ -0,0 +1,38 @@
+import json
+import multiprocessing
+
+import pytest
+
+from src.locator_cache import LocatorCache
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "locator_cache.json")
+
+
+def test_record_and_get_across_instances(path):
+    LocatorCache(path).record("confirm_text", "1.2.0", "확인", "text")
+    entry = LocatorCache(path).get("confirm_text", "1.2.0")
+    assert (entry["candidate"], entry["strategy"]) == ("확인", "text")
+    assert LocatorCache(path).get("confirm_text", "1.3.0") is None
+
+
+def _record_keys(path, prefix, n):
+    cache = LocatorCache(path)
+    for i in range(n):
+        cache.record(f"{prefix}_{i}", "1.2.0", "OK", "text")
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_processes_do_not_lose_entries(path):
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_record_keys, args=(path, p, 20)) for p in ("a", "b", "c", "d")]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+        assert p.exitcode == 0
+
+    with open(path, encoding="utf-8") as f:
+        assert len(json.load(f)["1.2.0"]) == 80
@@ -0,0 +1,155 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from src import logcat_buffer
+from src.logcat_buffer import LogcatBuffer
+
+
+class Clock:
+    """Stands in for the `time` module inside logcat_buffer."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class FakeLogcat:
+    """`adb logcat` process whose stdout yields whatever the test emits."""
+
+    def __init__(self, argv):
+        self.argv = argv
+        self.returncode = None
+        self._lines: queue.Queue = queue.Queue()
+        self.stdout = iter(self._lines.get, None)
+
+    def emit(self, line: str) -> None:
+        self._lines.put(f"{line}\r\n".encode())
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self) -> None:
+        self.returncode = -15
+        self._lines.put(None)
+
+
+def _line(pid: int, msg: str) -> str:
+    return f"10-18 12:00:00.000  {pid}  {pid} I App: {msg}"
+
+
+def _wait_for(cond, timeout: float = 2.0) -> None:
+    end = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < end, "condition not met in time"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(logcat_buffer, "time", c)
+    return c
+
+
+@pytest.fixture
+def procs(monkeypatch):
+    spawned = []
+
+    def popen(argv, **_):
+        spawned.append(FakeLogcat(argv))
+        return spawned[-1]
+
+    monkeypatch.setattr(logcat_buffer.subprocess, "Popen", popen)
+    return spawned
+
+
+@pytest.fixture
+def buffers():
+    started = []
+    yield started
+    for buf in started:
+        buf.stop()
+
+
+def _start(buffers, procs, **kw) -> tuple[LogcatBuffer, FakeLogcat]:
+    buf = LogcatBuffer(**kw).start()
+    buffers.append(buf)
+    _wait_for(lambda: procs)
+    return buf, procs[-1]
+
+
+def _feed(buf: LogcatBuffer, proc: FakeLogcat, line: str) -> None:
+    n = len(buf._lines)
+    proc.emit(line)
+    _wait_for(lambda: len(buf._lines) > n)
+
+
+def test_dump_writes_only_the_window_before_now(tmp_path, clock, procs, buffers):
+    buf, proc = _start(buffers, procs, udid="R3CN")
+    for offset, msg in [(-300, "old"), (-90, "stale"), (-30, "recent"), (-1, "latest")]:
+        clock.now = 1_000_000.0 + offset
+        _feed(buf, proc, _line(100, msg))
+    clock.now = 1_000_000.0
+
+    path = buf.dump(str(tmp_path / "logcat.txt"), before=60)
+
+    assert path == str(tmp_path / "logcat.txt")
+    text = (tmp_path / "logcat.txt").read_text()
+    assert text.splitlines() == [_line(100, "recent"), _line(100, "latest")]   # \r stripped too
+    assert len(buf.window(before=120)) == 3
+    assert buf.window(before=5, at=1_000_000.0 - 295) == [_line(100, "old")]
+    assert "-s R3CN logcat -v threadtime" in " ".join(proc.argv)
+
+
+def test_dump_of_an_empty_window_says_so(tmp_path, clock, procs, buffers):
+    buf, proc = _start(buffers, procs)
+    clock.now -= 600
+    _feed(buf, proc, _line(100, "long ago"))
+    clock.now += 600
+
+    buf.dump(str(tmp_path / "logcat.txt"), before=60)
+
+    assert (tmp_path / "logcat.txt").read_text() == "(no logcat output in window)"
+
+
+def test_pid_lookup_runs_beside_the_reader_and_filters_by_pid(clock, procs, buffers, monkeypatch):
+    pidof = {"out": b"4242\n"}
+    release = threading.Event()
+    lookups = []
+
+    def run(argv, **_):
+        lookups.append(argv)
+        release.wait(2)                                  # a slow `adb shell pidof`
+        return type("Done", (), {"stdout": pidof["out"]})()
+
+    monkeypatch.setattr(logcat_buffer.subprocess, "run", run)
+    buf, proc = _start(buffers, procs, package="com.app")
+
+    _feed(buf, proc, _line(999, "before the app is up"))
+    _feed(buf, proc, _line(4242, "app starting"))          # reader not stalled by the lookup
+    assert len(lookups) == 1 and "pidof com.app" in " ".join(lookups[0])
+    assert len(buf.window()) == 2                          # no pids yet: keep everything
+
+    release.set()
+    _wait_for(lambda: buf._pids == {"4242"})
+    proc.emit(_line(999, "other process"))
+    _feed(buf, proc, _line(4242, "app line"))
+    assert buf.window()[-1] == _line(4242, "app line")
+    assert _line(999, "other process") not in buf.window()
+
+    # App relaunched under a new pid: the next periodic lookup picks it up
+    pidof["out"] = b"5151\n"
+    clock.now += logcat_buffer._PID_REFRESH_SEC + 1
+    proc.emit(_line(4242, "triggers refresh"))
+    _wait_for(lambda: "5151" in buf._pids)
+    assert len(lookups) == 2
+    _feed(buf, proc, _line(5151, "relaunched app line"))
+    assert buf.window()[-1] == _line(5151, "relaunched app line")
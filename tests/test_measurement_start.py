@@ -0,0 +1,156 @@
+import pytest
+
+from src.driver import AndroidDriver
+from src.workflows import measurement_start
+from src.workflows.measurement_start import MEASUREMENT_SCREENS, _drive_to_running
+from src.workflows.screens import classify_screen
+
+SEL = {
+    "symptom_add_text": ["Add Symptom", "증상 추가"],
+    "connection_lost_text": "S-Patch connection lost",
+    "battery_warning_text": "Not a New Battery",
+    "duration_sheet_title": "Select a test period",
+    "test_info_title_text": "Test information",
+    "offline_mode_text": "No test found",
+    "consent_agree_text": "Agree",
+    "use_spatch_text": "Use S-Patch",
+    "measurement_status_screen_text": "검사 진행 현황",
+    "start_now_text": "Start Now",
+    "main_tab_text": "ECG",
+    "confirm_text": ["Confirm", "OK", "확인"],
+}
+
+
+def _xml(*texts: str) -> str:
+    nodes = "".join(f'<node text="{t}" bounds="[0,{i * 100}][100,{i * 100 + 50}]"/>' for i, t in enumerate(texts))
+    return f"<hierarchy>{nodes}</hierarchy>"
+
+
+class PageDrv:
+    def __init__(self, xml):
+        self.page_source = xml
+
+
+def _driver(xml: str) -> AndroidDriver:
+    d = AndroidDriver.__new__(AndroidDriver)
+    d.cfg = {"app_package": "com.app"}
+    d.sel = SEL
+    d.drv = PageDrv(xml)
+    d._snapshot = None
+    d._combined_queries = True
+    return d
+
+
+@pytest.mark.parametrize("texts, expected", [
+    (("ECG", "Diary", "Add Symptom"), "running"),
+    (("S-Patch connection lost", "OK"), "connection_lost"),
+    (("Not a New Battery", "I checked the battery", "Start"), "battery_warning"),
+    (("Select a test period", "24 hours", "48 hours", "Confirm"), "duration_sheet"),
+    (("Test information", "확인"), "test_info"),
+    (("No test found", "Run offline", "OK"), "offline"),
+    (("Terms of use", "Agree to All", "Agree"), "consent"),
+    (("Use S-Patch",), "use_spatch"),
+    (("Diary", "ECG", "Poor ECG quality", "OK"), "dialog"),   # overlay beats the sub-tab
+    (("검사 진행 현황", "확인"), "dialog"),                   # overlay beats the status screen
+    (("검사 진행 현황", "Day 1"), "status_screen"),
+    (("Welcome", "Start Now"), "home"),
+    (("Diary", "ECG"), "sub_tab"),
+])
+def test_classify_screen_table(texts, expected):
+    assert classify_screen(_driver(_xml(*texts)), MEASUREMENT_SCREENS).name == expected
+
+
+def test_classify_screen_loading_is_none():
+    assert classify_screen(_driver(_xml("Loading…")), MEASUREMENT_SCREENS) is None
+
+
+# ── state machine ─────────────────────────────────────────────────────────
+
+
+class FakeReporter:
+    def __init__(self):
+        self.events = []
+
+    def log_event(self, event, data):
+        self.events.append((event, data))
+
+
+class FakeSteps:
+    def __init__(self):
+        self.names = []
+
+    def begin(self, name, **_):
+        self.names.append(name)
+
+
+class ScriptedDriver:
+    """Shows one scripted screen per classify; the last one repeats."""
+
+    def __init__(self, screens, **flow_cfg):
+        self.screens = list(screens)
+        self.sel = {}
+        self.workflows = {"measurement_start": flow_cfg}
+        self.reporter = FakeReporter()
+        self.screenshots = []
+        self.taps = []
+
+    def wait_any(self, selectors, timeout, **_):
+        name = self.screens.pop(0) if len(self.screens) > 1 else self.screens[0]
+        return name, 0.0
+
+    def bring_to_foreground(self):
+        pass
+
+    def wait_idle(self, seconds=1.0, adaptive=None):
+        return 0.0
+
+    def is_visible_text(self, text, contains=True, timeout=2):
+        return False
+
+    def tap_text(self, text, timeout=10, contains=True, deadline=None):
+        self.taps.append(text)
+
+    def press_keycode(self, keycode):
+        self.taps.append(keycode)
+
+    def screenshot(self, name, evidence=False):
+        self.screenshots.append((name, evidence))
+
+
+def _events(d, name):
+    return [data for event, data in d.reporter.events if event == name]
+
+
+def test_already_running_logs_empty_path():
+    d = ScriptedDriver(["running"])
+    _drive_to_running(d, 24, FakeSteps())
+    [data] = _events(d, "measurement_already_running")
+    assert data["path"] == [] and isinstance(data["elapsed_sec"], float)
+
+
+def test_path_and_elapsed_events(monkeypatch):
+    now = iter(range(100, 200, 5))
+    monkeypatch.setattr(measurement_start.time, "monotonic", lambda: float(next(now)))
+    d = ScriptedDriver(["home", "consent", "use_spatch", "running"])
+    _drive_to_running(d, 24, FakeSteps())
+
+    assert [e["screen"] for e in _events(d, "measurement_screen")] == ["home", "consent", "use_spatch"]
+    assert all(e["elapsed_sec"] > 0 for e in _events(d, "measurement_screen"))
+    [done] = _events(d, "measurement_confirmed_running")
+    assert done["path"] == ["home", "consent", "use_spatch"]
+    assert done["elapsed_sec"] > _events(d, "measurement_screen")[-1]["elapsed_sec"]
+
+
+def test_same_screen_too_often_is_stuck():
+    d = ScriptedDriver(["consent", "home"], max_same_screen=2)
+    with pytest.raises(RuntimeError, match="stuck on screen 'home' after 2 attempts"):
+        _drive_to_running(d, 24, FakeSteps())
+    assert ("measurement_start_stuck", True) in d.screenshots
+    assert [e["screen"] for e in _events(d, "measurement_screen")] == ["consent", "home", "home"]
+
+
+def test_nothing_recognised_fails_with_evidence():
+    d = ScriptedDriver([None])
+    with pytest.raises(RuntimeError, match="Could not confirm measurement running"):
+        _drive_to_running(d, 24, FakeSteps())
+    assert ("measurement_start_failed", True) in d.screenshots
@@ -0,0 +1,75 @@
+from src.driver import AndroidDriver
+from src.hierarchy import HierarchyIndex
+from src.workflows.popups import DEFAULT_POPUP_RULES, dismiss_popups
+
+
+class FakeReporter:
+    def __init__(self):
+        self.events = []
+
+    def log_event(self, event, data):
+        self.events.append((event, data))
+
+
+def _xml(*texts: str) -> str:
+    nodes = "".join(f'<node text="{t}" bounds="[0,{i * 100}][100,{i * 100 + 50}]"/>' for i, t in enumerate(texts))
+    return f"<hierarchy>{nodes}</hierarchy>"
+
+
+def _driver(*screens: str) -> AndroidDriver:
+    """
+    Real is_visible_text() answered from a HierarchyIndex snapshot of each
+    screen in turn; taps and keypresses are recorded and advance the screen.
+    """
+    d = AndroidDriver.__new__(AndroidDriver)
+    d.cfg = {"app_package": "com.app"}
+    d.sel = {}
+    d.reporter = FakeReporter()
+    d._snapshot = None
+    d.screens = list(screens)
+    d.actions = []
+
+    def take_snapshot():
+        d._snapshot = HierarchyIndex(d.screens[0], "com.app")
+        return True
+
+    def advance(action):
+        d.actions.append(action)
+        if len(d.screens) > 1:
+            d.screens.pop(0)
+        d.invalidate_snapshot()
+
+    d.take_snapshot = take_snapshot
+    d.tap_text = lambda text, timeout=10, contains=True, deadline=None, exact=False: advance(("tap", text, exact))
+    d.press_keycode = lambda keycode: advance(("key", keycode))
+    d.wait_idle = lambda seconds=1.0, adaptive=None: 0.0
+    return d
+
+
+def test_exact_statements_have_no_text_contains():
+    d = _driver(_xml())
+    strategies = [s for _, s in d._statements(["OK", "Confirm"], contains=False, exact=True)]
+    assert "textContains" not in strategies
+    assert "textContains" in [s for _, s in d._statements(["OK"], contains=False)]
+
+
+def test_tap_rule_taps_exact_confirm_button():
+    d = _driver(_xml("Check device wearing", "OK"), _xml("Add Symptom"))
+    fired = dismiss_popups(d, DEFAULT_POPUP_RULES)
+    assert fired == ["wearing_check"]
+    assert d.actions == [("tap", ["확인", "Confirm", "OK"], True)]
+
+
+def test_tap_rule_ignores_substring_target():
+    # "Confirm" only occurs inside a longer label — no tap, the rule's fallback runs
+    d = _driver(_xml("Check device wearing", "Confirm your placement"), _xml("Add Symptom"))
+    fired = dismiss_popups(d, DEFAULT_POPUP_RULES)
+    assert fired == ["wearing_check"]
+    assert d.actions == [("key", 4)]
+
+
+def test_no_popup_takes_no_action():
+    d = _driver(_xml("Add Symptom"))
+    assert dismiss_popups(d, DEFAULT_POPUP_RULES) == []
+    assert d.actions == []
+    assert d.reporter.events == []
@@ -0,0 +1,149 @@
+import json
+import multiprocessing
+import threading
+
+import pytest
+
+from src.recovery_stats import RecoveryStats
+from src.scheduler import _attempt_recovery
+
+SIG = "ui_health_check_failed"
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "recovery_stats.json")
+
+
+def test_cold_order_keeps_escalation(path):
+    stats = RecoveryStats(path)
+    assert stats.order("dev", SIG) == [1, 2, 3]
+    assert stats.score("dev", SIG, 1) == 0.5
+
+
+def test_order_follows_success_rate(path):
+    stats = RecoveryStats(path)
+    for _ in range(4):
+        stats.record("dev", SIG, 1, False)
+        stats.record("dev", SIG, 2, True)
+    stats.record("dev", SIG, 3, True)
+    assert stats.order("dev", SIG) == [2, 3, 1]
+    # Per device and per signature
+    assert stats.order("other", SIG) == [1, 2, 3]
+    assert stats.order("dev", "session_check_failed") == [1, 2, 3]
+
+
+def test_counts_persist_across_instances(path):
+    RecoveryStats(path).record("dev", SIG, 2, True)
+    stats = RecoveryStats(path)
+    assert stats.order("dev", SIG) == [2, 1, 3]
+    (row,) = stats.rows("dev")
+    assert (row["signature"], row["step"], row["tried"], row["ok"], row["rate"]) == (SIG, "2", 1, 1, 1.0)
+
+
+def test_unreadable_file_starts_cold(path):
+    with open(path, "w") as f:
+        f.write("{truncated")
+    assert RecoveryStats(path).order("dev", SIG) == [1, 2, 3]
+
+
+def test_instances_merge_their_devices(path):
+    a, b = RecoveryStats(path), RecoveryStats(path)
+
+    def work(stats, device):
+        for i in range(20):
+            stats.record(device, SIG, 1 + i % 3, i % 2 == 0)
+
+    threads = [threading.Thread(target=work, args=(a, "A")), threading.Thread(target=work, args=(b, "B"))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)
+    assert sum(e["tried"] for e in saved["A"][SIG].values()) == 20
+    assert sum(e["tried"] for e in saved["B"][SIG].values()) == 20
+
+
+def _record_many(path, device, n):
+    stats = RecoveryStats(path)
+    for i in range(n):
+        stats.record(device, SIG, 1 + i % 3, True)
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_processes_do_not_lose_counts(path):
+    # Four worker processes, two per device — every increment must survive
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_record_many, args=(path, dev, 25)) for dev in ("A", "A", "B", "B")]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+        assert p.exitcode == 0
+
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)
+    assert sum(e["tried"] for e in saved["A"][SIG].values()) == 50
+    assert sum(e["tried"] for e in saved["B"][SIG].values()) == 50
+
+
+# ── Adaptive ladder ───────────────────────────────────────────────────────
+
+class FakeReporter:
+    def __init__(self):
+        self.events = []
+
+    def log_event(self, event, data):
+        self.events.append((event, data))
+
+
+class FakeDriver:
+    """Healthy again only after `fixes`; records the steps tried."""
+
+    def __init__(self, fixes: int, device_id: str = "dev"):
+        self.fixes = fixes
+        self.device_id = device_id
+        self.tried = []
+
+    def recover_session(self, step):
+        self.tried.append(step)
+
+    def ensure_session(self):
+        pass
+
+    def bring_to_foreground(self):
+        pass
+
+    def wait_ui_health(self, timeout, poll=2.0):
+        return 1.5 if self.tried[-1] == self.fixes else None
+
+
+def test_ladder_starts_with_best_step_and_records(path):
+    stats = RecoveryStats(path)
+    for _ in range(3):
+        stats.record("dev", SIG, 3, True)
+
+    driver, reporter = FakeDriver(fixes=3), FakeReporter()
+    _attempt_recovery(driver, reporter, cooldown_seconds=1, signature=SIG, stats=stats)
+
+    assert driver.tried == [3]
+    assert ("recovery_ladder", {"signature": SIG, "order": [3, 1, 2]}) in reporter.events
+    assert stats.rows("dev")[0]["tried"] == 4
+
+
+def test_ladder_escalates_and_learns(path):
+    stats = RecoveryStats(path)
+    driver = FakeDriver(fixes=2)
+    _attempt_recovery(driver, FakeReporter(), cooldown_seconds=1, signature=SIG, stats=stats)
+    assert driver.tried == [1, 2]
+    assert stats.order("dev", SIG) == [2, 3, 1]
+
+
+def test_no_stable_device_id_uses_fixed_order(path):
+    stats = RecoveryStats(path)
+    driver = FakeDriver(fixes=2, device_id="")
+    _attempt_recovery(driver, FakeReporter(), cooldown_seconds=1, signature=SIG, stats=stats)
+    assert driver.tried == [1, 2]
+    assert RecoveryStats(path).rows("") == []
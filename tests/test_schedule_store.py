@@ -0,0 +1,49 @@
+import datetime
+
+from src.schedule_store import ScheduleStore
+
+T0 = datetime.datetime(2026, 1, 1, 9, 0, 0)
+
+
+def test_run_metadata_roundtrip(tmp_path):
+    path = str(tmp_path / "schedule.sqlite")
+    store = ScheduleStore(path)
+    assert store.start_time is None
+    assert store.get("mode", "interval") == "interval"
+    store.set("start_time", T0.isoformat())
+    store.set("measurement_started", True)
+
+    reopened = ScheduleStore(path)
+    assert reopened.start_time == T0
+    assert reopened.get("measurement_started") is True
+
+
+def test_add_job_is_idempotent(tmp_path):
+    store = ScheduleStore(str(tmp_path / "schedule.sqlite"))
+    job_id = store.add_job("plan", 0, T0, at_hour=0.5, payload={"symptoms": ["Headache"]})
+    store.mark(job_id, "done")
+    # A resumed run re-adding the same slot must not reset it
+    assert store.add_job("plan", 0, T0 + datetime.timedelta(hours=1)) == job_id
+
+    (job,) = store.jobs()
+    assert job == {
+        "id": "plan:0", "kind": "plan", "idx": 0, "at_hour": 0.5, "run_at": T0,
+        "payload": {"symptoms": ["Headache"]}, "status": "done",
+    }
+
+
+def test_unfinished_jobs_in_index_order(tmp_path):
+    store = ScheduleStore(str(tmp_path / "schedule.sqlite"))
+    for idx in (2, 0, 1, 3, 4):
+        store.add_job("interval", idx, T0 + datetime.timedelta(hours=idx))
+    store.add_job("plan", 0, T0)
+    store.mark("interval:0", "done")
+    store.mark("interval:1", "failed")
+    store.mark("interval:2", "running")
+    store.mark("interval:3", "missed")
+
+    assert [j["id"] for j in store.jobs("interval", unfinished=True)] == ["interval:2", "interval:4"]
+    assert [j["idx"] for j in store.jobs("interval")] == [0, 1, 2, 3, 4]
+    assert store.max_index("interval") == 4
+    assert store.max_index("plan") == 0
+    assert store.max_index("other") == -1
@@ -0,0 +1,88 @@
+import base64
+import json
+import os
+
+import pytest
+
+from src import screenshot_writer
+from src.screenshot_writer import ScreenshotWriter
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+@pytest.fixture
+def writer(tmp_path, monkeypatch):
+    # Byte-identical dedup (the no-Pillow path) keeps frames deterministic
+    monkeypatch.setattr(screenshot_writer, "Image", None)
+    return ScreenshotWriter(str(tmp_path), {"format": "png", "dedup": True})
+
+
+def _dedup_records(ss_dir) -> list[dict]:
+    path = os.path.join(ss_dir, "dedup.jsonl")
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_duplicate_frame_is_recorded_not_written(writer, tmp_path):
+    a, b = tmp_path / "a.png", tmp_path / "b.png"
+    writer.submit(_b64(b"frame-1"), str(a))
+    writer.submit(_b64(b"frame-1"), str(b))
+    writer.flush()
+
+    assert a.read_bytes() == b"frame-1"
+    assert not b.exists()
+    assert _dedup_records(tmp_path) == [{"path": "b.png", "same_as": "a.png"}]
+
+
+def test_changed_frame_is_written(writer, tmp_path):
+    writer.submit(_b64(b"frame-1"), str(tmp_path / "a.png"))
+    writer.submit(_b64(b"frame-2"), str(tmp_path / "b.png"))
+    writer.flush()
+
+    assert (tmp_path / "b.png").read_bytes() == b"frame-2"
+    assert _dedup_records(tmp_path) == []
+
+
+def test_forced_frame_skips_dedup(writer, tmp_path):
+    writer.submit(_b64(b"frame-1"), str(tmp_path / "a.png"))
+    writer.submit(_b64(b"frame-1"), str(tmp_path / "evidence.png"), force=True)
+    writer.flush()
+
+    assert (tmp_path / "evidence.png").read_bytes() == b"frame-1"
+    assert _dedup_records(tmp_path) == []
+
+
+def test_dedup_off_writes_every_frame(tmp_path, monkeypatch):
+    monkeypatch.setattr(screenshot_writer, "Image", None)
+    writer = ScreenshotWriter(str(tmp_path), {"dedup": False})
+    writer.submit(_b64(b"frame-1"), str(tmp_path / "a.png"))
+    writer.submit(_b64(b"frame-1"), str(tmp_path / "b.png"))
+    writer.flush()
+
+    assert (tmp_path / "b.png").exists()
+
+
+def test_warns_when_dedup_has_no_pillow(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(screenshot_writer, "Image", None)
+    writer = ScreenshotWriter(str(tmp_path), {"format": "jpeg", "dedup": True})
+
+    assert writer.format == "png"
+    assert "needs Pillow" in caplog.text
+    assert "byte-identical" in caplog.text
+
+
+def test_dhash_ignores_small_changes():
+    Image = pytest.importorskip("PIL.Image")
+    base = Image.new("L", (90, 80))
+    base.paste(255, (45, 0, 90, 80))     # left half dark, right half light
+    tweaked = base.copy()
+    tweaked.putpixel((0, 0), 10)
+    other = base.transpose(Image.FLIP_LEFT_RIGHT)
+
+    h = screenshot_writer._dhash(base)
+    assert bin(h ^ screenshot_writer._dhash(tweaked)).count("1") <= 4
+    assert bin(h ^ screenshot_writer._dhash(other)).count("1") > 4
@@ -0,0 +1,136 @@
+import json
+import os
+import textwrap
+
+import pytest
+
+import src.supervisor as supervisor_mod
+from src.supervisor import Supervisor
+
+# Stand-in for src/main.py: behaves per device as listed in the --config JSON
+# and appends "start <t>" / "end <t>" lines to <out-dir>/runs.log.
+STUB = textwrap.dedent("""
+    import json, os, sys, time
+
+    args = sys.argv[1:]
+    opt = lambda name: args[args.index(name) + 1] if name in args else None
+    out_dir = opt("--out-dir")
+    behaviour = json.load(open(opt("--config")))[opt("--device")]
+    log = os.path.join(out_dir, "runs.log")
+    starts = sum(1 for line in open(log) if line.startswith("start")) if os.path.exists(log) else 0
+    with open(log, "a") as f:
+        f.write(f"start {time.time()} {opt('--started-at') or ''}\\n")
+
+    def events(n, gap):
+        for _ in range(n):
+            with open(os.path.join(out_dir, "events.jsonl"), "a") as f:
+                f.write("{}\\n")
+            time.sleep(gap)
+
+    if behaviour == "crash_once" and starts == 0:
+        sys.exit(3)
+    if behaviour == "crash":
+        sys.exit(3)
+    if behaviour == "stall_once" and starts == 0:
+        time.sleep(60)
+    if behaviour == "busy":
+        events(10, 0.1)   # 1 s of steady progress, past the heartbeat timeout
+    if behaviour == "slow":
+        time.sleep(0.3)
+    with open(log, "a") as f:
+        f.write(f"end {time.time()}\\n")
+""")
+
+
+class FakeReporter:
+    def __init__(self):
+        self.events = []
+
+    def log_event(self, event, data):
+        self.events.append((event, data))
+
+    def named(self, name):
+        return [d for e, d in self.events if e == name]
+
+
+@pytest.fixture
+def supervise(tmp_path, monkeypatch):
+    stub = tmp_path / "stub_main.py"
+    stub.write_text(STUB)
+    monkeypatch.setattr(supervisor_mod, "_MAIN", str(stub))
+    monkeypatch.setattr(supervisor_mod, "_POLL_SEC", 0.05)
+
+    def run(behaviours: dict, **sup):
+        config = tmp_path / "run.json"
+        config.write_text(json.dumps(behaviours))
+        cfg = {
+            "devices": [{"udid": u} for u in behaviours],
+            "supervisor": {"heartbeat_timeout_sec": 0.5, "restart_backoff_sec": 0, "max_restarts": 2, **sup},
+        }
+        s = Supervisor(str(config), cfg, str(tmp_path / "run"), FakeReporter())
+        return s, s.run()
+
+    return run
+
+
+def _runs(w) -> list[str]:
+    with open(os.path.join(w.out_dir, "runs.log")) as f:
+        return [line.split() for line in f]
+
+
+def test_clean_exit_finishes_without_restart(supervise):
+    s, errors = supervise({"A": "ok"})
+    assert errors == {"A": ""}
+    assert [e["udid"] for e in s.reporter.named("worker_finished")] == ["A"]
+    assert s.reporter.named("worker_restarting") == []
+
+
+def test_crashed_worker_is_restarted_as_a_resume(supervise):
+    s, errors = supervise({"A": "crash_once"})
+    assert errors == {"A": ""}
+    [restart] = s.reporter.named("worker_restarting")
+    assert (restart["reason"], restart["error"]) == ("crashed", "exit code 3")
+    starts = [r for r in _runs(s.workers[0]) if r[0] == "start"]
+    assert len(starts) == 2
+    assert len(starts[0]) == 2 and starts[1][2] == s.started_at   # only the restart gets --started-at
+
+
+def test_gives_up_after_max_restarts(supervise):
+    s, errors = supervise({"A": "crash"}, max_restarts=2)
+    assert errors == {"A": "exit code 3"}
+    assert len(s.reporter.named("worker_restarting")) == 2
+    [gave_up] = s.reporter.named("worker_gave_up")
+    assert gave_up["restarts"] == 2
+
+
+def test_silent_worker_is_killed_and_restarted(supervise):
+    s, errors = supervise({"A": "stall_once"})
+    assert errors == {"A": ""}
+    [hung] = s.reporter.named("worker_hung")
+    assert hung["error"].startswith("no heartbeat")
+    assert s.reporter.named("worker_restarting")[0]["reason"] == "hung"
+
+
+def test_growing_event_log_counts_as_heartbeat(supervise):
+    s, errors = supervise({"A": "busy"})
+    assert errors == {"A": ""}
+    assert s.reporter.named("worker_hung") == []
+
+
+def test_max_workers_caps_concurrency(supervise):
+    s, errors = supervise({"A": "slow", "B": "slow", "C": "slow"}, max_workers=2)
+    assert errors == {"A": "", "B": "", "C": ""}
+    spans = []
+    for w in s.workers:
+        runs = {r[0]: float(r[1]) for r in _runs(w)}
+        spans.append((runs["start"], runs["end"]))
+    peak = max(sum(1 for a, b in spans if a <= t < b) for t, _ in spans)
+    assert peak == 2
+
+
+def test_worker_dirs_and_selection_args(tmp_path):
+    cfg = {"devices": [{"udid": "192.168.0.5:5555"}, {}]}
+    s = Supervisor("run.yaml", cfg, str(tmp_path), FakeReporter())
+    assert [w.udid for w in s.workers] == ["192.168.0.5:5555", "device2"]
+    assert [w.select for w in s.workers] == [["--device", "192.168.0.5:5555"], ["--device-index", "1"]]
+    assert s.workers[0].out_dir == os.path.join(str(tmp_path), "devices", "192.168.0.5_5555")
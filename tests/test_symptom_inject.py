@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.hierarchy import HierarchyIndex
+from src.workflows.engine import Deadline
+from src.workflows.symptom_inject import _tap_symptom_item, _tap_symptoms_from_map
+
+
+class FakeReporter:
+    def __init__(self):
+        self.events = []
+
+    def log_event(self, event, data):
+        self.events.append((event, data))
+
+
+class FakeDrv:
+    page_source = "<hierarchy/>"
+
+    def __init__(self):
+        self.scripts = []
+
+    def execute_script(self, name, args):
+        self.scripts.append((name, args))
+
+
+class FakeDriver:
+    def __init__(self):
+        self.reporter = FakeReporter()
+        self.drv = FakeDrv()
+        self.sel = {}
+        self.screenshots = []
+
+    def screenshot(self, name, evidence=False):
+        self.screenshots.append((name, evidence))
+
+    def page_source_xml(self):
+        return "<hierarchy/>"
+
+
+def test_tap_symptom_item_stops_when_step_time_is_spent():
+    d = FakeDriver()
+    with pytest.raises(TimeoutError, match="Step time ran out"):
+        _tap_symptom_item(d, "Palpitations", deadline=Deadline(0))
+    assert ("symptom_fail_Palpitations", True) in d.screenshots
+
+
+def test_tap_from_map_hands_back_everything_when_step_time_is_spent():
+    d = FakeDriver()
+    remaining = _tap_symptoms_from_map(d, ["Palpitations", "Dizziness"], "Check your symptoms",
+                                       deadline=Deadline(0))
+    assert remaining == ["Palpitations", "Dizziness"]
+    assert d.drv.scripts == []   # no blind taps
+
+
+PICKER_XML = """<hierarchy>
+  <node text="Check your symptoms" bounds="[0,800][1080,900]"/>
+  <node text="Palpitations" bounds="[0,1000][1080,1100]"/>
+  <node text="Dizziness" bounds="[0,1100][1080,1200]"/>
+</hierarchy>"""
+
+
+class PickerDriver(FakeDriver):
+    """Multi-select picker sheet; the first hierarchy fetch may dismiss it."""
+
+    def __init__(self, dismiss_on_fetch=False, live=None):
+        super().__init__()
+        self.fetches = 0
+        self.open = True
+        self.dismiss_on_fetch = dismiss_on_fetch
+        self.live = live or {}   # label -> rect of the re-opened sheet
+        self.taps = []
+
+    def hierarchy(self):
+        self.fetches += 1
+        if self.dismiss_on_fetch:
+            self.open = False
+        return HierarchyIndex(PICKER_XML)
+
+    def is_visible_text(self, text, timeout=0):
+        return self.open
+
+    def tap_text(self, text, timeout=10, contains=True, deadline=None):
+        self.taps.append(text)
+        self.open = True
+
+    def wait_any(self, selectors, timeout, live=False):
+        return ("picker", "Check your symptoms") if self.open else (None, timeout)
+
+    def wait_idle(self, seconds, adaptive=True):
+        pass
+
+    def find(self, label, timeout=10, contains=True):
+        if label not in self.live:
+            raise RuntimeError(f"{label} not found")
+        return SimpleNamespace(rect=self.live[label])
+
+
+def test_tap_from_map_uses_one_fetch():
+    d = PickerDriver()
+    remaining = _tap_symptoms_from_map(d, ["Palpitations", "Dizziness"], "Check your symptoms",
+                                       deadline=Deadline(30))
+    assert remaining == []
+    assert d.fetches == 1
+    assert [a for _, a in d.drv.scripts] == [{"x": 540, "y": 1050}, {"x": 540, "y": 1150}]
+    event, data = d.reporter.events[0]
+    assert event == "symptom_picker_mapped" and data["reopened"] is False
+
+
+def test_tap_from_map_rechecks_targets_after_reopen():
+    # The re-opened sheet sits higher; Dizziness is no longer on screen
+    d = PickerDriver(dismiss_on_fetch=True,
+                     live={"Palpitations": {"x": 0, "y": 600, "width": 1080, "height": 100}})
+    remaining = _tap_symptoms_from_map(d, ["Palpitations", "Dizziness"], "Check your symptoms",
+                                       deadline=Deadline(30))
+    assert d.fetches == 1
+    assert d.taps   # sheet was re-opened
+    assert [a for _, a in d.drv.scripts] == [{"x": 540, "y": 650}]   # live, not mapped, position
+    assert remaining == ["Dizziness"]
+    assert d.reporter.events[0][1]["reopened"] is True
@@ -0,0 +1,144 @@
+import pytest
+
+import src.driver as driver_mod
+from src.driver import AndroidDriver
+from src.workflows.screens import Screen, classify_screen
+
+
+def _xml(*texts: str) -> str:
+    nodes = "".join(f'<node text="{t}" bounds="[0,{i * 100}][100,{i * 100 + 50}]"/>' for i, t in enumerate(texts))
+    return f"<hierarchy>{nodes}</hierarchy>"
+
+
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+
+    def get_attribute(self, name):
+        return self.text if name == "text" else ""
+
+
+class FakeDrv:
+    """Serves one page_source per fetch (the last one repeats) and live queries."""
+
+    def __init__(self, pages=(), live=()):
+        self.pages = list(pages)
+        self.live = list(live)
+        self.fetches = 0
+        self.queries = []
+
+    @property
+    def page_source(self):
+        self.fetches += 1
+        return self.pages.pop(0) if len(self.pages) > 1 else self.pages[0]
+
+    def find_elements(self, by, query):
+        self.queries.append(query)
+        texts = self.live.pop(0) if len(self.live) > 1 else self.live[0]
+        return [FakeElement(t) for t in texts]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock; sleep() advances it and records the poll."""
+    state = {"now": 1000.0, "sleeps": []}
+
+    def sleep(sec):
+        state["sleeps"].append(round(sec, 3))
+        state["now"] += sec
+
+    monkeypatch.setattr(driver_mod.time, "monotonic", lambda: state["now"])
+    monkeypatch.setattr(driver_mod.time, "sleep", sleep)
+    return state
+
+
+def _driver(drv, **cfg) -> AndroidDriver:
+    d = AndroidDriver.__new__(AndroidDriver)
+    d.cfg = {"app_package": "com.app", **cfg}
+    d.sel = {}
+    d.drv = drv
+    d._snapshot = None
+    d._combined_queries = True
+    return d
+
+
+def test_earlier_entry_wins_when_several_are_visible(clock):
+    d = _driver(FakeDrv([_xml("Loading", "Add Symptom")]))
+    name, elapsed = d.wait_any({"main": "Add Symptom", "loading": "Loading"}, timeout=5)
+    assert (name, elapsed) == ("main", 0)
+    assert d.drv.fetches == 1
+
+
+def test_waits_until_an_outcome_appears(clock):
+    d = _driver(FakeDrv([_xml("Loading"), _xml("Loading"), _xml("Add Symptom")]))
+    name, elapsed = d.wait_any({"main": ["증상 추가", "Add Symptom"]}, timeout=5, poll=0.5)
+    assert (name, elapsed) == ("main", 1.0)
+    assert d.drv.fetches == 3
+
+
+def test_timeout_returns_none_with_elapsed(clock):
+    d = _driver(FakeDrv([_xml("Loading")]))
+    name, elapsed = d.wait_any({"main": "Add Symptom"}, timeout=2, poll=0.5)
+    assert (name, elapsed) == (None, 2.0)
+    assert d.drv.fetches == 5   # t = 0, 0.5, 1.0, 1.5, 2.0
+
+
+def test_poll_interval_and_last_partial_sleep(clock):
+    d = _driver(FakeDrv([_xml("Loading")]))
+    d.wait_any({"main": "Add Symptom"}, timeout=1.0, poll=0.4)
+    assert clock["sleeps"] == [0.4, 0.4, 0.2]
+
+
+def test_timeout_zero_checks_once(clock):
+    d = _driver(FakeDrv([_xml("Loading")]))
+    assert d.wait_any({"main": "Add Symptom"}, timeout=0) == (None, 0)
+    assert d.drv.fetches == 1 and clock["sleeps"] == []
+
+
+def test_empty_selectors_are_ignored(clock):
+    d = _driver(FakeDrv([_xml("Add Symptom")]))
+    assert d.wait_any({"none": None, "blank": [""], "main": "Add Symptom"}, timeout=0)[0] == "main"
+    assert d.wait_any({"none": None}, timeout=5) == (None, 0)
+
+
+def test_live_mode_uses_one_combined_query_per_tick(clock):
+    d = _driver(FakeDrv(pages=["<never/>"], live=[[], ["Check your symptoms"]]))
+    name, _ = d.wait_any({"success": "Saved", "picker": "Check your symptoms"},
+                         timeout=3, live=True, poll=0.5)
+    assert name == "picker"
+    assert d.drv.fetches == 0                 # no page_source while the picker is up
+    assert len(d.drv.queries) == 2
+    assert 'textContains("Saved")' in d.drv.queries[0]
+    assert 'textContains("Check your symptoms")' in d.drv.queries[0]
+
+
+def test_snapshot_checks_off_forces_live(clock):
+    d = _driver(FakeDrv(pages=["<never/>"], live=[["Add Symptom"]]), snapshot_checks=False)
+    assert d.wait_any({"main": "Add Symptom"}, timeout=0)[0] == "main"
+    assert d.drv.fetches == 0
+
+
+# ── classify_screen ───────────────────────────────────────────────────────
+
+SCREENS = [
+    Screen("dialog", "confirm_text", ["확인", "OK"]),
+    Screen("running", "symptom_add_text", "Add Symptom"),
+    Screen("start", "start_text", "Start"),
+]
+
+
+def test_classify_screen_first_listed_wins(clock):
+    d = _driver(FakeDrv([_xml("Add Symptom", "OK")]))
+    assert classify_screen(d, SCREENS).name == "dialog"
+
+
+def test_classify_screen_uses_configured_selector(clock):
+    d = _driver(FakeDrv([_xml("측정 시작")]))
+    d.sel = {"start_text": "측정 시작"}
+    assert classify_screen(d, SCREENS).name == "start"
+
+
+def test_classify_screen_none_after_timeout(clock):
+    d = _driver(FakeDrv([_xml("Something else")]))
+    assert classify_screen(d, SCREENS, timeout=1) is None
+    assert d.drv.fetches == 3
@@ -4,6 +4,7 @@ Run:  python web/app.py   (from project root)
 """
 import datetime
 import json
+import mimetypes
 import subprocess
 import sys
 import threading
@@ -11,13 +12,18 @@ import time
 from pathlib import Path
 
 import yaml
-from flask import Flask, jsonify, render_template, request, send_from_directory
+from flask import Flask, Response, jsonify, render_template, request, send_from_directory
 
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 
 ARTIFACTS_DIR = ROOT / "artifacts"
 
+from src.blob_store import BlobStore, artifact_names, read_artifact  # noqa: E402
+
+# Failure-folder screenshots / logcat / page source live here (see artifact_manager)
+BLOBS = BlobStore(ARTIFACTS_DIR / "blobs")
+
 app = Flask(__name__)
 
 PORT = 5001
@@ -473,14 +479,14 @@ def failures():
     folders = []
     if ARTIFACTS_DIR.exists():
         for d in sorted(ARTIFACTS_DIR.iterdir(), reverse=True):
-            if not d.is_dir():
+            if not d.is_dir() or d.name == "blobs":
                 continue
             try:
                 dt = datetime.datetime.strptime(d.name, "%Y%m%d_%H%M%S")
                 label = dt.strftime("%Y-%m-%d %H:%M:%S")
             except ValueError:
                 label = d.name
-            files = sorted(f.name for f in d.iterdir() if f.is_file())
+            files = artifact_names(d)
             folders.append({"name": d.name, "label": label, "files": files})
     return render_template("failures.html", folders=folders)
 
@@ -499,10 +505,10 @@ def failure_detail(ts):
         label = ts
 
     def _read(name):
-        p = folder / name
-        return p.read_text(encoding="utf-8", errors="replace") if p.exists() else None
+        data = read_artifact(folder, name, BLOBS)
+        return data.decode("utf-8", errors="replace") if data is not None else None
 
-    has_screenshot   = (folder / "screenshot.png").exists()
+    has_screenshot   = "screenshot.png" in artifact_names(folder)
     error_text       = _read("error.txt")
     logcat_text      = _read("logcat.txt")
     page_source_text = _read("page_source.xml")
@@ -526,7 +532,15 @@ def serve_artifact(ts, filename):
     folder = ARTIFACTS_DIR / ts
     if not folder.is_dir():
         return "Not found.", 404
-    return send_from_directory(str(folder), filename)
+    if (folder / filename).is_file():
+        return send_from_directory(str(folder), filename)
+    if "/" in filename or "\\" in filename:
+        return "Not found.", 404
+    data = read_artifact(folder, filename, BLOBS)
+    if data is None:
+        return "Not found.", 404
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    return Response(data, mimetype=mimetype)
 
 
 @app.route("/api/screenshots")